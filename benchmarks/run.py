@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Воспроизводимый бенчмарк пропускной способности и задержек SmartJobMatcher.
+
+По умолчанию поднимает встроенный mock-сервер Ollama (matcher.mock_server)
+с заданной задержкой, поэтому результаты не зависят от модели и железа.
+Для каждого режима выводит matches/sec, p50/p95/p99 задержки операции и
+число обращений к LLM на одно сопоставление.
+
+Режимы:
+    single     — последовательные вызовы match()
+    combined   — то же с ollama.combined_parse (вакансия и резюме одним запросом);
+                 дополнительно считается совпадение извлечённых данных с
+                 раздельным парсингом (extraction_agreement)
+    batch      — match_many() матрицы N×M (scoring.engine = "python")
+    matrix     — match_many() матрицы N×M (scoring.engine = "vectorized")
+    concurrent — match() из нескольких потоков на общем матчере
+
+Пример:
+    python benchmarks/run.py --latency 0.2 --jitter 0.05 --rounds 20
+    python benchmarks/run.py --modes batch matrix --jobs 10 --resumes 200 --output bench.json
+    python benchmarks/run.py --chunk-delay 0.005 --trailing-chunks 100 --stream
+    python benchmarks/run.py --modes single combined --prompt-rate 0.3 --max-parallel 1
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# Добавляем родительскую директорию в путь для импорта
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from matcher import SmartJobMatcher, Config
+from matcher.metrics import MetricsSink
+from matcher.mock_server import MockOllamaServer
+
+MODES = ["single", "combined", "batch", "matrix", "concurrent"]
+
+# Счётчик для уникальных текстов: каждый прогон парсит документы заново
+_doc_counter = itertools.count()
+
+
+def make_job() -> str:
+    """Уникальный текст вакансии."""
+    return f"Требуется Python разработчик #{next(_doc_counter)}. Опыт от 3 лет, SQL, Docker."
+
+
+def make_resume() -> str:
+    """Уникальный текст резюме."""
+    return f"Кандидат #{next(_doc_counter)}. Python, SQL, Git, 2.5 года опыта."
+
+
+class PromptEvalSink(MetricsSink):
+    """Суммирует prompt_eval_duration из метрик match() за прогон режима."""
+
+    def __init__(self):
+        self.prompt_eval_sec = 0.0
+        self.matches = 0
+        self._lock = threading.Lock()
+
+    def record(self, metrics: Dict[str, Any]) -> None:
+        if metrics.get('operation') != 'match':
+            return
+        with self._lock:
+            self.prompt_eval_sec += metrics['llm']['prompt_eval_sec']
+            self.matches += 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль q (0-100) методом ближайшего ранга."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def _jaccard(first: List[str], second: List[str]) -> float:
+    """Коэффициент Жаккара списков навыков без учёта регистра."""
+    a = {item.lower().strip() for item in first}
+    b = {item.lower().strip() for item in second}
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def extraction_agreement(first: Dict[str, Any], second: Dict[str, Any]) -> float:
+    """Совпадение двух результатов парсинга 0..1: среднее по четырём полям."""
+    return (
+        float(first['education'].lower().strip() == second['education'].lower().strip())
+        + float(first['experience_years'] == second['experience_years'])
+        + _jaccard(first['hard_skills'], second['hard_skills'])
+        + _jaccard(first['soft_skills'], second['soft_skills'])
+    ) / 4
+
+
+def measure_agreement(matcher: SmartJobMatcher, pairs: int) -> float:
+    """
+    Сравнивает совместный парсинг пары с раздельным на одних и тех же текстах.
+
+    Кэш парсинга на время замера отключается, чтобы оба пути обращались к LLM.
+
+    Returns:
+        Среднее совпадение по вакансиям и резюме
+    """
+    parse_cache, matcher.parse_cache = matcher.parse_cache, None
+    scores = []
+    try:
+        for _ in range(pairs):
+            job, resume = make_job(), make_resume()
+            combined = matcher._parse_pair(job, resume)
+            separate = (matcher._parse_text_with_llm(job, True), matcher._parse_text_with_llm(resume, False))
+            scores.extend(extraction_agreement(a, b) for a, b in zip(combined, separate))
+    finally:
+        matcher.parse_cache = parse_cache
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def summarize(
+    mode: str,
+    latencies: List[float],
+    matches: int,
+    elapsed: float,
+    llm_calls: Optional[int],
+    prompt_eval: Optional[PromptEvalSink] = None
+) -> Dict[str, Any]:
+    """Сводка по режиму."""
+    prompt_eval_ms = None
+    if prompt_eval is not None and prompt_eval.matches:
+        prompt_eval_ms = round(prompt_eval.prompt_eval_sec / prompt_eval.matches * 1000, 2)
+    return {
+        "mode": mode,
+        "operations": len(latencies),
+        "matches": matches,
+        "elapsed_sec": round(elapsed, 4),
+        "matches_per_sec": round(matches / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "llm_calls_per_match": round(llm_calls / matches, 3) if llm_calls is not None and matches else None,
+        # prompt_eval_duration из ответов Ollama на один match(); для match_many() не собирается
+        "prompt_eval_ms_per_match": prompt_eval_ms
+    }
+
+
+def run_mode(
+    mode: str,
+    matcher: SmartJobMatcher,
+    args: argparse.Namespace,
+    server: Optional[MockOllamaServer]
+) -> Dict[str, Any]:
+    """
+    Прогоняет один режим и возвращает сводку.
+
+    Args:
+        mode: Название режима
+        matcher: Матчер, подключённый к серверу
+        args: Параметры командной строки
+        server: Встроенный mock-сервер (None, если используется внешний URL)
+
+    Returns:
+        Словарь с метриками режима
+    """
+    latencies: List[float] = []
+    matches = 0
+    prompt_eval = PromptEvalSink()
+    matcher.metrics_sink = prompt_eval
+
+    if server is not None:
+        server.reset_stats()
+    started = time.perf_counter()
+
+    if mode in ("single", "combined"):
+        for _ in range(args.rounds):
+            op_start = time.perf_counter()
+            matcher.match(make_job(), make_resume(), generate_feedback=args.feedback)
+            latencies.append(time.perf_counter() - op_start)
+            matches += 1
+
+    elif mode in ("batch", "matrix"):
+        for _ in range(args.rounds):
+            jobs = [make_job() for _ in range(args.jobs)]
+            resumes = [make_resume() for _ in range(args.resumes)]
+            op_start = time.perf_counter()
+            matcher.match_many(jobs, resumes)
+            latencies.append(time.perf_counter() - op_start)
+            matches += len(jobs) * len(resumes)
+
+    elif mode == "concurrent":
+        def one_match(_) -> float:
+            op_start = time.perf_counter()
+            matcher.match(make_job(), make_resume(), generate_feedback=args.feedback)
+            return time.perf_counter() - op_start
+
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            latencies = list(pool.map(one_match, range(args.rounds * args.workers)))
+        matches = len(latencies)
+
+    else:
+        raise ValueError(f"Неизвестный режим: {mode}")
+
+    elapsed = time.perf_counter() - started
+    llm_calls = server.stats["generate"] if server is not None else None
+    summary = summarize(mode, latencies, matches, elapsed, llm_calls, prompt_eval)
+    if mode == "combined":
+        summary["extraction_agreement"] = round(measure_agreement(matcher, args.agreement_pairs), 4)
+    return summary
+
+
+def build_matcher(url: str, mode: str, args: argparse.Namespace) -> SmartJobMatcher:
+    """Матчер для режима; кэш парсинга только в памяти, чтобы не влиять на другие прогоны."""
+    config = Config(args.config) if args.config else Config()
+    config.set("ollama.url", url)
+    config.set("ollama.max_concurrency", args.concurrency)
+    config.set("cache.path", None)
+    config.set("ollama.stream", args.stream)
+    config.set("ollama.combined_parse", mode == "combined")
+    config.set("scoring.engine", "vectorized" if mode == "matrix" else "python")
+    if mode == "matrix":
+        from matcher.vectorized import np
+        if np is None:
+            raise ImportError("для режима matrix требуется numpy: pip install numpy")
+    return SmartJobMatcher(config=config)
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    """Печатает сводку в виде таблицы."""
+    header = (
+        f"{'mode':<11}{'matches':>9}{'matches/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'llm/match':>11}{'prompt ms':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        calls = "n/a" if r["llm_calls_per_match"] is None else f"{r['llm_calls_per_match']:.3f}"
+        prompt_ms = "n/a" if r["prompt_eval_ms_per_match"] is None else f"{r['prompt_eval_ms_per_match']:.1f}"
+        print(
+            f"{r['mode']:<11}{r['matches']:>9}{r['matches_per_sec']:>12.2f}"
+            f"{r['latency_p50_ms']:>10.1f}{r['latency_p95_ms']:>10.1f}{r['latency_p99_ms']:>10.1f}{calls:>11}{prompt_ms:>11}"
+        )
+    for r in results:
+        if "extraction_agreement" in r:
+            print(f"\n{r['mode']}: совпадение извлечения с раздельным парсингом {r['extraction_agreement']:.3f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа CLI."""
+    parser = argparse.ArgumentParser(description="Бенчмарк SmartJobMatcher на mock-сервере Ollama")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--rounds", type=int, default=10, help="Операций на режим (на поток для concurrent)")
+    parser.add_argument("--jobs", type=int, default=5, help="Вакансий в матрице batch/matrix")
+    parser.add_argument("--resumes", type=int, default=50, help="Резюме в матрице batch/matrix")
+    parser.add_argument("--workers", type=int, default=8, help="Потоков в режиме concurrent")
+    parser.add_argument("--concurrency", type=int, default=4, help="ollama.max_concurrency")
+    parser.add_argument("--feedback", action="store_true", help="Генерировать фидбэк в single/concurrent")
+    parser.add_argument("--latency", type=float, default=0.05, help="Задержка mock-сервера, сек")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Разброс задержки, сек")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ошибок mock-сервера")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Пауза между чанками mock-сервера, сек")
+    parser.add_argument("--trailing-chunks", type=int, default=0, help="Пробельных чанков после JSON")
+    parser.add_argument("--stream", action="store_true", help="Потоковый режим (ollama.stream)")
+    parser.add_argument("--prompt-rate", type=float, default=0.0, help="Обработка промпта mock-сервером, сек на 1000 символов")
+    parser.add_argument("--max-parallel", type=int, default=0, help="Одновременных запросов в mock-сервере (0 — без ограничения)")
+    parser.add_argument("--prefix-cache", action="store_true", help="Имитировать KV-кэш общего префикса в mock-сервере")
+    parser.add_argument("--agreement-pairs", type=int, default=5, help="Пар для замера совпадения в режиме combined")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="Внешний Ollama API вместо встроенного mock-сервера")
+    parser.add_argument("--config", help="Путь к config.json")
+    parser.add_argument("--output", help="Сохранить результаты в JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    server = None
+    if args.url:
+        url = args.url
+    else:
+        server = MockOllamaServer(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            seed=args.seed,
+            chunk_delay=args.chunk_delay,
+            trailing_chunks=args.trailing_chunks,
+            prompt_rate=args.prompt_rate,
+            max_parallel=args.max_parallel,
+            prefix_cache=args.prefix_cache
+        ).start()
+        url = server.url
+
+    results = []
+    try:
+        for mode in args.modes:
+            try:
+                matcher = build_matcher(url, mode, args)
+            except ImportError as e:
+                print(f"Режим {mode} пропущен: {e}", file=sys.stderr)
+                continue
+            with matcher:
+                results.append(run_mode(mode, matcher, args, server))
+    finally:
+        if server is not None:
+            server.stop()
+
+    print_table(results)
+
+    if args.output:
+        report = {
+            "params": {k: v for k, v in vars(args).items() if k != "output"},
+            "results": results
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
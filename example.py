@@ -160,13 +160,15 @@ def example_5_batch_processing():
 
     matcher = SmartJobMatcher()
 
+    # Резюме парсится один раз, а не для каждой вакансии
+    print(f"\nАнализ {len(jobs)} вакансий...")
+    matrix = matcher.match_many(jobs, [candidate_resume])
+
     results = []
     for i, job in enumerate(jobs, 1):
-        print(f"\nАнализ вакансии {i}/3...")
-        result = matcher.match(job, candidate_resume, generate_feedback=False)
         results.append({
             'job_id': i,
-            'score': result['score'],
+            'score': matrix['scores'][i - 1][0],
             'job_preview': job[:50] + "..."
         })
 
@@ -196,18 +198,20 @@ def example_6_custom_weights():
     Мотивированный, быстро обучаюсь.
     """
 
-    # Для стажёра важнее образование и soft skills, опыт не критичен
     matcher = SmartJobMatcher()
-    matcher.weights = {
+    result = matcher.match(job, resume, generate_feedback=False)
+    print(f"\n🎯 Скор со стандартными весами: {result['score']}/100")
+
+    # Для стажёра важнее образование и soft skills, опыт не критичен.
+    # rescore пересчитывает скор по сохранённым компонентам без запросов к LLM
+    intern_weights = {
         'education_match': 40,      # Повысили
         'experience_match': 10,      # Понизили
         'hard_skills_match': 35,
         'soft_skills_match': 15      # Повысили
     }
-
-    result = matcher.match(job, resume)
-    print(f"\n🎯 Скор с приоритетом на образование: {result['score']}/100")
-    print(f"💬 {result['feedback']}")
+    matcher.rescore([result], intern_weights)
+    print(f"🎯 Скор с приоритетом на образование: {result['score']}/100")
 
 
 def main():
@@ -60,19 +60,11 @@ def test_all_combinations(matcher, data):
     print("📊 МАТРИЦА СОВМЕСТИМОСТИ")
     print(f"{'='*70}\n")
 
-    results_matrix = []
-
-    for job in data['jobs']:
-        job_results = []
-        for resume in data['resumes']:
-            result = matcher.match(
-                job['description'],
-                resume['text'],
-                generate_feedback=False  # Отключаем для скорости
-            )
-            job_results.append(result['score'])
-
-        results_matrix.append(job_results)
+    # Каждая вакансия и каждое резюме парсятся один раз
+    results_matrix = matcher.match_many(
+        [job['description'] for job in data['jobs']],
+        [resume['text'] for resume in data['resumes']]
+    )['scores']
 
     # Вывод таблицы
     print(f"{'Вакансия':<30} | ", end="")
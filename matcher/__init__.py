@@ -3,11 +3,33 @@ Matcher - умный матчер вакансий и резюме на осно
 
 Основные компоненты:
 - SmartJobMatcher: класс для анализа совместимости вакансий и резюме
+- AsyncSmartJobMatcher: асинхронная версия SmartJobMatcher (требует httpx)
 - Config: загрузка и управление конфигурацией
+- ParseCache: кэш результатов парсинга документов
+- NearDuplicateIndex: поиск почти-дубликатов документов (MinHash/LSH, требует numpy)
+- PreParser: быстрый разбор шаблонных документов без LLM
+- SkillCanonicalizer: канонизация навыков (синонимы, стемминг, ID навыков)
+- SkillSimilarity: нечёткое сходство навыков для частичного зачёта (требует numpy)
+- ResultStore: хранилище результатов сопоставления (SQLite)
+- DocumentRegistry: реестр документов, распарсенных при загрузке
+- TaskQueue, WorkerPool: очередь фоновых задач (SQLite) и пул процессов-обработчиков
+- CandidateIndex: индекс навыков для поиска лучших кандидатов (top-K)
+- VectorizedScorer: векторизованный скоринг на NumPy (требует numpy)
 """
 
-from .core import SmartJobMatcher
+from .core import SmartJobMatcher, LazyFeedback
+from .async_core import AsyncSmartJobMatcher
 from .config import Config
+from .cache import ParseCache
+from .dedup import NearDuplicateIndex
+from .preparse import PreParser
+from .skills import SkillCanonicalizer
+from .similarity import SkillSimilarity
+from .store import ResultStore
+from .registry import DocumentRegistry
+from .tasks import TaskQueue, WorkerPool
+from .index import CandidateIndex
+from .vectorized import VectorizedScorer
 
 __version__ = "1.0.0"
-__all__ = ["SmartJobMatcher", "Config"]
+__all__ = ["SmartJobMatcher", "AsyncSmartJobMatcher", "LazyFeedback", "Config", "ParseCache", "NearDuplicateIndex", "PreParser", "SkillCanonicalizer", "SkillSimilarity", "ResultStore", "DocumentRegistry", "TaskQueue", "WorkerPool", "CandidateIndex", "VectorizedScorer"]
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AsyncSmartJobMatcher - асинхронная версия SmartJobMatcher для asyncio-приложений.
+
+Блокирующие шаги — чтение и запись кэша SQLite, поиск почти-дубликатов,
+обновление таблицы сходства навыков и расчёт матрицы — выполняются через
+asyncio.to_thread и не занимают цикл событий.
+
+Требует пакет httpx: pip install httpx
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .config import Config
+from .balancer import Endpoint
+from .core import BaseJobMatcher
+from .feedback import build_template_feedback
+from .metrics import MatchMetrics, StageMetrics, timed_stage
+from .resilience import LLMUnavailableError, MalformedResponseError
+from .streaming import JsonStreamTracker
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - зависит от окружения
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSmartJobMatcher(BaseJobMatcher):
+    """
+    Асинхронный матчер вакансий и резюме.
+
+    Разделяет с SmartJobMatcher промпты, валидацию, fallback-значения и скоринг.
+    Запросы к Ollama выполняются через общий httpx.AsyncClient, число
+    одновременных запросов ограничено семафором (ollama.max_concurrency
+    на каждый сервер из ollama.urls).
+    """
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        ollama_model: Optional[str] = None,
+        ollama_url: Optional[str] = None,
+        timeout: Optional[int] = None
+    ):
+        """
+        Инициализация асинхронного матчера.
+
+        Проверка доступности Ollama не выполняется в конструкторе —
+        используйте `await matcher.check_ollama_availability()` или
+        `async with AsyncSmartJobMatcher() as matcher`.
+
+        Args:
+            config: Объект конфигурации (если None, используются настройки по умолчанию)
+            ollama_model: Название модели Ollama (переопределяет config)
+            ollama_url: URL Ollama API (переопределяет config)
+            timeout: Таймаут для запросов к LLM в секундах (переопределяет config)
+        """
+        if httpx is None:
+            raise ImportError("Для AsyncSmartJobMatcher требуется httpx: pip install httpx")
+
+        super().__init__(config, ollama_model, ollama_url, timeout)
+
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            )
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+        logger.info(f"Инициализирован AsyncSmartJobMatcher с моделью {self.ollama_model}")
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Семафор, ограничивающий число одновременных запросов к Ollama."""
+        # Создаётся лениво, чтобы привязаться к работающему event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _probe_endpoint(self, endpoint: Endpoint) -> bool:
+        """Проверка /api/tags одного сервера; результат учитывается балансировщиком."""
+        try:
+            response = await self.client.get(endpoint.tags_url, timeout=5)
+            available = response.status_code == 200
+            if not available:
+                logger.warning(f"⚠ Ollama сервер {endpoint.url} вернул статус {response.status_code}")
+        except httpx.HTTPError as e:
+            logger.error(f"✗ Ollama сервер {endpoint.url} недоступен: {e}")
+            available = False
+
+        self.balancer.record_probe(endpoint, available)
+        return available
+
+    async def check_ollama_availability(self) -> bool:
+        """Проверка доступности серверов Ollama."""
+        available = await asyncio.gather(
+            *(self._probe_endpoint(endpoint) for endpoint in self.balancer.endpoints)
+        )
+        if any(available):
+            logger.info(f"✓ Ollama сервер доступен ({sum(available)}/{len(available)})")
+            return True
+
+        logger.error("Убедитесь, что Ollama запущен: ollama serve")
+        return False
+
+    def start_health_checks(self) -> None:
+        """
+        Запускает фоновую проверку серверов (раз в ollama.balancer.health_interval секунд).
+
+        Вызывается автоматически в `async with`, если серверов несколько.
+        """
+        if self._health_task is None and self.health_interval > 0:
+            self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await asyncio.gather(
+                *(self._probe_endpoint(endpoint) for endpoint in self.balancer.endpoints)
+            )
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Стоит ли повторять запрос: таймауты, ошибки соединения, ответы 5xx и 429, тело без response."""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500 or error.response.status_code == 429
+        return isinstance(error, (httpx.TransportError, MalformedResponseError))
+
+    async def _query_llm(
+        self,
+        prompt: str,
+        stage: Optional[StageMetrics] = None,
+        purpose: str = "llm"
+    ) -> str:
+        """
+        Асинхронный запрос к LLM через Ollama.
+
+        Повторы и circuit breaker — как в SmartJobMatcher._query_llm;
+        на время задержки перед повтором семафор освобождается.
+
+        Args:
+            prompt: Текст запроса
+            stage: Метрики этапа, в которые записывается запрос
+            purpose: Назначение запроса для stream_callback
+
+        Returns:
+            Ответ от LLM в формате JSON строки
+
+        Raises:
+            LLMUnavailableError: Ответ не получен или circuit breaker разомкнут
+        """
+        payload = self._build_llm_payload(prompt)
+        attempts = self.retry_policy.max_attempts
+
+        for attempt in range(1, attempts + 1):
+            if not self.circuit_breaker.allow():
+                if stage is not None:
+                    stage.increment('circuit_open')
+                raise LLMUnavailableError("Circuit breaker разомкнут: LLM временно недоступен")
+
+            try:
+                result = await self._send_llm_request(payload, prompt, stage, purpose)
+            except Exception as e:
+                retryable = self._is_retryable(e)
+                if retryable:
+                    self.circuit_breaker.record_failure()
+                else:
+                    # Сервер ответил, ошибка не связана с его доступностью
+                    self.circuit_breaker.record_success()
+                if not retryable or attempt == attempts:
+                    raise LLMUnavailableError(f"Запрос к LLM не удался (попыток: {attempt}): {e}") from e
+
+                delay = self.retry_policy.delay(attempt)
+                logger.warning(f"Повтор запроса к LLM через {delay:.2f}с (попытка {attempt + 1}/{attempts})")
+                if stage is not None:
+                    stage.increment('retries')
+                await asyncio.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+    async def _send_llm_request(
+        self,
+        payload: Dict[str, Any],
+        prompt: str,
+        stage: Optional[StageMetrics],
+        purpose: str
+    ) -> str:
+        """Одна попытка запроса к серверу, выбранному балансировщиком."""
+        async with self.semaphore:
+            # Эндпоинт выбирается и время отсчитывается после ожидания семафора
+            endpoint = self.balancer.acquire()
+            endpoint_ok = True
+            start = time.perf_counter()
+
+            try:
+                logger.debug(f"Отправка запроса к LLM {endpoint.url} (длина промпта: {len(prompt)} символов)")
+                if self.stream:
+                    body = await self._query_llm_stream(endpoint.url, payload, purpose)
+                else:
+                    response = await self.client.post(endpoint.url, json=payload)
+                    response.raise_for_status()
+                    body = response.json()
+
+            except Exception as e:
+                if isinstance(e, httpx.TimeoutException):
+                    logger.error(f"Таймаут при запросе к LLM (>{self.timeout}с)")
+                    error = "timeout"
+                else:
+                    logger.error(f"Ошибка при запросе к LLM: {e}")
+                    error = str(e)
+                endpoint_ok = not isinstance(e, httpx.HTTPError)
+                if stage is not None:
+                    stage.record_llm_call(prompt, None, time.perf_counter() - start, error=error, endpoint=endpoint.url)
+                raise
+            finally:
+                self.balancer.release(endpoint, success=endpoint_ok)
+
+        if not isinstance(body, dict) or not isinstance(body.get('response'), str):
+            if stage is not None:
+                stage.record_llm_call(
+                    prompt, None, time.perf_counter() - start, error="no response field", endpoint=endpoint.url
+                )
+            raise MalformedResponseError(f"В ответе {endpoint.url} нет поля 'response'")
+
+        result = body['response']
+        logger.debug(f"Получен ответ от LLM (длина: {len(result)} символов)")
+        if stage is not None:
+            stage.record_llm_call(prompt, body, time.perf_counter() - start, endpoint=endpoint.url)
+        return result
+
+    async def _query_llm_stream(self, url: str, payload: Dict[str, Any], purpose: str) -> Dict[str, Any]:
+        """
+        Читает потоковый ответ Ollama до завершения JSON.
+
+        Args:
+            url: URL эндпоинта /api/generate
+            payload: Тело запроса со stream=True
+            purpose: Назначение запроса для stream_callback
+
+        Returns:
+            Тело ответа в формате нестримингового /api/generate
+        """
+        tracker = JsonStreamTracker()
+        # Выход из async with закрывает соединение, и Ollama прекращает генерацию
+        async with self.client.stream("POST", url, json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                body = self._feed_stream_line(line, tracker, purpose)
+                if body is not None:
+                    return body
+        return {'response': tracker.text}
+
+    async def _parse_text_with_llm(
+        self,
+        text: str,
+        is_job: bool = True,
+        metrics: Optional[MatchMetrics] = None
+    ) -> Dict[str, Any]:
+        """
+        Использует LLM для извлечения структурированной информации из текста.
+
+        Args:
+            text: Текст вакансии или резюме
+            is_job: True для вакансии, False для резюме
+            metrics: Сборщик метрик операции (этап job_parse/resume_parse)
+
+        Returns:
+            Словарь с распарсенными данными
+        """
+        stage_name = "job_parse" if is_job else "resume_parse"
+        with timed_stage(metrics, stage_name) as stage:
+            parsed_data, cache_key = await asyncio.to_thread(self._lookup_parsed, text, is_job, stage)
+            if parsed_data is not None:
+                return parsed_data
+            return await self._parse_uncached(text, is_job, cache_key, stage)
+
+    async def _parse_uncached(
+        self,
+        text: str,
+        is_job: bool,
+        cache_key: Optional[str],
+        stage: Optional[StageMetrics]
+    ) -> Dict[str, Any]:
+        """Парсит документ отдельным запросом к LLM (быстрый разбор и кэш уже проверены)."""
+        purpose = "job_parse" if is_job else "resume_parse"
+        try:
+            raw_response = await self._query_llm(self._build_parse_prompt(text, is_job), stage, purpose)
+        except Exception as e:
+            logger.error(f"Ошибка при парсинге текста: {e}")
+            if stage is not None:
+                stage.increment('fallbacks')
+            return self._get_degraded_parsed_data()
+
+        return await asyncio.to_thread(self._handle_parse_response, raw_response, is_job, cache_key, stage, text)
+
+    async def _parse_pair(
+        self,
+        job_text: str,
+        resume_text: str,
+        metrics: Optional[MatchMetrics] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Парсит вакансию и резюме одним запросом к LLM (ollama.combined_parse).
+
+        Общая инструкция промпта обрабатывается моделью один раз вместо двух.
+        Документы из кэша или быстрого разбора в запрос не входят: если
+        известен один из них, второй парсится обычным промптом.
+
+        Args:
+            job_text: Текст вакансии
+            resume_text: Текст резюме
+            metrics: Сборщик метрик операции (этап pair_parse)
+
+        Returns:
+            Кортеж (данные вакансии, данные резюме)
+        """
+        with timed_stage(metrics, "pair_parse") as stage:
+            job_data, job_key = await asyncio.to_thread(self._lookup_parsed, job_text, True, stage)
+            resume_data, resume_key = await asyncio.to_thread(self._lookup_parsed, resume_text, False, stage)
+
+            if job_data is None and resume_data is None:
+                prompt = self._build_pair_parse_prompt(job_text, resume_text)
+                try:
+                    raw_response = await self._query_llm(prompt, stage, "pair_parse")
+                except Exception as e:
+                    logger.error(f"Ошибка при совместном парсинге: {e}")
+                    if stage is not None:
+                        stage.increment('fallbacks', 2)
+                    return self._get_degraded_parsed_data(), self._get_degraded_parsed_data()
+                return await asyncio.to_thread(
+                    self._handle_pair_parse_response,
+                    raw_response, job_key, resume_key, stage, job_text, resume_text
+                )
+
+            if job_data is None:
+                job_data = await self._parse_uncached(job_text, True, job_key, stage)
+            if resume_data is None:
+                resume_data = await self._parse_uncached(resume_text, False, resume_key, stage)
+            return job_data, resume_data
+
+    async def _generate_human_feedback(
+        self,
+        report: Dict[str, Any],
+        score: int,
+        stage: Optional[StageMetrics] = None
+    ) -> str:
+        """
+        Генерирует дружелюбный фидбэк для пользователя на основе структурированного отчёта.
+
+        Args:
+            report: Отчёт с деталями соответствия
+            score: Итоговый скор
+            stage: Метрики этапа feedback
+
+        Returns:
+            Текстовый фидбэк
+        """
+        if self.feedback_engine == "template":
+            return build_template_feedback(report, score)
+
+        cache_key = self._feedback_cache_key(report, score)
+        cached = self._get_cached_feedback(cache_key, stage)
+        if cached is not None:
+            return cached
+
+        try:
+            raw_feedback = await self._query_llm(self._build_feedback_prompt(report, score), stage, "feedback")
+            feedback = self._handle_feedback_response(raw_feedback, score)
+            if raw_feedback.strip('"\n {}'):
+                if cache_key is not None:
+                    self.feedback_cache.set(cache_key, feedback)
+            elif stage is not None:
+                stage.increment('fallbacks')
+            return feedback
+
+        except Exception as e:
+            logger.error(f"Ошибка при генерации фидбэка: {e}")
+            if stage is not None:
+                stage.increment('fallbacks')
+            return self._get_default_feedback(score)
+
+    async def generate_feedback_batch(
+        self,
+        results: List[Dict[str, Any]],
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Генерирует фидбэк только для лучших результатов, параллельно.
+
+        Args:
+            results: Результаты match() (например, с generate_feedback=False)
+            top_k: Для скольких лучших по скору результатов генерировать фидбэк
+                (если None — для всех)
+
+        Returns:
+            Отобранные результаты по убыванию скора с заполненным 'feedback'
+        """
+        shortlisted = self._select_for_feedback(results, top_k)
+        logger.info(f"💬 Генерация фидбэка для {len(shortlisted)} из {len(results)} результатов...")
+
+        feedbacks = await asyncio.gather(*(
+            self._generate_human_feedback(result['report'], result['score'])
+            for result in shortlisted
+        ))
+        for result, feedback in zip(shortlisted, feedbacks):
+            self._store_feedback(result, feedback)
+
+        return shortlisted
+
+    async def match(
+        self,
+        job_description: str,
+        resume_text: str,
+        generate_feedback: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Асинхронное сопоставление вакансии и резюме.
+
+        Args:
+            job_description: Текст описания вакансии
+            resume_text: Текст резюме
+            generate_feedback: Генерировать ли текстовый фидбэк
+
+        Returns:
+            Словарь с результатами анализа (формат как у SmartJobMatcher.match)
+        """
+        logger.info("Начало асинхронного анализа совместимости")
+
+        metrics = self._new_metrics()
+
+        try:
+            if self.combined_parse:
+                job_data, resume_data = await self._parse_pair(job_description, resume_text, metrics)
+            else:
+                job_data, resume_data = await asyncio.gather(
+                    self._parse_text_with_llm(job_description, is_job=True, metrics=metrics),
+                    self._parse_text_with_llm(resume_text, is_job=False, metrics=metrics)
+                )
+
+            with timed_stage(metrics, "scoring"):
+                result = self._calculate_score(job_data, resume_data)
+            self._mark_degraded(result, job_data, resume_data)
+
+            if generate_feedback:
+                with timed_stage(metrics, "feedback") as stage:
+                    result['feedback'] = await self._generate_human_feedback(
+                        result['report'],
+                        result['score'],
+                        stage
+                    )
+
+            self._attach_debug(result, job_data, resume_data)
+
+            logger.info("✓ Асинхронный анализ завершён успешно")
+
+        except Exception as e:
+            logger.error(f"Критическая ошибка при анализе: {e}", exc_info=True)
+            result = self._build_error_result(e)
+
+        self._publish_metrics(metrics, result)
+        return result
+
+    async def _parse_many(
+        self,
+        texts: List[str],
+        is_job: bool,
+        groups: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Парсит список документов, обращаясь к LLM один раз на каждый уникальный текст.
+
+        При dedup.enabled почти-дубликаты пакета ждут результата первого
+        документа своей группы (см. _parse_rounds).
+
+        Args:
+            texts: Тексты вакансий или резюме
+            is_job: True для вакансий, False для резюме
+            groups: Готовые группы почти-дубликатов texts
+
+        Returns:
+            Список распарсенных данных в порядке входных текстов
+        """
+        parsed_by_text: Dict[str, Dict[str, Any]] = {}
+        for batch in await asyncio.to_thread(self._parse_rounds, texts, is_job, groups):
+            parsed = await asyncio.gather(
+                *(self._parse_text_with_llm(text, is_job=is_job) for text in batch)
+            )
+            parsed_by_text.update(zip(batch, parsed))
+        return [parsed_by_text[text] for text in texts]
+
+    async def match_many(
+        self,
+        jobs: List[str],
+        resumes: List[str],
+        include_reports: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Асинхронное сопоставление каждой вакансии с каждым резюме (матрица N×M).
+
+        Args:
+            jobs: Тексты вакансий (N)
+            resumes: Тексты резюме (M)
+            include_reports: Включить ли детальные отчёты по каждой паре
+
+        Returns:
+            Словарь с матрицей скоров N×M ('scores') и, если запрошено,
+            матрицами отчётов ('reports') и компонентов скора ('components')
+        """
+        logger.info(f"Асинхронный пакетный анализ: {len(jobs)} вакансий × {len(resumes)} резюме")
+
+        resume_groups = None
+        if self.dedup is not None:
+            resume_groups = await asyncio.to_thread(self._near_duplicate_groups, resumes, False)
+        jobs_data, resumes_data = await asyncio.gather(
+            self._parse_many(jobs, is_job=True),
+            self._parse_many(resumes, is_job=False, groups=resume_groups)
+        )
+
+        return await asyncio.to_thread(
+            self._build_matrix_result, jobs_data, resumes_data, include_reports, resume_groups
+        )
+
+    async def close(self) -> None:
+        """Закрывает HTTP-клиент и дисковый кэш."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        await self.client.aclose()
+        if self.parse_cache is not None:
+            self.parse_cache.close()
+        if self.metrics_sink is not None:
+            self.metrics_sink.close()
+        if self._result_store is not None:
+            self._result_store.close()
+        if self.skill_similarity is not None:
+            self.skill_similarity.save()
+
+    async def __aenter__(self) -> "AsyncSmartJobMatcher":
+        await self.check_ollama_availability()
+        if len(self.balancer) > 1:
+            self.start_health_checks()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
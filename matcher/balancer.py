@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Клиентская балансировка запросов между несколькими серверами Ollama.
+
+Стратегии: наименьшее число выполняющихся запросов с учётом веса
+(least_outstanding) и плавный взвешенный round-robin (weighted_round_robin).
+Эндпоинт исключается из ротации после ollama.balancer.max_failures ошибок
+подряд и возвращается после успешной проверки /api/tags.
+"""
+
+import logging
+import threading
+from typing import Dict, Any, List, Union
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("least_outstanding", "weighted_round_robin")
+
+
+class Endpoint:
+    """Сервер Ollama и его состояние."""
+
+    def __init__(self, url: str, weight: float = 1):
+        """
+        Args:
+            url: URL эндпоинта /api/generate
+            weight: Относительная производительность сервера
+        """
+        if weight <= 0:
+            raise ValueError(f"Вес эндпоинта должен быть положительным: {url}")
+
+        self.url = url
+        self.weight = weight
+        self.healthy = True
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self._current_weight = 0.0
+
+    @property
+    def tags_url(self) -> str:
+        """URL проверки доступности /api/tags."""
+        return self.url.replace('/api/generate', '/api/tags')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'url': self.url,
+            'weight': self.weight,
+            'healthy': self.healthy,
+            'outstanding': self.outstanding,
+            'consecutive_failures': self.consecutive_failures,
+            'requests': self.requests,
+            'failures': self.failures
+        }
+
+    def __repr__(self) -> str:
+        state = "healthy" if self.healthy else "ejected"
+        return f"Endpoint({self.url!r}, weight={self.weight}, {state})"
+
+
+class LoadBalancer:
+    """Потокобезопасный выбор эндпоинта для очередного запроса."""
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        strategy: str = "least_outstanding",
+        max_failures: int = 3
+    ):
+        """
+        Args:
+            endpoints: Серверы Ollama
+            strategy: 'least_outstanding' или 'weighted_round_robin'
+            max_failures: После скольких ошибок подряд эндпоинт исключается
+        """
+        if not endpoints:
+            raise ValueError("Не задан ни один эндпоинт Ollama")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Неизвестная стратегия балансировки: {strategy}")
+
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.max_failures = max(1, max_failures)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_urls(
+        cls,
+        urls: List[Union[str, Dict[str, Any]]],
+        strategy: str = "least_outstanding",
+        max_failures: int = 3
+    ) -> "LoadBalancer":
+        """
+        Создаёт балансировщик из списка URL.
+
+        Args:
+            urls: Строки URL или словари {"url": ..., "weight": ...}
+            strategy: Стратегия балансировки
+            max_failures: Порог исключения эндпоинта
+
+        Returns:
+            LoadBalancer
+        """
+        endpoints = []
+        for item in urls:
+            if isinstance(item, str):
+                endpoints.append(Endpoint(item))
+            else:
+                endpoints.append(Endpoint(item['url'], item.get('weight', 1)))
+        return cls(endpoints, strategy, max_failures)
+
+    def _candidates(self) -> List[Endpoint]:
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        if healthy:
+            return healthy
+        # Все эндпоинты исключены: продолжаем пробовать все, а не отказываем сразу
+        return self.endpoints
+
+    def acquire(self) -> Endpoint:
+        """
+        Выбирает эндпоинт и учитывает запрос как выполняющийся.
+
+        После завершения запроса обязательно вызовите release().
+
+        Returns:
+            Выбранный эндпоинт
+        """
+        with self._lock:
+            candidates = self._candidates()
+
+            if self.strategy == "weighted_round_robin":
+                # Плавный взвешенный round-robin (как в nginx)
+                total = sum(endpoint.weight for endpoint in candidates)
+                for endpoint in candidates:
+                    endpoint._current_weight += endpoint.weight
+                chosen = max(candidates, key=lambda endpoint: endpoint._current_weight)
+                chosen._current_weight -= total
+            else:
+                # Минимум выполняющихся запросов на единицу веса; при равенстве —
+                # по кругу, чтобы нагрузка без очереди тоже распределялась
+                offset = self._next % len(candidates)
+                rotated = candidates[offset:] + candidates[:offset]
+                chosen = min(rotated, key=lambda endpoint: endpoint.outstanding / endpoint.weight)
+                self._next += 1
+
+            chosen.outstanding += 1
+            chosen.requests += 1
+            return chosen
+
+    def release(self, endpoint: Endpoint, success: bool) -> None:
+        """
+        Завершает запрос к эндпоинту.
+
+        Args:
+            endpoint: Эндпоинт из acquire()
+            success: Успешен ли запрос (ошибки сети, таймауты и 5xx — неуспех)
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            self._record(endpoint, success)
+
+    def record_probe(self, endpoint: Endpoint, success: bool) -> None:
+        """Учитывает результат проверки доступности /api/tags."""
+        with self._lock:
+            self._record(endpoint, success)
+
+    def _record(self, endpoint: Endpoint, success: bool) -> None:
+        if success:
+            if not endpoint.healthy:
+                logger.info(f"✓ Эндпоинт {endpoint.url} снова доступен")
+            endpoint.healthy = True
+            endpoint.consecutive_failures = 0
+            return
+
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.healthy and endpoint.consecutive_failures >= self.max_failures:
+            endpoint.healthy = False
+            logger.warning(
+                f"⚠ Эндпоинт {endpoint.url} исключён после {endpoint.consecutive_failures} ошибок подряд"
+            )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Состояние всех эндпоинтов."""
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self.endpoints]
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def __repr__(self) -> str:
+        return f"LoadBalancer({self.strategy}, endpoints={self.endpoints})"
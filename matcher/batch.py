@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Потоковый пакетный прогон SmartJobMatcher по JSONL файлам.
+
+Вакансии загружаются в память целиком (их обычно немного), резюме читаются
+построчно из файла или stdin. Результат каждой пары сразу дописывается в
+выходной JSONL. Выходной файл служит чекпоинтом: при повторном запуске
+уже посчитанные пары пропускаются.
+
+Пример:
+    python -m matcher.batch --jobs jobs.jsonl --resumes resumes.jsonl --output results.jsonl
+    cat resumes.jsonl | python -m matcher.batch --jobs jobs.jsonl --resumes - --output results.jsonl
+
+Формат входных строк: {"id": "...", "text": "..."} (вместо "text" допускается "description").
+Выходные строки содержат 'components', поэтому их можно пересчитать с
+другими весами через SmartJobMatcher.rescore без повторного прогона.
+С --store результаты также добавляются в ResultStore (по транзакции на пачку).
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .config import Config
+from .core import SmartJobMatcher
+from .store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Построчно читает документы из JSONL файла или stdin ("-").
+
+    Args:
+        path: Путь к файлу или "-" для stdin
+
+    Yields:
+        Словари с полями 'id' и 'text'
+    """
+    stream = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8')
+    try:
+        for line_no, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"{path}:{line_no}: невалидный JSON, строка пропущена ({e})")
+                continue
+
+            text = record.get('text') or record.get('description')
+            if not text:
+                logger.warning(f"{path}:{line_no}: нет поля 'text', строка пропущена")
+                continue
+
+            yield {'id': str(record.get('id', line_no)), 'text': text}
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def load_completed_pairs(output_path: str) -> Set[Tuple[str, str]]:
+    """
+    Читает уже посчитанные пары из выходного файла прошлого запуска.
+
+    Недописанная последняя строка (без перевода строки — обрыв при записи)
+    отрезается, чтобы новые записи начинались с новой строки. Повреждённые
+    строки в середине файла пропускаются с предупреждением и удаляются из
+    файла вместе с устаревшими записями. Пары с пометкой
+    degraded не считаются посчитанными: их строки удаляются из файла, а
+    при продолжении прогона пары пересчитываются и дописываются заново —
+    в файле остаётся одна запись на пару.
+
+    Args:
+        output_path: Путь к выходному JSONL
+
+    Returns:
+        Множество пар (job_id, resume_id)
+    """
+    path = Path(output_path)
+    completed: Set[Tuple[str, str]] = set()
+    if not path.exists():
+        return completed
+
+    # Последняя запись каждой пары: смещение строки в файле
+    latest: Dict[Tuple[str, str], int] = {}
+    lines = 0
+    valid_size = 0
+    with open(path, 'rb') as f:
+        for line_no, raw_line in enumerate(f, 1):
+            if not raw_line.endswith(b'\n'):
+                break
+            offset = valid_size
+            lines += 1
+            valid_size += len(raw_line)
+            try:
+                record = json.loads(raw_line)
+                pair = (str(record['job_id']), str(record['resume_id']))
+            except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+                logger.warning(f"{output_path}:{line_no}: повреждённая запись пропущена")
+                continue
+            if record.get('degraded'):
+                completed.discard(pair)
+                latest.pop(pair, None)
+            else:
+                completed.add(pair)
+                latest[pair] = offset
+
+    if valid_size < path.stat().st_size:
+        logger.warning(f"Обнаружена недописанная запись в {output_path}, она будет отброшена")
+        with open(path, 'r+b') as f:
+            f.truncate(valid_size)
+
+    if len(latest) < lines:
+        _compact(path, set(latest.values()))
+
+    return completed
+
+
+def _compact(path: Path, offsets: Set[int]) -> None:
+    """Переписывает файл, оставляя только строки с указанными смещениями."""
+    temporary = path.with_name(path.name + ".tmp")
+    with open(path, 'rb') as source, open(temporary, 'wb') as target:
+        offset = 0
+        for raw_line in source:
+            if offset in offsets:
+                target.write(raw_line)
+            offset += len(raw_line)
+    os.replace(temporary, path)
+    logger.info(f"Из {path} удалены устаревшие записи (degraded, повторные и повреждённые)")
+
+
+def _chunks(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Разбивает поток документов на пачки фиксированного размера."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(
+    matcher: SmartJobMatcher,
+    jobs: List[Dict[str, Any]],
+    resumes: Iterable[Dict[str, Any]],
+    output_path: str,
+    resume: bool = True,
+    generate_feedback: bool = False,
+    chunk_size: Optional[int] = None,
+    store: Optional[ResultStore] = None
+) -> Dict[str, int]:
+    """
+    Сопоставляет все вакансии с потоком резюме и дописывает результаты в JSONL.
+
+    Args:
+        matcher: Экземпляр SmartJobMatcher
+        jobs: Вакансии [{'id', 'text'}]
+        resumes: Поток резюме [{'id', 'text'}]
+        output_path: Путь к выходному JSONL
+        resume: Продолжить прерванный прогон (пропустить пары из output_path)
+        generate_feedback: Генерировать ли текстовый фидбэк для каждой пары
+        chunk_size: Сколько резюме парсить параллельно за раз
+        store: Хранилище, в которое дополнительно пишутся результаты
+
+    Returns:
+        Статистика: записано пар, пропущено пар, из записанных — degraded
+    """
+    completed = load_completed_pairs(output_path) if resume else set()
+    if completed:
+        logger.info(f"Продолжение прогона: {len(completed)} пар уже посчитано")
+
+    chunk_size = chunk_size or matcher.max_concurrency * 4
+    stats = {'written': 0, 'skipped': 0, 'degraded': 0}
+
+    logger.info(f"📋 Парсинг {len(jobs)} вакансий...")
+    jobs_data = matcher._parse_many([job['text'] for job in jobs], is_job=True)
+
+    mode = 'a' if resume else 'w'
+    with open(output_path, mode, encoding='utf-8') as out:
+        for chunk in _chunks(resumes, chunk_size):
+            # Резюме, у которых все пары уже посчитаны, не парсим повторно
+            pending = [
+                resume_doc for resume_doc in chunk
+                if any((job['id'], resume_doc['id']) not in completed for job in jobs)
+            ]
+            stats['skipped'] += (len(chunk) - len(pending)) * len(jobs)
+            if not pending:
+                continue
+
+            resumes_data = matcher._parse_many([doc['text'] for doc in pending], is_job=False)
+            records = []
+
+            for resume_doc, resume_data in zip(pending, resumes_data):
+                for job, job_data in zip(jobs, jobs_data):
+                    if (job['id'], resume_doc['id']) in completed:
+                        stats['skipped'] += 1
+                        continue
+
+                    result = matcher._calculate_score(job_data, resume_data)
+                    degraded = bool(job_data.get('degraded') or resume_data.get('degraded'))
+                    record = {
+                        'job_id': job['id'],
+                        'resume_id': resume_doc['id'],
+                        'score': result['score'],
+                        'report': result['report'],
+                        'components': result['components'],
+                        'degraded': degraded
+                    }
+                    if generate_feedback:
+                        record['feedback'] = matcher._generate_human_feedback(
+                            result['report'],
+                            result['score']
+                        )
+
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    records.append(record)
+                    completed.add((job['id'], resume_doc['id']))
+                    stats['written'] += 1
+                    stats['degraded'] += degraded
+
+            out.flush()
+            if store is not None:
+                # При продолжении прогона degraded-результаты прошлого запуска заменяются новыми
+                store.add_many(records, replace_degraded=resume)
+            logger.info(f"Записано пар: {stats['written']} (пропущено: {stats['skipped']})")
+
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа CLI: python -m matcher.batch."""
+    parser = argparse.ArgumentParser(
+        prog="python -m matcher.batch",
+        description="Потоковое сопоставление вакансий и резюме из JSONL файлов"
+    )
+    parser.add_argument("--jobs", required=True, help="JSONL файл с вакансиями")
+    parser.add_argument("--resumes", required=True, help="JSONL файл с резюме или '-' для stdin")
+    parser.add_argument("--output", required=True, help="Выходной JSONL файл (он же чекпоинт)")
+    parser.add_argument("--config", help="Путь к config.json")
+    parser.add_argument("--feedback", action="store_true", help="Генерировать текстовый фидбэк")
+    parser.add_argument("--no-resume", action="store_true", help="Начать заново, перезаписав output")
+    parser.add_argument("--chunk-size", type=int, help="Сколько резюме парсить параллельно за раз")
+    parser.add_argument("--store", help="Также сохранять результаты в ResultStore (файл SQLite)")
+    args = parser.parse_args(argv)
+
+    config = Config(args.config) if args.config else Config()
+    logging.basicConfig(
+        level=config.get("logging.level", "INFO"),
+        format=config.get("logging.format")
+    )
+
+    jobs = list(read_jsonl(args.jobs))
+    if not jobs:
+        logger.error(f"В {args.jobs} нет ни одной вакансии")
+        return 1
+
+    store = ResultStore(args.store) if args.store else None
+    try:
+        with SmartJobMatcher(config=config) as matcher:
+            stats = run_batch(
+                matcher,
+                jobs,
+                read_jsonl(args.resumes),
+                args.output,
+                resume=not args.no_resume,
+                generate_feedback=args.feedback,
+                chunk_size=args.chunk_size,
+                store=store
+            )
+    finally:
+        if store is not None:
+            store.close()
+
+    logger.info(f"✓ Готово: записано {stats['written']} пар, пропущено {stats['skipped']}")
+    if stats['degraded']:
+        logger.warning(
+            f"⚠ {stats['degraded']} пар посчитано без ответа LLM (degraded); "
+            f"повторный запуск пересчитает их"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Кэш результатов парсинга для SmartJobMatcher.
+
+Ключ кэша — хэш нормализованного текста вместе с параметрами,
+влияющими на ответ LLM (тип документа, модель, температура, версия промпта).
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Нормализует текст документа для построения ключа кэша (схлопывает пробелы)."""
+    return " ".join(text.split())
+
+
+def make_cache_key(text: str, *parts: Any) -> str:
+    """
+    Строит ключ кэша по содержимому текста и дополнительным параметрам.
+
+    Args:
+        text: Исходный текст документа
+        *parts: Параметры, влияющие на результат (тип документа, модель и т.д.)
+
+    Returns:
+        SHA-256 хэш в виде hex-строки
+    """
+    hasher = hashlib.sha256()
+    hasher.update(normalize_text(text).encode('utf-8'))
+    for part in parts:
+        hasher.update(b'\x1f')
+        hasher.update(str(part).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+class ParseCache:
+    """
+    Двухуровневый кэш: LRU в памяти и опциональный SQLite на диске.
+
+    Значения должны сериализоваться в JSON. Все методы потокобезопасны.
+    """
+
+    def __init__(self, max_size: int = 1024, path: Optional[str] = None):
+        """
+        Инициализация кэша.
+
+        Args:
+            max_size: Максимальное число записей в памяти (0 — без in-memory уровня)
+            path: Путь к SQLite файлу (если None, кэш живёт только в памяти)
+        """
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str) -> None:
+        """Открывает (и при необходимости создаёт) SQLite хранилище."""
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            # timeout — ожидание блокировки, пока пишет другой процесс (файл
+            # общий для процессов-обработчиков); WAL не блокирует чтение записью
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Дисковый кэш парсинга: {path}")
+        except sqlite3.Error as e:
+            logger.error(f"Не удалось открыть дисковый кэш {path}: {e}")
+            self._db = None
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Получить значение из кэша.
+
+        Args:
+            key: Ключ кэша
+
+        Returns:
+            Закэшированное значение или None
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return json.loads(self._memory[key])
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value FROM parse_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    # Ошибка чтения — промах: документ распарсится заново
+                    logger.error(f"Ошибка чтения из дискового кэша: {e}")
+                    row = None
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.hits += 1
+                    return json.loads(row[0])
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Сохранить значение в кэш.
+
+        Args:
+            key: Ключ кэша
+            value: JSON-сериализуемое значение
+        """
+        serialized = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, serialized)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO parse_cache (key, value) VALUES (?, ?)",
+                        (key, serialized)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Ошибка записи в дисковый кэш: {e}")
+
+    def _remember(self, key: str, serialized: str) -> None:
+        """Кладёт значение в in-memory уровень с LRU вытеснением."""
+        if self.max_size <= 0:
+            return
+        self._memory[key] = serialized
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очистить оба уровня кэша."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM parse_cache")
+                self._db.commit()
+
+    def close(self) -> None:
+        """Закрыть соединение с дисковым хранилищем."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memory)
+
+    def __repr__(self) -> str:
+        return f"ParseCache(size={len(self)}, max_size={self.max_size}, path={self.path})"
@@ -20,9 +20,37 @@ class Config:
             "model": "llama3.2:3b",
             "url": "http://localhost:11434/api/generate",
             "timeout": 60,
-            "temperature": 0.1
+            "temperature": 0.1,
+            "max_concurrency": 4,
+            "stream": False,
+            "combined_parse": False,
+            "keep_alive": None,
+            "num_ctx": None,
+            "urls": [],
+            "balancer": {
+                "strategy": "least_outstanding",
+                "max_failures": 3,
+                "health_interval": 10
+            },
+            "retry": {
+                "max_attempts": 3,
+                "base_delay": 0.5,
+                "max_delay": 8,
+                "jitter": 0.5
+            },
+            "circuit_breaker": {
+                "failure_threshold": 5,
+                "reset_timeout": 30
+            }
         },
         "scoring": {
+            "engine": "python",
+            "fuzzy": {
+                "enabled": False,
+                "threshold": 0.55,
+                "weight": 0.5,
+                "path": None
+            },
             "weights": {
                 "education_match": 25,
                 "experience_match": 25,
@@ -30,6 +58,28 @@ class Config:
                 "soft_skills_match": 10
             }
         },
+        "cache": {
+            "enabled": True,
+            "max_size": 1024,
+            "path": None
+        },
+        "feedback": {
+            "engine": "llm"
+        },
+        "preparse": {
+            "enabled": False,
+            "min_confidence": 0.8
+        },
+        "dedup": {
+            "enabled": False,
+            "threshold": 0.9,
+            "num_perm": 128
+        },
+        "metrics": {
+            "enabled": True,
+            "sink": None,
+            "path": None
+        },
         "logging": {
             "level": "INFO",
             "file": "job_matcher.log",
@@ -39,6 +89,20 @@ class Config:
             "save_results": True,
             "results_dir": "results",
             "include_debug": True
+        },
+        "server": {
+            "host": "127.0.0.1",
+            "port": 8000,
+            "max_queue": 64,
+            "max_batch_pairs": 10000
+        },
+        "tasks": {
+            "path": "results/tasks.db",
+            "workers": 2,
+            "interactive_workers": 1,
+            "poll_interval": 0.5,
+            "webhook_timeout": 10,
+            "lease_timeout": 60
         }
     }
 
@@ -173,6 +237,11 @@ class Config:
         """Таймаут для запросов к Ollama (сек)."""
         return self.get("ollama.timeout")
 
+    @property
+    def ollama_max_concurrency(self) -> int:
+        """Максимальное число одновременных запросов к Ollama."""
+        return self.get("ollama.max_concurrency")
+
     @property
     def weights(self) -> Dict[str, int]:
         """Веса для скоринга."""
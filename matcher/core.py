@@ -7,22 +7,101 @@ SmartJobMatcher - Умный матчер вакансий и резюме на
 
 import json
 import logging
+import threading
+import time
 import requests
-from typing import Dict, Any, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
 from .config import Config
+from .dedup import NearDuplicateIndex
+from .balancer import Endpoint, LoadBalancer
+from .cache import ParseCache, make_cache_key
+from .feedback import build_template_feedback
+from .metrics import MatchMetrics, MetricsSink, StageMetrics, create_sink, timed_stage
+from .preparse import PreParser
+from .registry import DocumentRegistry
+from .similarity import SkillSimilarity
+from .skills import canonicalize_document, covered_skill_ids, document_skill_ids, skill_name
+from .resilience import CircuitBreaker, LLMUnavailableError, MalformedResponseError, RetryPolicy
+from .store import ResultStore
+from .streaming import JsonStreamTracker
 
 logger = logging.getLogger(__name__)
 
+# Версия промптов парсинга. Увеличивайте при изменении текста промпта,
+# чтобы не использовать закэшированные ответы старого промпта.
+PROMPT_VERSION = 2
 
-class SmartJobMatcher:
+# Общее начало всех промптов парсинга. Оно не зависит от документа, поэтому
+# Ollama переиспользует его KV-кэш и не вычисляет префикс заново: всё
+# переменное (тип документа и текст) идёт после него.
+PARSE_PREFIX = """
+Ты — эксперт по анализу HR-документов. Твоя задача — извлечь структурированную информацию из текста вакансии или резюме.
+
+Для каждого документа составь JSON-объект в следующем формате:
+{
+    "education": "Строка с описанием требуемого/имеющегося образования. Если не указано, верни пустую строку.",
+    "experience_years": ЧИСЛО (минимальный требуемый или фактический опыт в годах). Если не указано, верни 0,
+    "hard_skills": ["навык1", "навык2", ...], // Список всех упомянутых технических навыков, технологий, оборудования, методик, ПО
+    "soft_skills": ["качество1", "качество2", ...] // Список всех упомянутых личностных качеств
+}
+
+Для вакансии указывай требования к кандидату, для резюме — то, что есть у кандидата.
+Помни: твоя цель — точность и полнота, а не выдумывание. Если информации нет — оставляй поле пустым.
+"""
+
+
+class LazyFeedback:
     """
-    Класс для интеллектуального сопоставления вакансий и резюме.
+    Отложенный фидбэк: запрос к LLM выполняется только при первом обращении.
 
-    Использует LLM (через Ollama) для парсинга текста и собственный
-    детерминированный алгоритм для расчёта совместимости.
+    Значение вычисляется один раз; str(feedback) и feedback.get() возвращают текст.
+    """
+
+    def __init__(self, generate: Callable[[], str]):
+        """
+        Args:
+            generate: Функция, генерирующая текст фидбэка
+        """
+        self._generate = generate
+        self._text: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Был ли фидбэк уже сгенерирован."""
+        return self._text is not None
+
+    def get(self) -> str:
+        """Сгенерировать (при необходимости) и вернуть текст фидбэка."""
+        with self._lock:
+            if self._text is None:
+                self._text = self._generate()
+            return self._text
+
+    def set(self, text: str) -> None:
+        """Установить уже сгенерированный текст фидбэка."""
+        with self._lock:
+            self._text = text
+
+    def __str__(self) -> str:
+        return self.get()
+
+    def __repr__(self) -> str:
+        return f"LazyFeedback({self._text!r})" if self.ready else "LazyFeedback(<не сгенерирован>)"
+
+
+class BaseJobMatcher:
+    """
+    Общая часть синхронного и асинхронного матчеров.
+
+    Содержит конфигурацию, построение промптов, валидацию ответов LLM,
+    fallback-значения и детерминированный скоринг. Сетевые запросы
+    реализуются в наследниках.
     """
 
     def __init__(
@@ -50,108 +129,331 @@ class SmartJobMatcher:
         self.timeout = timeout or self.config.ollama_timeout
         self.weights = self.config.weights.copy()
 
-        logger.info(f"Инициализирован SmartJobMatcher с моделью {self.ollama_model}")
-
-        # Проверка доступности Ollama
-        self._check_ollama_availability()
+        # Серверы Ollama: явный ollama_url, иначе список ollama.urls, иначе ollama.url
+        urls = [self.ollama_url] if ollama_url else (self.config.get("ollama.urls") or [self.ollama_url])
+        self.balancer = LoadBalancer.from_urls(
+            urls,
+            strategy=self.config.get("ollama.balancer.strategy", "least_outstanding"),
+            max_failures=self.config.get("ollama.balancer.max_failures", 3)
+        )
+        self.ollama_url = self.balancer.endpoints[0].url
+        self.health_interval = float(self.config.get("ollama.balancer.health_interval", 10))
+
+        # Повторы при таймаутах и 5xx и circuit breaker на время недоступности Ollama
+        self.retry_policy = RetryPolicy(
+            max_attempts=self.config.get("ollama.retry.max_attempts", 3),
+            base_delay=self.config.get("ollama.retry.base_delay", 0.5),
+            max_delay=self.config.get("ollama.retry.max_delay", 8.0),
+            jitter=self.config.get("ollama.retry.jitter", 0.5)
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=self.config.get("ollama.circuit_breaker.failure_threshold", 5),
+            reset_timeout=self.config.get("ollama.circuit_breaker.reset_timeout", 30.0)
+        )
+
+        # ollama.max_concurrency задаётся на один сервер
+        self.max_concurrency = max(1, int(self.config.get("ollama.max_concurrency", 4))) * len(self.balancer)
+        self.feedback_engine = self.config.get("feedback.engine", "llm")
+
+        # Парсинг вакансии и резюме в match() одним запросом к LLM
+        self.combined_parse = bool(self.config.get("ollama.combined_parse", False))
+
+        # Быстрый разбор шаблонных документов без LLM
+        self.preparser: Optional[PreParser] = None
+        if self.config.get("preparse.enabled", False):
+            self.preparser = PreParser(min_confidence=self.config.get("preparse.min_confidence", 0.8))
+
+        # Частичный зачёт близких, но не совпавших по ID hard skills
+        self.skill_similarity: Optional[SkillSimilarity] = None
+        if self.config.get("scoring.fuzzy.enabled", False):
+            self.skill_similarity = SkillSimilarity(
+                threshold=self.config.get("scoring.fuzzy.threshold", 0.55),
+                weight=self.config.get("scoring.fuzzy.weight", 0.5),
+                path=self.config.get("scoring.fuzzy.path")
+            )
 
-    def _check_ollama_availability(self) -> bool:
-        """Проверка доступности Ollama сервера."""
-        try:
-            response = requests.get(
-                self.ollama_url.replace('/api/generate', '/api/tags'),
-                timeout=5
+        # Потоковый режим: ответ читается по чанкам и соединение закрывается,
+        # как только получен полный JSON. stream_callback(purpose, partial_text)
+        # вызывается на каждом чанке ('job_parse', 'resume_parse', 'feedback')
+        self.stream = bool(self.config.get("ollama.stream", False))
+        self.stream_callback: Optional[Callable[[str, str], None]] = None
+
+        # Время жизни модели в памяти Ollama ("10m", "1h", -1) и размер контекста;
+        # None — значения сервера по умолчанию
+        self.keep_alive = self.config.get("ollama.keep_alive")
+        self.num_ctx = self.config.get("ollama.num_ctx")
+
+        # Кэш результатов парсинга и кэш фидбэка (только в памяти)
+        self.parse_cache: Optional[ParseCache] = None
+        self.feedback_cache: Optional[ParseCache] = None
+        if self.config.get("cache.enabled", True):
+            self.parse_cache = ParseCache(
+                max_size=self.config.get("cache.max_size", 1024),
+                path=self.config.get("cache.path")
+            )
+            self.feedback_cache = ParseCache(max_size=self.config.get("cache.max_size", 1024))
+
+        # Почти-дубликаты уже распарсенных документов берутся из кэша парсинга
+        self.dedup: Optional[NearDuplicateIndex] = None
+        if self.config.get("dedup.enabled", False) and self.parse_cache is not None:
+            self.dedup = NearDuplicateIndex(
+                threshold=self.config.get("dedup.threshold", 0.9),
+                num_perm=self.config.get("dedup.num_perm", 128)
             )
-            if response.status_code == 200:
-                logger.info("✓ Ollama сервер доступен")
-                return True
-            else:
-                logger.warning(f"⚠ Ollama сервер вернул статус {response.status_code}")
-                return False
-        except requests.exceptions.RequestException as e:
-            logger.error(f"✗ Ollama сервер недоступен: {e}")
-            logger.error("Убедитесь, что Ollama запущен: ollama serve")
-            return False
 
-    def _query_llm(self, prompt: str) -> str:
-        """
-        Универсальный метод для запроса к LLM через Ollama.
+        # Метрики: прикладываются к результату под ключом 'metrics' и/или
+        # передаются в приёмник (можно заменить своим MetricsSink)
+        self.metrics_enabled = self.config.get("metrics.enabled", True)
+        self.metrics_sink: Optional[MetricsSink] = create_sink(self.config)
 
-        Args:
-            prompt: Текст запроса
+        # Хранилище результатов для save_result(); открывается при первом сохранении
+        self._result_store: Optional[ResultStore] = None
+        self._result_store_lock = threading.Lock()
+
+    def _build_llm_payload(self, prompt: str) -> Dict[str, Any]:
+        """Формирует тело запроса к Ollama /api/generate."""
+        options = {"temperature": self.config.get("ollama.temperature", 0.1)}
+        if self.num_ctx:
+            # Один размер контекста для всех запросов: при смене num_ctx Ollama
+            # перезагружает модель и теряет KV-кэш
+            options["num_ctx"] = self.num_ctx
 
-        Returns:
-            Ответ от LLM в формате JSON строки
-        """
         payload = {
             "model": self.ollama_model,
             "prompt": prompt,
-            "stream": False,
+            "stream": self.stream,
             "format": "json",
-            "options": {
-                "temperature": self.config.get("ollama.temperature", 0.1)
-            }
+            "options": options
         }
+        # Сколько модель остаётся в памяти после запроса (вместе с KV-кэшем префикса)
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
 
-        try:
-            logger.debug(f"Отправка запроса к LLM (длина промпта: {len(prompt)} символов)")
-            response = requests.post(
-                self.ollama_url,
-                json=payload,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-
-            result = response.json().get('response', '{}')
-            logger.debug(f"Получен ответ от LLM (длина: {len(result)} символов)")
-            return result
+    def _feed_stream_line(
+        self,
+        line: str,
+        tracker: JsonStreamTracker,
+        purpose: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Обрабатывает строку NDJSON потокового ответа Ollama.
 
-        except requests.exceptions.Timeout:
-            logger.error(f"Таймаут при запросе к LLM (>{self.timeout}с)")
-            return "{}"
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Ошибка при запросе к LLM: {e}")
-            return "{}"
-        except Exception as e:
-            logger.error(f"Неожиданная ошибка при запросе к LLM: {e}")
-            return "{}"
+        Args:
+            line: Строка потока
+            tracker: Накопитель ответа
+            purpose: Назначение запроса (передаётся в stream_callback)
 
-    def _parse_text_with_llm(self, text: str, is_job: bool = True) -> Dict[str, Any]:
+        Returns:
+            Итоговое тело ответа, если чтение можно прекратить, иначе None
         """
-        Использует LLM для извлечения структурированной информации из текста.
+        if not line.strip():
+            return None
+
+        chunk = json.loads(line)
+        if 'error' in chunk:
+            raise RuntimeError(f"Ollama вернул ошибку: {chunk['error']}")
+
+        complete = tracker.feed(chunk.get('response', ''))
+        if self.stream_callback is not None:
+            self.stream_callback(purpose, tracker.text)
+
+        if chunk.get('done'):
+            return dict(chunk, response=tracker.text)
+        if complete:
+            # Ollama присылает счётчики токенов только в последнем чанке;
+            # при досрочном закрытии число чанков примерно равно числу токенов
+            logger.debug(f"JSON получен полностью после {tracker.chunks} чанков, поток закрыт досрочно")
+            return {'response': tracker.text, 'eval_count': tracker.chunks, 'early_stop': True}
+        return None
+
+    def _parse_cache_key(self, text: str, is_job: bool) -> Optional[str]:
+        """Ключ кэша парсинга (None, если кэш отключён)."""
+        if self.parse_cache is None:
+            return None
+        return make_cache_key(
+            text,
+            "job" if is_job else "resume",
+            self.ollama_model,
+            self.config.get("ollama.temperature", 0.1),
+            PROMPT_VERSION
+        )
+
+    def _get_cached_parse(
+        self,
+        cache_key: Optional[str],
+        is_job: bool,
+        stage: Optional[StageMetrics] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Результат парсинга из кэша (None при промахе или отключённом кэше)."""
+        if cache_key is None:
+            return None
+
+        cached = self.parse_cache.get(cache_key)
+        if stage is not None:
+            stage.increment('cache_hits' if cached is not None else 'cache_misses')
+        if cached is not None:
+            self.register_skills(cached)
+            doc_type = "вакансии" if is_job else "резюме кандидата"
+            logger.info(f"Использован кэш парсинга для {doc_type}")
+        return cached
+
+    def _preparse(
+        self,
+        text: str,
+        is_job: bool,
+        stage: Optional[StageMetrics] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Результат разбора без LLM (None, если он отключён или не уверен)."""
+        if self.preparser is None:
+            return None
+
+        parsed_data = self.preparser.try_parse(text, is_job)
+        if parsed_data is not None:
+            canonicalize_document(parsed_data)
+            self.register_skills(parsed_data)
+        if stage is not None:
+            stage.increment('preparse_hits' if parsed_data is not None else 'preparse_misses')
+        if parsed_data is not None:
+            doc_type = "вакансии" if is_job else "резюме кандидата"
+            logger.info(f"Текст {doc_type} разобран без LLM")
+        return parsed_data
+
+    def register_skills(self, data: Dict[str, Any]) -> None:
+        """
+        Добавляет hard skills документа в таблицу сходства (scoring.fuzzy).
+
+        Документы, распарсенные матчером, регистрируются при парсинге и при
+        чтении из кэша; _calculate_score таблицу не меняет. Для данных,
+        полученных иначе, вызовите этот метод до скоринга.
 
         Args:
-            text: Текст вакансии или резюме
-            is_job: True для вакансии, False для резюме
+            data: Распарсенные данные документа
+        """
+        if self.skill_similarity is not None:
+            self.skill_similarity.add(covered_skill_ids(data, 'hard_skills'))
+
+    def _lookup_parsed(
+        self,
+        text: str,
+        is_job: bool,
+        stage: Optional[StageMetrics] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Ищет результат парсинга без обращения к LLM: быстрый разбор, затем кэш.
 
         Returns:
-            Словарь с распарсенными данными
+            Кортеж (данные или None, ключ кэша парсинга)
         """
+        preparsed = self._preparse(text, is_job, stage)
+        if preparsed is not None:
+            return preparsed, None
+
+        cache_key = self._parse_cache_key(text, is_job)
+        parsed_data = self._get_cached_parse(cache_key, is_job, stage)
+        if self.dedup is not None:
+            if parsed_data is None:
+                parsed_data = self._find_near_duplicate(text, is_job, cache_key, stage)
+            else:
+                # Кэш мог остаться от прошлого запуска (cache.path): документ
+                # становится образцом для почти-дубликатов
+                self.dedup.add(text, "job" if is_job else "resume", cache_key)
+        return parsed_data, cache_key
+
+    def _find_near_duplicate(
+        self,
+        text: str,
+        is_job: bool,
+        cache_key: str,
+        stage: Optional[StageMetrics] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Результат парсинга почти-дубликата текста из кэша (None, если его нет).
+
+        Найденный результат сохраняется и под cache_key, с полем
+        duplicate_of — ключом кэша исходного документа. В индекс документы
+        добавляются только после сохранения результата в кэш
+        (_handle_parse_response), поэтому найденный ключ всегда есть в кэше,
+        пока его не вытеснили.
+        """
+        found = self.dedup.find(text, "job" if is_job else "resume")
+        cached = self.parse_cache.get(found[0]) if found is not None and found[0] != cache_key else None
+        if cached is None:
+            return None
+
+        parsed_data = dict(cached, duplicate_of=cached.get('duplicate_of', found[0]))
+        self.register_skills(parsed_data)
+        self.parse_cache.set(cache_key, parsed_data)
+        self.dedup.record_duplicate()
+        if stage is not None:
+            stage.increment('near_duplicates')
         doc_type = "вакансии" if is_job else "резюме кандидата"
+        logger.info(f"📋 Текст {doc_type} — почти-дубликат распарсенного (сходство {found[1]:.2f}), LLM не вызывается")
+        return parsed_data
 
-        prompt = f"""
-Ты — эксперт по анализу HR-документов. Твоя задача — извлечь структурированную информацию из текста {doc_type}.
+    def _build_parse_prompt(self, text: str, is_job: bool) -> str:
+        """Строит промпт для извлечения структурированных данных из документа (PARSE_PREFIX + документ)."""
+        doc_type = "вакансия" if is_job else "резюме кандидата"
 
-Проанализируй текст и верни ТОЛЬКО JSON в следующем формате:
-{{
-    "education": "Строка с описанием требуемого/имеющегося образования. Если не указано, верни пустую строку.",
-    "experience_years": ЧИСЛО (минимальный требуемый или фактический опыт в годах). Если не указано, верни 0,
-    "hard_skills": ["навык1", "навык2", ...], // Список всех упомянутых технических навыков, технологий, оборудования, методик, ПО
-    "soft_skills": ["качество1", "качество2", ...] // Список всех упомянутых личностных качеств
-}}
+        return PARSE_PREFIX + f"""
+Верни ТОЛЬКО JSON-объект для документа ниже.
 
+Тип документа: {doc_type}
 Текст:
 {text}
+"""
 
-Помни: твоя цель — точность и полнота, а не выдумывание. Если информации нет — оставляй поле пустым.
+    def _build_pair_parse_prompt(self, job_text: str, resume_text: str) -> str:
+        """Строит промпт совместного парсинга вакансии и резюме одним запросом (PARSE_PREFIX + документы)."""
+        return PARSE_PREFIX + f"""
+Верни ТОЛЬКО JSON вида {{"job": ОБЪЕКТ вакансии, "resume": ОБЪЕКТ резюме}}. Не переноси данные из одного документа в другой.
+
+Текст вакансии:
+{job_text}
+
+Текст резюме кандидата:
+{resume_text}
 """
 
+    def _handle_parse_response(
+        self,
+        raw_response: str,
+        is_job: bool,
+        cache_key: Optional[str] = None,
+        stage: Optional[StageMetrics] = None,
+        text: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Валидирует ответ LLM на промпт парсинга и кэширует успешный результат.
+
+        Args:
+            raw_response: Сырой ответ LLM
+            is_job: True для вакансии, False для резюме
+            cache_key: Ключ кэша парсинга (если None, результат не кэшируется)
+            stage: Метрики этапа для подсчёта fallback-значений
+            text: Текст документа — закэшированный результат становится
+                образцом в индексе почти-дубликатов (dedup.enabled)
+
+        Returns:
+            Словарь с распарсенными данными (или пустая структура при ошибке)
+        """
+        doc_type = "вакансии" if is_job else "резюме кандидата"
+
         try:
-            raw_response = self._query_llm(prompt)
             parsed_data = json.loads(raw_response)
 
             # Валидация структуры
             required_fields = ['education', 'experience_years', 'hard_skills', 'soft_skills']
+            missing_fields = [field for field in required_fields if field not in parsed_data]
+            if len(missing_fields) == len(required_fields):
+                # Ни одного поля ({} или посторонний объект): нули вместо данных не кэшируем
+                logger.error(f"В ответе LLM для {doc_type} нет ни одного обязательного поля")
+                logger.debug(f"Сырой ответ: {raw_response[:200]}...")
+                if stage is not None:
+                    stage.increment('fallbacks')
+                return self._get_degraded_parsed_data()
+            if missing_fields and stage is not None:
+                stage.increment('fallbacks')
             for field in required_fields:
                 if field not in parsed_data:
                     logger.warning(f"Отсутствует поле '{field}' в ответе LLM, добавляю значение по умолчанию")
@@ -163,15 +465,71 @@ class SmartJobMatcher:
                         parsed_data[field] = ""
 
             logger.info(f"Успешно распарсен {doc_type}")
+
+            # ID навыков считаются один раз и кэшируются вместе с документом
+            canonicalize_document(parsed_data)
+            self.register_skills(parsed_data)
+
+            if cache_key is not None:
+                self.parse_cache.set(cache_key, parsed_data)
+                if self.dedup is not None and text is not None:
+                    self.dedup.add(text, "job" if is_job else "resume", cache_key)
+
             return parsed_data
 
         except json.JSONDecodeError as e:
             logger.error(f"Ошибка парсинга JSON от LLM: {e}")
             logger.debug(f"Сырой ответ: {raw_response[:200]}...")
-            return self._get_empty_parsed_data()
         except Exception as e:
             logger.error(f"Ошибка при парсинге текста: {e}")
-            return self._get_empty_parsed_data()
+
+        if stage is not None:
+            stage.increment('fallbacks')
+        return self._get_degraded_parsed_data()
+
+    def _handle_pair_parse_response(
+        self,
+        raw_response: str,
+        job_cache_key: Optional[str] = None,
+        resume_cache_key: Optional[str] = None,
+        stage: Optional[StageMetrics] = None,
+        job_text: Optional[str] = None,
+        resume_text: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Делит ответ на промпт совместного парсинга и валидирует каждую часть.
+
+        Args:
+            raw_response: Сырой ответ LLM вида {"job": {...}, "resume": {...}}
+            job_cache_key: Ключ кэша парсинга вакансии
+            resume_cache_key: Ключ кэша парсинга резюме
+            stage: Метрики этапа для подсчёта fallback-значений
+            job_text: Текст вакансии (для индекса почти-дубликатов)
+            resume_text: Текст резюме (для индекса почти-дубликатов)
+
+        Returns:
+            Кортеж (данные вакансии, данные резюме)
+        """
+        try:
+            parsed = json.loads(raw_response)
+            job_part, resume_part = parsed['job'], parsed['resume']
+            if not isinstance(job_part, dict) or not isinstance(resume_part, dict):
+                raise TypeError("части 'job' и 'resume' должны быть объектами")
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            logger.error(f"Ошибка разбора совместного ответа LLM: {e}")
+            logger.debug(f"Сырой ответ: {raw_response[:200]}...")
+            if stage is not None:
+                stage.increment('fallbacks', 2)
+            return self._get_degraded_parsed_data(), self._get_degraded_parsed_data()
+
+        return (
+            self._handle_parse_response(
+                json.dumps(job_part, ensure_ascii=False), True, job_cache_key, stage, job_text
+            ),
+            self._handle_parse_response(
+                json.dumps(resume_part, ensure_ascii=False), False, resume_cache_key, stage, resume_text
+            )
+        )
 
     def _get_empty_parsed_data(self) -> Dict[str, Any]:
         """Возвращает пустую структуру данных для fallback."""
@@ -182,6 +540,23 @@ class SmartJobMatcher:
             "soft_skills": []
         }
 
+    def _get_degraded_parsed_data(self) -> Dict[str, Any]:
+        """Пустая структура с пометкой degraded: LLM не дал пригодного ответа."""
+        parsed_data = self._get_empty_parsed_data()
+        parsed_data['degraded'] = True
+        return parsed_data
+
+    @staticmethod
+    def _mark_degraded(
+        result: Dict[str, Any],
+        job_data: Dict[str, Any],
+        resume_data: Dict[str, Any]
+    ) -> None:
+        """Помечает результат, скор которого посчитан по fallback-данным вместо ответа LLM."""
+        result['degraded'] = bool(job_data.get('degraded') or resume_data.get('degraded'))
+        if result['degraded']:
+            logger.warning("⚠ LLM не дал пригодного ответа при парсинге: скор рассчитан по неполным данным")
+
     def _calculate_score(
         self,
         job_data: Dict[str, Any],
@@ -195,7 +570,8 @@ class SmartJobMatcher:
             resume_data: Распарсенные данные резюме
 
         Returns:
-            Словарь с итоговым скором и детальным отчётом
+            Словарь с итоговым скором, детальным отчётом и сырыми компонентами
+            скора (для пересчёта с другими весами через rescore)
         """
         report = {
             "missing_required": [],
@@ -203,103 +579,218 @@ class SmartJobMatcher:
             "strengths": [],
             "score_details": {}
         }
-        total_score = 0
+        components = {}
 
         # --- 1. Образование ---
-        edu_score = self.weights['education_match'] if job_data['education'] and resume_data['education'] else 0
-        report['score_details']['education'] = edu_score
+        components['education_match'] = bool(job_data['education'] and resume_data['education'])
 
-        if edu_score > 0:
+        if components['education_match'] and self.weights['education_match'] > 0:
             report['strengths'].append("Релевантное образование")
         else:
             if job_data['education']:
                 report['missing_required'].append("Релевантное образование")
 
-        total_score += edu_score
-
         # --- 2. Опыт ---
         job_exp = job_data['experience_years']
         resume_exp = resume_data['experience_years']
-        exp_score = 0
+        components['experience_ratio'] = 0
 
         if job_exp > 0:
             if resume_exp >= job_exp:
-                exp_score = self.weights['experience_match']
+                components['experience_ratio'] = 1
                 report['strengths'].append(f"Опыт: {resume_exp} лет (требуется {job_exp})")
             elif resume_exp > 0:
-                exp_score = (resume_exp / job_exp) * self.weights['experience_match']
+                components['experience_ratio'] = resume_exp / job_exp
                 report['partial_match'].append(f"Опыт: {resume_exp} лет (требуется {job_exp})")
             else:
                 report['missing_required'].append(f"Опыт работы {job_exp} лет")
 
-        report['score_details']['experience'] = round(exp_score, 2)
-        total_score += exp_score
-
         # --- 3. Hard Skills ---
-        job_skills = set(s.lower().strip() for s in job_data['hard_skills'])
-        resume_skills = set(s.lower().strip() for s in resume_data['hard_skills'])
-
-        if job_skills:
-            matched_skills = job_skills & resume_skills
-            missing_skills = job_skills - resume_skills
-
-            # Распределяем вес поровну на каждый обязательный навык
-            points_per_skill = self.weights['hard_skills_match'] / len(job_skills)
-            hs_score = len(matched_skills) * points_per_skill
-
-            report['score_details']['hard_skills'] = round(hs_score, 2)
-            total_score += hs_score
-
-            if matched_skills:
-                report['strengths'].extend(f"✓ {skill}" for skill in matched_skills)
-            if missing_skills:
-                report['missing_required'].extend(f"✗ {skill}" for skill in missing_skills)
-        else:
-            report['score_details']['hard_skills'] = 0
+        # Навыки сравниваются по каноническим ID; навыки резюме дополнены группами
+        job_skills = document_skill_ids(job_data, 'hard_skills')
+        resume_skills = covered_skill_ids(resume_data, 'hard_skills')
+        matched_skills = [skill for skill in job_skills if skill in resume_skills]
+        missing_skills = [skill for skill in job_skills if skill not in resume_skills]
+
+        components['hard_skills_matched'] = len(matched_skills)
+        components['hard_skills_required'] = len(job_skills)
+
+        if matched_skills:
+            report['strengths'].extend(f"✓ {skill_name(skill)}" for skill in matched_skills)
+
+        # Близкие навыки засчитываются частично и не считаются отсутствующими
+        if self.skill_similarity is not None:
+            partial = 0.0
+            for skill in list(missing_skills):
+                credit, nearest = self.skill_similarity.best_match(skill, resume_skills)
+                if credit:
+                    partial += credit
+                    missing_skills.remove(skill)
+                    report['partial_match'].append(f"≈ {skill_name(skill)} (в резюме: {skill_name(nearest)})")
+            components['hard_skills_partial'] = partial
+
+        if missing_skills:
+            report['missing_required'].extend(f"✗ {skill_name(skill)}" for skill in missing_skills)
 
         # --- 4. Soft Skills ---
-        job_soft = set(s.lower().strip() for s in job_data['soft_skills'])
-        resume_soft = set(s.lower().strip() for s in resume_data['soft_skills'])
-        matched_soft = job_soft & resume_soft
+        job_soft = document_skill_ids(job_data, 'soft_skills')
+        resume_soft = covered_skill_ids(resume_data, 'soft_skills')
+        matched_soft = [skill for skill in job_soft if skill in resume_soft]
 
-        ss_score = len(matched_soft) * (self.weights['soft_skills_match'] / max(1, len(job_soft))) if job_soft else 0
-
-        report['score_details']['soft_skills'] = round(ss_score, 2)
-        total_score += ss_score
+        components['soft_skills_matched'] = len(matched_soft)
+        components['soft_skills_required'] = len(job_soft)
 
         if matched_soft:
-            report['strengths'].extend(f"+ {skill}" for skill in matched_soft)
+            report['strengths'].extend(f"+ {skill_name(skill)}" for skill in matched_soft)
 
-        # Нормализуем до 0-100
-        final_score = min(100, round(total_score))
+        final_score, report['score_details'] = self._score_from_components(components)
 
         logger.info(f"Рассчитан итоговый скор: {final_score}/100")
 
         return {
             'score': final_score,
-            'report': report
+            'report': report,
+            'components': components
         }
 
-    def _generate_human_feedback(self, report: Dict[str, Any], score: int) -> str:
+    def _score_from_components(
+        self,
+        components: Dict[str, Any],
+        weights: Optional[Dict[str, float]] = None
+    ) -> Tuple[int, Dict[str, float]]:
         """
-        Генерирует дружелюбный фидбэк для пользователя на основе структурированного отчёта.
+        Считает итоговый скор по сырым компонентам и весам.
 
         Args:
-            report: Отчёт с деталями соответствия
-            score: Итоговый скор
+            components: Компоненты из результата _calculate_score
+            weights: Веса скоринга (если None, используются self.weights)
 
         Returns:
-            Текстовый фидбэк
+            Итоговый скор 0-100 и баллы по каждому критерию
         """
-        prompt = f"""
-На основе этого технического отчёта о соответствии кандидата вакансии, напиши краткий, конструктивный и поддерживающий фидбэк на русском языке.
+        weights = weights or self.weights
+        score_details = {}
+        total_score = 0
 
-Итоговый скор: {score}/100
+        # --- 1. Образование ---
+        edu_score = weights['education_match'] if components['education_match'] else 0
+        score_details['education'] = edu_score
+        total_score += edu_score
 
-Отчёт:
-- Сильные стороны: {report['strengths'][:5]}
-- Частичные совпадения: {report['partial_match']}
-- Отсутствующие обязательные навыки: {report['missing_required'][:5]}
+        # --- 2. Опыт ---
+        ratio = components['experience_ratio']
+        exp_score = 0
+        if ratio == 1:
+            exp_score = weights['experience_match']
+        elif ratio > 0:
+            exp_score = ratio * weights['experience_match']
+
+        score_details['experience'] = round(exp_score, 2)
+        total_score += exp_score
+
+        # --- 3. Hard Skills ---
+        if components['hard_skills_required']:
+            # Распределяем вес поровну на каждый обязательный навык
+            points_per_skill = weights['hard_skills_match'] / components['hard_skills_required']
+            hs_score = (components['hard_skills_matched'] + components.get('hard_skills_partial', 0)) * points_per_skill
+
+            score_details['hard_skills'] = round(hs_score, 2)
+            total_score += hs_score
+        else:
+            score_details['hard_skills'] = 0
+
+        # --- 4. Soft Skills ---
+        soft_required = components['soft_skills_required']
+        ss_score = components['soft_skills_matched'] * (weights['soft_skills_match'] / max(1, soft_required)) if soft_required else 0
+
+        score_details['soft_skills'] = round(ss_score, 2)
+        total_score += ss_score
+
+        # Нормализуем до 0-100
+        return min(100, round(total_score)), score_details
+
+    def rescore(
+        self,
+        results: List[Dict[str, Any]],
+        weights: Optional[Dict[str, float]] = None
+    ) -> List[int]:
+        """
+        Пересчитывает скоры сохранённых результатов с новыми весами без обращения к LLM.
+
+        Обновляет 'score' и 'report.score_details' каждого результата на месте.
+        Результаты без 'components' (например, ошибочные) пропускаются.
+
+        Args:
+            results: Результаты match() или записи пакетного прогона
+            weights: Новые веса (если None, используются self.weights)
+
+        Returns:
+            Список новых скоров в порядке входных результатов
+        """
+        scores = []
+        for result in results:
+            components = result.get('components')
+            if components is None:
+                scores.append(result.get('score', 0))
+                continue
+            result['score'], score_details = self._score_from_components(components, weights)
+            result.setdefault('report', {})['score_details'] = score_details
+            scores.append(result['score'])
+        return scores
+
+    def _feedback_cache_key(self, report: Dict[str, Any], score: int) -> Optional[str]:
+        """Ключ кэша фидбэка по содержимому отчёта и скору (None, если кэш отключён)."""
+        if self.feedback_cache is None:
+            return None
+        # Порядок элементов в списках отчёта зависит от порядка обхода множеств
+        canonical = {
+            key: sorted(value) if isinstance(value, list) else value
+            for key, value in report.items()
+        }
+        return make_cache_key(
+            json.dumps(canonical, ensure_ascii=False, sort_keys=True),
+            score,
+            self.ollama_model,
+            PROMPT_VERSION
+        )
+
+    def _get_cached_feedback(
+        self,
+        cache_key: Optional[str],
+        stage: Optional[StageMetrics] = None
+    ) -> Optional[str]:
+        """Фидбэк из кэша (None при промахе или отключённом кэше)."""
+        if cache_key is None:
+            return None
+
+        cached = self.feedback_cache.get(cache_key)
+        if stage is not None:
+            stage.increment('cache_hits' if cached is not None else 'cache_misses')
+        return cached
+
+    @staticmethod
+    def _select_for_feedback(
+        results: List[Dict[str, Any]],
+        top_k: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """Отбирает результаты с наибольшим скором, которым нужен фидбэк."""
+        candidates = [result for result in results if 'report' in result and 'error' not in result]
+        candidates.sort(key=lambda result: result['score'], reverse=True)
+        return candidates if top_k is None else candidates[:top_k]
+
+    @staticmethod
+    def _store_feedback(result: Dict[str, Any], text: str) -> None:
+        """Записывает фидбэк в результат, заполняя отложенный фидбэк, если он есть."""
+        if isinstance(result.get('feedback'), LazyFeedback):
+            result['feedback'].set(text)
+        else:
+            result['feedback'] = text
+
+    def _build_feedback_prompt(self, report: Dict[str, Any], score: int) -> str:
+        """Строит промпт для генерации текстового фидбэка."""
+        # Неизменные инструкции идут до данных отчёта, чтобы префикс кэшировался
+        return f"""
+На основе технического отчёта о соответствии кандидата вакансии, приведённого ниже, напиши краткий, конструктивный и поддерживающий фидбэк на русском языке.
 
 Правила:
 1. Пиши в 3-4 предложения.
@@ -307,27 +798,39 @@ class SmartJobMatcher:
 3. Дай рекомендацию: стоит ли откликаться?
 4. Сохрани нейтральный, но дружелюбный тон.
 5. Верни ТОЛЬКО текст фидбэка без JSON и кавычек.
+
+Итоговый скор: {score}/100
+
+Отчёт:
+- Сильные стороны: {report['strengths'][:5]}
+- Частичные совпадения: {report['partial_match']}
+- Отсутствующие обязательные навыки: {report['missing_required'][:5]}
 """
 
-        try:
-            raw_feedback = self._query_llm(prompt)
-            # Пытаемся извлечь текст из JSON если LLM вернул JSON
-            try:
-                parsed = json.loads(raw_feedback)
-                if isinstance(parsed, dict) and 'feedback' in parsed:
-                    return parsed['feedback'].strip()
-                elif isinstance(parsed, str):
-                    return parsed.strip()
-            except:
-                pass
-
-            # Если не JSON, возвращаем как есть
-            feedback = raw_feedback.strip('"\n ')
-            return feedback if feedback else self._get_default_feedback(score)
+    def _handle_feedback_response(self, raw_feedback: str, score: int) -> str:
+        """
+        Извлекает текст фидбэка из ответа LLM.
 
-        except Exception as e:
-            logger.error(f"Ошибка при генерации фидбэка: {e}")
-            return self._get_default_feedback(score)
+        Args:
+            raw_feedback: Сырой ответ LLM
+            score: Итоговый скор (для стандартного фидбэка при пустом ответе)
+
+        Returns:
+            Текстовый фидбэк
+        """
+        # Пытаемся извлечь текст из JSON если LLM вернул JSON
+        try:
+            parsed = json.loads(raw_feedback)
+            if isinstance(parsed, dict) and 'feedback' in parsed:
+                return parsed['feedback'].strip()
+            elif isinstance(parsed, str):
+                return parsed.strip()
+        except:
+            pass
+
+        # Если не JSON, возвращаем как есть
+        feedback = raw_feedback.strip('"\n ')
+        return feedback if feedback else self._get_default_feedback(score)
 
     def _get_default_feedback(self, score: int) -> str:
         """Генерирует стандартный фидбэк на основе скора."""
@@ -340,11 +843,633 @@ class SmartJobMatcher:
         else:
             return "Низкое соответствие. Возможно, стоит рассмотреть другие вакансии или дополнить свои компетенции."
 
+    def _attach_debug(
+        self,
+        result: Dict[str, Any],
+        job_data: Dict[str, Any],
+        resume_data: Dict[str, Any]
+    ) -> None:
+        """Добавляет отладочную информацию в результат, если она включена в конфиге."""
+        if self.config.get("output.include_debug", True):
+            result['debug'] = {
+                'parsed_job': job_data,
+                'parsed_resume': resume_data,
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def _new_metrics(self, operation: str = "match") -> Optional[MatchMetrics]:
+        """Сборщик метрик операции (None, если метрики не нужны ни в результате, ни в приёмнике)."""
+        if not self.metrics_enabled and self.metrics_sink is None:
+            return None
+        return MatchMetrics(operation)
+
+    def _publish_metrics(
+        self,
+        metrics: Optional[MatchMetrics],
+        result: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Прикладывает метрики к результату и передаёт их в приёмник."""
+        if metrics is None:
+            return
+
+        data = metrics.to_dict()
+        if result is not None and self.metrics_enabled:
+            result['metrics'] = data
+        if self.metrics_sink is not None:
+            try:
+                self.metrics_sink.record(data)
+            except Exception as e:
+                logger.error(f"Ошибка приёмника метрик: {e}")
+
+    def _build_error_result(self, error: Exception) -> Dict[str, Any]:
+        """Результат анализа при критической ошибке."""
+        return {
+            'score': 0,
+            'report': {
+                'missing_required': [],
+                'partial_match': [],
+                'strengths': [],
+                'score_details': {}
+            },
+            'feedback': "Произошла ошибка при анализе. Проверьте логи.",
+            'degraded': True,
+            'error': str(error)
+        }
+
+    def _build_matrix_result(
+        self,
+        jobs_data: List[Dict[str, Any]],
+        resumes_data: List[Dict[str, Any]],
+        include_reports: bool,
+        resume_groups: Optional[List[int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Считает скоринг для всех пар уже распарсенных вакансий и резюме.
+
+        Args:
+            jobs_data: Распарсенные вакансии (N)
+            resumes_data: Распарсенные резюме (M)
+            include_reports: Включить ли детальные отчёты по каждой паре
+            resume_groups: Группы почти-дубликатов резюме (_near_duplicate_groups)
+
+        Returns:
+            Словарь с матрицей скоров, индексами документов с пометкой
+            degraded, индексами почти-дубликатов резюме (если переданы
+            группы) и, если запрошено, матрицами отчётов и компонентов скора
+        """
+        logger.info("🔢 Расчёт матрицы соответствия...")
+        scores: List[List[int]] = []
+        pair_results: List[List[Dict[str, Any]]] = []
+
+        if self.config.get("scoring.engine", "python") == "vectorized":
+            from .vectorized import VectorizedScorer
+            scores = VectorizedScorer(self).score_matrix(jobs_data, resumes_data).tolist()
+            if include_reports:
+                pair_results = [
+                    [self._calculate_score(job_data, resume_data) for resume_data in resumes_data]
+                    for job_data in jobs_data
+                ]
+        else:
+            for job_data in jobs_data:
+                job_results = [self._calculate_score(job_data, resume_data) for resume_data in resumes_data]
+                scores.append([pair_result['score'] for pair_result in job_results])
+                if include_reports:
+                    pair_results.append(job_results)
+
+        result: Dict[str, Any] = {
+            'scores': scores,
+            # Документы, распарсенные с fallback-значениями вместо ответа LLM
+            'degraded_jobs': [i for i, data in enumerate(jobs_data) if data.get('degraded')],
+            'degraded_resumes': [i for i, data in enumerate(resumes_data) if data.get('degraded')]
+        }
+        if resume_groups is not None:
+            result['duplicate_resumes'] = self._duplicate_indices(resume_groups)
+        if include_reports:
+            result['reports'] = [[pair['report'] for pair in row] for row in pair_results]
+            result['components'] = [[pair['components'] for pair in row] for row in pair_results]
+
+        if self.config.get("output.include_debug", True):
+            result['debug'] = {
+                'parsed_jobs': jobs_data,
+                'parsed_resumes': resumes_data,
+                'timestamp': datetime.now().isoformat()
+            }
+
+        logger.info("✓ Пакетный анализ завершён")
+        return result
+
+    def _near_duplicate_groups(self, texts: List[str], is_job: bool) -> List[int]:
+        """
+        Делит документы пакета на группы почти-дубликатов (включая одинаковые тексты).
+
+        Группы строятся по тем же правилам, что и поиск в self.dedup, но
+        только внутри пакета и до обращения к LLM.
+
+        Args:
+            texts: Тексты документов
+            is_job: True для вакансий, False для резюме
+
+        Returns:
+            Для каждого текста — индекс первого текста его группы
+        """
+        kind = "job" if is_job else "resume"
+        index = NearDuplicateIndex(threshold=self.dedup.threshold, num_perm=self.dedup.num_perm)
+        groups = []
+        for i, text in enumerate(texts):
+            found = index.find(text, kind)
+            if found is None:
+                index.add(text, kind, str(i))
+                groups.append(i)
+            else:
+                groups.append(int(found[0]))
+        return groups
+
+    def _parse_rounds(self, texts: List[str], is_job: bool, groups: Optional[List[int]] = None) -> List[List[str]]:
+        """
+        Очерёдность парсинга уникальных текстов пакета.
+
+        Без dedup.enabled все тексты парсятся сразу. Иначе сначала первые
+        документы групп почти-дубликатов, затем остальные.
+
+        Args:
+            texts: Тексты документов (возможны повторы)
+            is_job: True для вакансий, False для резюме
+            groups: Готовые группы texts (_near_duplicate_groups); если None, строятся заново
+
+        Returns:
+            Списки текстов, которые парсятся параллельно внутри списка и по очереди между списками
+        """
+        if self.dedup is None:
+            return [list(dict.fromkeys(texts))]
+        if groups is None:
+            groups = self._near_duplicate_groups(texts, is_job)
+        first = list(dict.fromkeys(text for i, (text, group) in enumerate(zip(texts, groups)) if group == i))
+        known = set(first)
+        rest = [text for text in dict.fromkeys(texts) if text not in known]
+        return [first, rest] if rest else [first]
+
+    @staticmethod
+    def _duplicate_indices(groups: List[int]) -> List[int]:
+        """
+        Индексы почти-дубликатов среди документов пакета.
+
+        В рейтинге остаётся первый документ каждой группы, остальные возвращаются.
+
+        Args:
+            groups: Группы документов (_near_duplicate_groups)
+        """
+        return [i for i, first in enumerate(groups) if first != i]
+
+    @property
+    def result_store(self) -> ResultStore:
+        """Хранилище результатов в output.results_dir/results.db (открывается при первом обращении)."""
+        with self._result_store_lock:
+            if self._result_store is None:
+                results_dir = Path(self.config.get("output.results_dir", "results"))
+                self._result_store = ResultStore(str(results_dir / "results.db"))
+            return self._result_store
+
+    def save_result(
+        self,
+        result: Dict[str, Any],
+        filepath: str = None,
+        job_id: Optional[str] = None,
+        resume_id: Optional[str] = None
+    ) -> str:
+        """
+        Сохраняет результат анализа в хранилище результатов или в JSON файл.
+
+        Без filepath результат добавляется в ResultStore, а его
+        идентификатор записывается в result['result_id'].
+
+        Args:
+            result: Результат анализа
+            filepath: Путь к JSON файлу (если None, результат сохраняется в хранилище)
+            job_id: Идентификатор вакансии для запросов к хранилищу
+            resume_id: Идентификатор резюме для запросов к хранилищу
+
+        Returns:
+            Путь к сохранённому файлу или "<путь к базе>#<result_id>"
+        """
+        metrics = self._new_metrics("save")
+        try:
+            with timed_stage(metrics, "save"):
+                if filepath is None:
+                    store = self.result_store
+                    result['result_id'] = store.add(result, job_id=job_id, resume_id=resume_id)
+                    location = f"{store.path}#{result['result_id']}"
+                else:
+                    with open(filepath, 'w', encoding='utf-8') as f:
+                        # default=str разворачивает LazyFeedback в текст
+                        json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+                    location = str(filepath)
+            logger.info(f"Результат сохранён в {location}")
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении результата: {e}")
+            raise
+
+        if metrics is not None:
+            if isinstance(result.get('metrics'), dict):
+                result['metrics']['stages']['save'] = round(metrics.stages['save'], 6)
+            self._publish_metrics(metrics)
+        return location
+
+
+class SmartJobMatcher(BaseJobMatcher):
+    """
+    Класс для интеллектуального сопоставления вакансий и резюме.
+
+    Использует LLM (через Ollama) для парсинга текста и собственный
+    детерминированный алгоритм для расчёта совместимости.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        ollama_model: Optional[str] = None,
+        ollama_url: Optional[str] = None,
+        timeout: Optional[int] = None
+    ):
+        """
+        Инициализация матчера.
+
+        Args:
+            config: Объект конфигурации (если None, используются настройки по умолчанию)
+            ollama_model: Название модели Ollama (переопределяет config)
+            ollama_url: URL Ollama API (переопределяет config)
+            timeout: Таймаут для запросов к LLM в секундах (переопределяет config)
+        """
+        super().__init__(config, ollama_model, ollama_url, timeout)
+
+        # Общая HTTP-сессия с пулом соединений и пул потоков для параллельного парсинга.
+        # Сессией пользуются пул парсинга и пул DocumentRegistry (по max_concurrency
+        # потоков), фидбэк в потоке вызывающего, проверки серверов и потоки сервера,
+        # поэтому пул соединений на сервер рассчитан на оба пула с запасом, а
+        # pool_block заставляет лишние запросы ждать соединения вместо того, чтобы
+        # открывать новое и выбрасывать его («Connection pool is full»)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=len(self.balancer),
+            pool_maxsize=2 * self.max_concurrency + 2,
+            pool_block=True
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="matcher-llm"
+        )
+        self._registry: Optional[DocumentRegistry] = None
+        self._registry_lock = threading.Lock()
+
+        logger.info(f"Инициализирован SmartJobMatcher с моделью {self.ollama_model}")
+
+        # Проверка доступности Ollama
+        self._check_ollama_availability()
+
+        # Периодическая проверка серверов возвращает исключённые в ротацию
+        self._health_stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        if len(self.balancer) > 1 and self.health_interval > 0:
+            self._health_thread = threading.Thread(
+                target=self._health_loop,
+                name="matcher-health",
+                daemon=True
+            )
+            self._health_thread.start()
+
+    def _probe_endpoint(self, endpoint: Endpoint) -> bool:
+        """Проверка /api/tags одного сервера; результат учитывается балансировщиком."""
+        try:
+            response = self.session.get(endpoint.tags_url, timeout=5)
+            available = response.status_code == 200
+            if not available:
+                logger.warning(f"⚠ Ollama сервер {endpoint.url} вернул статус {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"✗ Ollama сервер {endpoint.url} недоступен: {e}")
+            available = False
+
+        self.balancer.record_probe(endpoint, available)
+        return available
+
+    def _check_ollama_availability(self) -> bool:
+        """Проверка доступности серверов Ollama."""
+        available = [self._probe_endpoint(endpoint) for endpoint in self.balancer.endpoints]
+        if any(available):
+            logger.info(f"✓ Ollama сервер доступен ({sum(available)}/{len(available)})")
+            return True
+
+        logger.error("Убедитесь, что Ollama запущен: ollama serve")
+        return False
+
+    def _health_loop(self) -> None:
+        """Фоновая проверка серверов раз в ollama.balancer.health_interval секунд."""
+        while not self._health_stop.wait(self.health_interval):
+            for endpoint in self.balancer.endpoints:
+                self._probe_endpoint(endpoint)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Стоит ли повторять запрос: таймауты, ошибки соединения, ответы 5xx и 429, тело без response."""
+        if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError, MalformedResponseError)):
+            return True
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            return error.response.status_code >= 500 or error.response.status_code == 429
+        return False
+
+    def _query_llm(
+        self,
+        prompt: str,
+        stage: Optional[StageMetrics] = None,
+        purpose: str = "llm"
+    ) -> str:
+        """
+        Универсальный метод для запроса к LLM через Ollama.
+
+        Таймауты, ошибки соединения и ответы 5xx/429 повторяются с
+        экспоненциальной задержкой (ollama.retry). Пока circuit breaker
+        разомкнут, запросы не отправляются.
+
+        Args:
+            prompt: Текст запроса
+            stage: Метрики этапа, в которые записывается запрос
+            purpose: Назначение запроса для stream_callback
+
+        Returns:
+            Ответ от LLM в формате JSON строки
+
+        Raises:
+            LLMUnavailableError: Ответ не получен или circuit breaker разомкнут
+        """
+        payload = self._build_llm_payload(prompt)
+        attempts = self.retry_policy.max_attempts
+
+        for attempt in range(1, attempts + 1):
+            if not self.circuit_breaker.allow():
+                if stage is not None:
+                    stage.increment('circuit_open')
+                raise LLMUnavailableError("Circuit breaker разомкнут: LLM временно недоступен")
+
+            try:
+                result = self._send_llm_request(payload, prompt, stage, purpose)
+            except Exception as e:
+                retryable = self._is_retryable(e)
+                if retryable:
+                    self.circuit_breaker.record_failure()
+                else:
+                    # Сервер ответил, ошибка не связана с его доступностью
+                    self.circuit_breaker.record_success()
+                if not retryable or attempt == attempts:
+                    raise LLMUnavailableError(f"Запрос к LLM не удался (попыток: {attempt}): {e}") from e
+
+                delay = self.retry_policy.delay(attempt)
+                logger.warning(f"Повтор запроса к LLM через {delay:.2f}с (попытка {attempt + 1}/{attempts})")
+                if stage is not None:
+                    stage.increment('retries')
+                time.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+    def _send_llm_request(
+        self,
+        payload: Dict[str, Any],
+        prompt: str,
+        stage: Optional[StageMetrics],
+        purpose: str
+    ) -> str:
+        """Одна попытка запроса к серверу, выбранному балансировщиком."""
+        endpoint = self.balancer.acquire()
+        endpoint_ok = True
+        start = time.perf_counter()
+
+        try:
+            logger.debug(f"Отправка запроса к LLM {endpoint.url} (длина промпта: {len(prompt)} символов)")
+            if self.stream:
+                body = self._query_llm_stream(endpoint.url, payload, purpose)
+            else:
+                response = self.session.post(
+                    endpoint.url,
+                    json=payload,
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                body = response.json()
+
+        except Exception as e:
+            if isinstance(e, requests.exceptions.Timeout):
+                logger.error(f"Таймаут при запросе к LLM (>{self.timeout}с)")
+                error = "timeout"
+            else:
+                logger.error(f"Ошибка при запросе к LLM: {e}")
+                error = str(e)
+            endpoint_ok = not isinstance(e, requests.exceptions.RequestException)
+            if stage is not None:
+                stage.record_llm_call(prompt, None, time.perf_counter() - start, error=error, endpoint=endpoint.url)
+            raise
+        finally:
+            self.balancer.release(endpoint, success=endpoint_ok)
+
+        if not isinstance(body, dict) or not isinstance(body.get('response'), str):
+            if stage is not None:
+                stage.record_llm_call(
+                    prompt, None, time.perf_counter() - start, error="no response field", endpoint=endpoint.url
+                )
+            raise MalformedResponseError(f"В ответе {endpoint.url} нет поля 'response'")
+
+        result = body['response']
+        logger.debug(f"Получен ответ от LLM (длина: {len(result)} символов)")
+        if stage is not None:
+            stage.record_llm_call(prompt, body, time.perf_counter() - start, endpoint=endpoint.url)
+        return result
+
+    def _query_llm_stream(self, url: str, payload: Dict[str, Any], purpose: str) -> Dict[str, Any]:
+        """
+        Читает потоковый ответ Ollama до завершения JSON.
+
+        Args:
+            url: URL эндпоинта /api/generate
+            payload: Тело запроса со stream=True
+            purpose: Назначение запроса для stream_callback
+
+        Returns:
+            Тело ответа в формате нестримингового /api/generate
+        """
+        tracker = JsonStreamTracker()
+        # Выход из with закрывает соединение, и Ollama прекращает генерацию
+        with self.session.post(url, json=payload, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                body = self._feed_stream_line(line, tracker, purpose)
+                if body is not None:
+                    return body
+        return {'response': tracker.text}
+
+    def _parse_text_with_llm(
+        self,
+        text: str,
+        is_job: bool = True,
+        metrics: Optional[MatchMetrics] = None
+    ) -> Dict[str, Any]:
+        """
+        Использует LLM для извлечения структурированной информации из текста.
+
+        Args:
+            text: Текст вакансии или резюме
+            is_job: True для вакансии, False для резюме
+            metrics: Сборщик метрик операции (этап job_parse/resume_parse)
+
+        Returns:
+            Словарь с распарсенными данными
+        """
+        stage_name = "job_parse" if is_job else "resume_parse"
+        with timed_stage(metrics, stage_name) as stage:
+            parsed_data, cache_key = self._lookup_parsed(text, is_job, stage)
+            if parsed_data is not None:
+                return parsed_data
+            return self._parse_uncached(text, is_job, cache_key, stage)
+
+    def _parse_uncached(
+        self,
+        text: str,
+        is_job: bool,
+        cache_key: Optional[str],
+        stage: Optional[StageMetrics]
+    ) -> Dict[str, Any]:
+        """Парсит документ отдельным запросом к LLM (быстрый разбор и кэш уже проверены)."""
+        purpose = "job_parse" if is_job else "resume_parse"
+        try:
+            raw_response = self._query_llm(self._build_parse_prompt(text, is_job), stage, purpose)
+        except Exception as e:
+            logger.error(f"Ошибка при парсинге текста: {e}")
+            if stage is not None:
+                stage.increment('fallbacks')
+            return self._get_degraded_parsed_data()
+
+        return self._handle_parse_response(raw_response, is_job, cache_key, stage, text)
+
+    def _parse_pair(
+        self,
+        job_text: str,
+        resume_text: str,
+        metrics: Optional[MatchMetrics] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Парсит вакансию и резюме одним запросом к LLM (ollama.combined_parse).
+
+        Общая инструкция промпта обрабатывается моделью один раз вместо двух.
+        Документы из кэша или быстрого разбора в запрос не входят: если
+        известен один из них, второй парсится обычным промптом.
+
+        Args:
+            job_text: Текст вакансии
+            resume_text: Текст резюме
+            metrics: Сборщик метрик операции (этап pair_parse)
+
+        Returns:
+            Кортеж (данные вакансии, данные резюме)
+        """
+        with timed_stage(metrics, "pair_parse") as stage:
+            job_data, job_key = self._lookup_parsed(job_text, True, stage)
+            resume_data, resume_key = self._lookup_parsed(resume_text, False, stage)
+
+            if job_data is None and resume_data is None:
+                prompt = self._build_pair_parse_prompt(job_text, resume_text)
+                try:
+                    raw_response = self._query_llm(prompt, stage, "pair_parse")
+                except Exception as e:
+                    logger.error(f"Ошибка при совместном парсинге: {e}")
+                    if stage is not None:
+                        stage.increment('fallbacks', 2)
+                    return self._get_degraded_parsed_data(), self._get_degraded_parsed_data()
+                return self._handle_pair_parse_response(
+                    raw_response, job_key, resume_key, stage, job_text, resume_text
+                )
+
+            if job_data is None:
+                job_data = self._parse_uncached(job_text, True, job_key, stage)
+            if resume_data is None:
+                resume_data = self._parse_uncached(resume_text, False, resume_key, stage)
+            return job_data, resume_data
+
+    def _generate_human_feedback(
+        self,
+        report: Dict[str, Any],
+        score: int,
+        stage: Optional[StageMetrics] = None
+    ) -> str:
+        """
+        Генерирует дружелюбный фидбэк для пользователя на основе структурированного отчёта.
+
+        Args:
+            report: Отчёт с деталями соответствия
+            score: Итоговый скор
+            stage: Метрики этапа feedback
+
+        Returns:
+            Текстовый фидбэк
+        """
+        if self.feedback_engine == "template":
+            return build_template_feedback(report, score)
+
+        cache_key = self._feedback_cache_key(report, score)
+        cached = self._get_cached_feedback(cache_key, stage)
+        if cached is not None:
+            return cached
+
+        try:
+            raw_feedback = self._query_llm(self._build_feedback_prompt(report, score), stage, "feedback")
+            feedback = self._handle_feedback_response(raw_feedback, score)
+            if raw_feedback.strip('"\n {}'):
+                if cache_key is not None:
+                    self.feedback_cache.set(cache_key, feedback)
+            elif stage is not None:
+                stage.increment('fallbacks')
+            return feedback
+
+        except Exception as e:
+            logger.error(f"Ошибка при генерации фидбэка: {e}")
+            if stage is not None:
+                stage.increment('fallbacks')
+            return self._get_default_feedback(score)
+
+    def generate_feedback_batch(
+        self,
+        results: List[Dict[str, Any]],
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Генерирует фидбэк только для лучших результатов, параллельно.
+
+        Фидбэк кэшируется по (отчёт, скор), поэтому одинаковые отчёты не
+        приводят к повторным запросам к LLM.
+
+        Args:
+            results: Результаты match() (например, с generate_feedback=False)
+            top_k: Для скольких лучших по скору результатов генерировать фидбэк
+                (если None — для всех)
+
+        Returns:
+            Отобранные результаты по убыванию скора с заполненным 'feedback'
+        """
+        shortlisted = self._select_for_feedback(results, top_k)
+        logger.info(f"💬 Генерация фидбэка для {len(shortlisted)} из {len(results)} результатов...")
+
+        feedbacks = self._executor.map(
+            lambda result: self._generate_human_feedback(result['report'], result['score']),
+            shortlisted
+        )
+        for result, feedback in zip(shortlisted, feedbacks):
+            self._store_feedback(result, feedback)
+
+        return shortlisted
+
     def match(
         self,
         job_description: str,
         resume_text: str,
-        generate_feedback: bool = True
+        generate_feedback: bool = True,
+        lazy_feedback: bool = False
     ) -> Dict[str, Any]:
         """
         Основной метод для сопоставления вакансии и резюме.
@@ -353,6 +1478,8 @@ class SmartJobMatcher:
             job_description: Текст описания вакансии
             resume_text: Текст резюме
             generate_feedback: Генерировать ли текстовый фидбэк
+            lazy_feedback: Вместо текста вернуть LazyFeedback — запрос к LLM
+                выполнится только при первом обращении к фидбэку
 
         Returns:
             Словарь с результатами анализа
@@ -361,76 +1488,190 @@ class SmartJobMatcher:
         logger.info("Начало анализа совместимости")
         logger.info("="*60)
 
+        metrics = self._new_metrics()
+
         try:
-            # Парсинг вакансии
-            logger.info("📋 Парсинг вакансии с помощью LLM...")
-            job_data = self._parse_text_with_llm(job_description, is_job=True)
+            if self.combined_parse:
+                logger.info("📋 Парсинг вакансии и резюме одним запросом к LLM...")
+                job_data, resume_data = self._parse_pair(job_description, resume_text, metrics)
+            else:
+                # Парсинг вакансии и резюме выполняется параллельно
+                logger.info("📋 Парсинг вакансии с помощью LLM...")
+                job_future = self._executor.submit(self._parse_text_with_llm, job_description, True, metrics)
 
-            # Парсинг резюме
-            logger.info("👤 Парсинг резюме с помощью LLM...")
-            resume_data = self._parse_text_with_llm(resume_text, is_job=False)
+                logger.info("👤 Парсинг резюме с помощью LLM...")
+                resume_future = self._executor.submit(self._parse_text_with_llm, resume_text, False, metrics)
+
+                job_data = job_future.result()
+                resume_data = resume_future.result()
 
             # Расчёт соответствия
             logger.info("🔢 Расчёт соответствия...")
-            result = self._calculate_score(job_data, resume_data)
+            with timed_stage(metrics, "scoring"):
+                result = self._calculate_score(job_data, resume_data)
+            self._mark_degraded(result, job_data, resume_data)
 
             # Генерация фидбэка
-            if generate_feedback:
+            if generate_feedback and lazy_feedback:
+                report, score = result['report'], result['score']
+                result['feedback'] = LazyFeedback(lambda: self._generate_human_feedback(report, score))
+            elif generate_feedback:
                 logger.info("💬 Генерация фидбэка...")
-                result['feedback'] = self._generate_human_feedback(
-                    result['report'],
-                    result['score']
-                )
+                with timed_stage(metrics, "feedback") as stage:
+                    result['feedback'] = self._generate_human_feedback(
+                        result['report'],
+                        result['score'],
+                        stage
+                    )
 
             # Добавляем отладочную информацию
-            if self.config.get("output.include_debug", True):
-                result['debug'] = {
-                    'parsed_job': job_data,
-                    'parsed_resume': resume_data,
-                    'timestamp': datetime.now().isoformat()
-                }
+            self._attach_debug(result, job_data, resume_data)
 
             logger.info("✓ Анализ завершён успешно")
-            return result
 
         except Exception as e:
             logger.error(f"Критическая ошибка при анализе: {e}", exc_info=True)
-            return {
-                'score': 0,
-                'report': {
-                    'missing_required': [],
-                    'partial_match': [],
-                    'strengths': [],
-                    'score_details': {}
-                },
-                'feedback': "Произошла ошибка при анализе. Проверьте логи.",
-                'error': str(e)
-            }
+            result = self._build_error_result(e)
+
+        self._publish_metrics(metrics, result)
+        return result
 
-    def save_result(self, result: Dict[str, Any], filepath: str = None) -> str:
+    def _parse_many(
+        self,
+        texts: List[str],
+        is_job: bool,
+        groups: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Сохраняет результат анализа в JSON файл.
+        Парсит список документов, обращаясь к LLM один раз на каждый уникальный текст.
+
+        Запросы выполняются параллельно, не более ollama.max_concurrency одновременно.
+        При dedup.enabled сначала парсится первый документ каждой группы
+        почти-дубликатов пакета, затем остальные: они находят его результат
+        в индексе, а не уходят в LLM одновременно с ним.
 
         Args:
-            result: Результат анализа
-            filepath: Путь для сохранения (если None, генерируется автоматически)
+            texts: Тексты вакансий или резюме
+            is_job: True для вакансий, False для резюме
+            groups: Готовые группы почти-дубликатов texts (см. _parse_rounds)
 
         Returns:
-            Путь к сохранённому файлу
+            Список распарсенных данных в порядке входных текстов
         """
-        if filepath is None:
-            # Создание директории для результатов
-            results_dir = Path(self.config.get("output.results_dir", "results"))
-            results_dir.mkdir(exist_ok=True)
+        parsed_by_text: Dict[str, Dict[str, Any]] = {}
+        for batch in self._parse_rounds(texts, is_job, groups):
+            parsed = self._executor.map(
+                lambda text: self._parse_text_with_llm(text, is_job=is_job),
+                batch
+            )
+            parsed_by_text.update(zip(batch, parsed))
+        return [parsed_by_text[text] for text in texts]
 
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filepath = results_dir / f"match_result_{timestamp}.json"
+    def match_many(
+        self,
+        jobs: List[str],
+        resumes: List[str],
+        include_reports: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Сопоставляет каждую вакансию с каждым резюме (матрица N×M).
 
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
-            logger.info(f"Результат сохранён в {filepath}")
-            return str(filepath)
-        except Exception as e:
-            logger.error(f"Ошибка при сохранении результата: {e}")
-            raise
+        Каждый уникальный документ парсится один раз, после чего скоринг
+        выполняется для всех пар без обращения к LLM. Фидбэк не генерируется.
+
+        Args:
+            jobs: Тексты вакансий (N)
+            resumes: Тексты резюме (M)
+            include_reports: Включить ли детальные отчёты по каждой паре
+
+        Returns:
+            Словарь с матрицей скоров N×M ('scores') и, если запрошено,
+            матрицами отчётов ('reports') и компонентов скора ('components')
+        """
+        logger.info(f"Пакетный анализ: {len(jobs)} вакансий × {len(resumes)} резюме")
+
+        logger.info("📋 Парсинг вакансий с помощью LLM...")
+        jobs_data = self._parse_many(jobs, is_job=True)
+
+        logger.info("👤 Парсинг резюме с помощью LLM...")
+        # Группы почти-дубликатов нужны и для порядка парсинга, и для duplicate_resumes
+        resume_groups = self._near_duplicate_groups(resumes, False) if self.dedup is not None else None
+        resumes_data = self._parse_many(resumes, is_job=False, groups=resume_groups)
+
+        return self._build_matrix_result(jobs_data, resumes_data, include_reports, resume_groups)
+
+    @property
+    def registry(self) -> DocumentRegistry:
+        """Реестр заранее распарсенных документов (создаётся при первом обращении)."""
+        with self._registry_lock:
+            if self._registry is None:
+                self._registry = DocumentRegistry(self)
+            return self._registry
+
+    def add_job(self, job_id: str, text: str) -> Future:
+        """
+        Регистрирует вакансию и парсит её в фоне (см. DocumentRegistry.add).
+
+        Returns:
+            Future с распарсенными данными
+        """
+        return self.registry.add_job(job_id, text)
+
+    def add_resume(self, resume_id: str, text: str) -> Future:
+        """
+        Регистрирует резюме и парсит его в фоне (см. DocumentRegistry.add).
+
+        Returns:
+            Future с распарсенными данными
+        """
+        return self.registry.add_resume(resume_id, text)
+
+    def match_ids(
+        self,
+        job_id: str,
+        resume_id: str,
+        generate_feedback: bool = False,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Сопоставляет вакансию и резюме, зарегистрированные через add_job/add_resume.
+
+        Документы уже распарсены, поэтому без фидбэка это только скоринг в памяти.
+
+        Args:
+            job_id: Идентификатор вакансии
+            resume_id: Идентификатор резюме
+            generate_feedback: Генерировать ли текстовый фидбэк (обращение к LLM)
+            timeout: Максимальное ожидание парсинга документов, сек
+
+        Returns:
+            Результат в формате match() с полями job_id и resume_id
+
+        Raises:
+            KeyError: Вакансия или резюме не зарегистрированы
+        """
+        return self.registry.match_ids(job_id, resume_id, generate_feedback, timeout)
+
+    def close(self) -> None:
+        """Освобождает пул потоков, HTTP-соединения и дисковый кэш."""
+        self._health_stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+        if self._registry is not None:
+            self._registry.close()
+        self._executor.shutdown(wait=True)
+        self.session.close()
+        if self.parse_cache is not None:
+            self.parse_cache.close()
+        if self.metrics_sink is not None:
+            self.metrics_sink.close()
+        if self._result_store is not None:
+            self._result_store.close()
+        if self.skill_similarity is not None:
+            self.skill_similarity.save()
+
+    def __enter__(self) -> "SmartJobMatcher":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
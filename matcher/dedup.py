@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Поиск почти-дубликатов документов (MinHash + LSH) перед обращением к LLM.
+
+Повторно присланные резюме часто отличаются только пробелами, датами или
+контактами. Такой текст не совпадает с уже распарсенным по хэшу, но его
+словесные шинглы почти те же. Для каждого документа строится MinHash-
+сигнатура; сигнатуры делятся на полосы (LSH), и кандидаты — документы с
+совпадающей полосой. Кандидат считается дубликатом, если оценка сходства
+Жаккара по сигнатурам не ниже порога, а числа вне контактов (опыт,
+зарплата, годы) совпадают: иначе резюме с «2 года» и «5 лет» опыта, почти
+одинаковое по шинглам, получило бы чужой результат парсинга.
+
+Из дат остаётся только год: другой день или месяц (дата отправки, число в
+периоде работы) не мешает найти дубликат, а другой год — мешает, потому
+что годы периодов работы определяют experience_years. Диапазоны лет
+(«2019 - 2024») не принимаются за телефон.
+
+Требует пакет numpy: pip install numpy
+"""
+
+import logging
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Простое число больше 2^32 для хэш-функций вида (a·x + b) mod p
+_PRIME = 4294967311
+
+# Телефон: +7/8 и десять цифр или не меньше десяти цифр с разделителями;
+# диапазон лет «2019 - 2024» телефоном не считается
+_PHONE = re.compile(
+    r"(?<![\w+])(?:\+7|8)[\s(-]{0,2}\d{3}[\s)-]{0,2}\d{3}[\s-]?\d{2}[\s-]?\d{2}(?!\d)"
+    r"|(?<![\w+])(?!(?:19|20)\d\d\s*[-–—]\s*(?:19|20)\d\d(?!\d))\+?\d(?:[\s()-]{0,2}\d){9,}(?!\d)"
+)
+
+
+def _year(match: "re.Match") -> str:
+    """Год даты (четырёхзначная часть, иначе последняя): день и месяц отбрасываются."""
+    parts = re.split(r"[./-]", match.group())
+    return f" {parts[0] if len(parts[0]) == 4 else parts[-1]} "
+
+
+# Контакты заменяются метками, даты — годом: остальное не влияет на содержание документа
+_MASKS = [
+    (re.compile(r"\S+@\S+\.\w+"), " email "),
+    (re.compile(r"(https?://|www\.)\S+"), " url "),
+    (_PHONE, " phone "),
+    (re.compile(r"\b\d{1,4}[./-]\d{1,2}[./-]\d{1,4}\b"), _year),
+]
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> List[str]:
+    """Слова текста в нижнем регистре; контакты заменены метками, даты — годом."""
+    text = text.lower()
+    for pattern, replacement in _MASKS:
+        text = pattern.sub(replacement, text)
+    return _WORD.findall(text)
+
+
+def _choose_bands(num_perm: int, threshold: float, recall: float = 0.99) -> Tuple[int, int]:
+    """
+    Число полос и строк в полосе для порога сходства.
+
+    Пара со сходством s становится кандидатом с вероятностью
+    1 - (1 - s^строк)^полос. Выбираются самые длинные полосы (меньше лишних
+    кандидатов), при которых пара на пороге находится с вероятностью не
+    ниже recall; лишних кандидатов отсеивает проверка по сигнатуре.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    Индекс MinHash-сигнатур документов с поиском почти-дубликатов.
+
+    Документы хранятся отдельно по типу ('job', 'resume') вместе с ключом
+    кэша парсинга. Методы потокобезопасны.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        """
+        Args:
+            threshold: Минимальное сходство Жаккара для дубликата (0..1)
+            num_perm: Длина MinHash-сигнатуры
+            shingle_size: Число слов в шингле
+            seed: Зерно хэш-функций (сигнатуры сравнимы только при одном зерне)
+        """
+        if np is None:
+            raise ImportError("Для поиска почти-дубликатов требуется numpy: pip install numpy")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _choose_bands(num_perm, threshold)
+
+        generator = np.random.default_rng(seed)
+        # a·x + b < 2^64 при x < 2^32: множители и сдвиги меньше 2^32
+        self._a = generator.integers(1, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+
+        self._signatures: Dict[str, List["np.ndarray"]] = defaultdict(list)
+        self._keys: Dict[str, List[str]] = defaultdict(list)
+        self._doc_numbers: Dict[str, List[Tuple[str, ...]]] = defaultdict(list)
+        self._buckets: Dict[str, List[Dict[bytes, List[int]]]] = defaultdict(
+            lambda: [defaultdict(list) for _ in range(self.bands)]
+        )
+        self._known = set()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def signature(self, text: str) -> "np.ndarray":
+        """MinHash-сигнатура текста (num_perm значений)."""
+        return self._sketch(text)[0]
+
+    def _sketch(self, text: str) -> Tuple["np.ndarray", Tuple[str, ...]]:
+        """MinHash-сигнатура и числа текста вне контактов (у дубликатов совпадают)."""
+        # Словесные шинглы; короткий текст — один шингл
+        words = _words(text)
+        size = self.shingle_size
+        grams = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+        hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64)
+        signature = ((hashes[:, None] * self._a + self._b) % _PRIME).min(axis=0)
+        return signature, tuple(sorted(word for word in words if word.isdigit()))
+
+    def _band_keys(self, signature: "np.ndarray") -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def find(self, text: str, kind: str) -> Optional[Tuple[str, float]]:
+        """
+        Ищет ранее добавленный почти-дубликат текста.
+
+        Args:
+            text: Текст документа
+            kind: 'job' или 'resume'
+
+        Returns:
+            Кортеж (ключ кэша парсинга дубликата, оценка сходства) или None
+        """
+        signature, numbers = self._sketch(text)
+        best: Optional[Tuple[str, float]] = None
+        with self._lock:
+            signatures, keys = self._signatures[kind], self._keys[kind]
+            candidates = set()
+            for band, key in zip(self._buckets[kind], self._band_keys(signature)):
+                candidates.update(band.get(key, ()))
+            for doc in candidates:
+                if self._doc_numbers[kind][doc] != numbers:
+                    continue
+                similarity = float(np.mean(signatures[doc] == signature))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (keys[doc], similarity)
+        return best
+
+    def record_duplicate(self) -> None:
+        """Учитывает дубликат, результат которого взят вместо обращения к LLM."""
+        with self._lock:
+            self.duplicates += 1
+
+    def add(self, text: str, kind: str, key: str) -> None:
+        """
+        Добавляет документ в индекс (повторное добавление ключа игнорируется).
+
+        Args:
+            text: Текст документа
+            kind: 'job' или 'resume'
+            key: Ключ кэша парсинга, под которым будет сохранён результат
+        """
+        if key in self._known:
+            return
+        signature, numbers = self._sketch(text)
+        with self._lock:
+            if key in self._known:
+                return
+            self._known.add(key)
+            doc = len(self._keys[kind])
+            self._signatures[kind].append(signature)
+            self._doc_numbers[kind].append(numbers)
+            self._keys[kind].append(key)
+            for band, band_key in zip(self._buckets[kind], self._band_keys(signature)):
+                band[band_key].append(doc)
+
+    def stats(self) -> Dict[str, int]:
+        """Число документов в индексе по типам и использованных дубликатов."""
+        with self._lock:
+            return {
+                'jobs': len(self._keys['job']),
+                'resumes': len(self._keys['resume']),
+                'duplicates': self.duplicates
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(keys) for keys in self._keys.values())
+
+    def __repr__(self) -> str:
+        return f"NearDuplicateIndex({self.stats()}, threshold={self.threshold})"
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Шаблонный генератор фидбэка без обращения к LLM.
+
+Собирает 3-4 предложения на русском из структурированного отчёта
+(strengths, partial_match, missing_required) и скора. Детерминирован и
+работает за микросекунды, поэтому подходит для массовых пакетных прогонов.
+"""
+
+from typing import Dict, Any, List
+
+# Маркеры, которыми _calculate_score помечает элементы отчёта
+_MARKERS = ("✓ ", "✗ ", "+ ", "≈ ")
+
+# Сколько элементов каждого списка упоминать в тексте
+_MAX_ITEMS = 3
+
+
+def _clean(item: str) -> str:
+    """Убирает служебный маркер в начале элемента отчёта."""
+    for marker in _MARKERS:
+        if item.startswith(marker):
+            return item[len(marker):]
+    return item
+
+
+def _join(items: List[str]) -> str:
+    """Объединяет элементы через запятую и «и» перед последним."""
+    items = [_clean(item) for item in items[:_MAX_ITEMS]]
+    if len(items) == 1:
+        return items[0]
+    return ", ".join(items[:-1]) + " и " + items[-1]
+
+
+def build_template_feedback(report: Dict[str, Any], score: int) -> str:
+    """
+    Строит текстовый фидбэк по отчёту о соответствии.
+
+    Args:
+        report: Отчёт из _calculate_score
+        score: Итоговый скор
+
+    Returns:
+        Текстовый фидбэк из 3-4 предложений
+    """
+    strengths = report.get('strengths', [])
+    partial = report.get('partial_match', [])
+    missing = report.get('missing_required', [])
+
+    if score >= 80:
+        sentences = ["Ваш профиль хорошо соответствует требованиям вакансии."]
+    elif score >= 60:
+        sentences = ["Ваш профиль в целом соответствует требованиям вакансии."]
+    elif score >= 40:
+        sentences = ["Ваш профиль частично соответствует требованиям вакансии."]
+    else:
+        sentences = ["Ваш профиль пока слабо соответствует требованиям вакансии."]
+
+    if strengths:
+        sentences.append(f"Сильные стороны: {_join(strengths)}.")
+
+    # Не больше 4 предложений: частичные совпадения упоминаем, если есть место
+    if partial and not (strengths and missing):
+        sentences.append(f"Частично совпадает: {_join(partial)}.")
+
+    if missing:
+        sentences.append(f"Стоит усилить: {_join(missing)}.")
+    elif strengths and not partial:
+        sentences.append("Ключевые требования вакансии закрыты.")
+    elif not partial:
+        # Пустой отчёт: оценка складывается без отдельных совпадений и пробелов
+        sentences.append("Явных совпадений или пробелов по требованиям вакансии не выявлено.")
+
+    if score >= 60:
+        sentences.append("Рекомендуем откликнуться.")
+    elif score >= 40:
+        sentences.append("Откликнуться можно, но лучше сначала подтянуть недостающие навыки.")
+    else:
+        sentences.append("Возможно, стоит рассмотреть другие вакансии или дополнить свои компетенции.")
+
+    return " ".join(sentences)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Инвертированный индекс навыков для поиска лучших кандидатов без попарного скоринга.
+
+Скор каждого найденного кандидата совпадает со скором _calculate_score
+при тех же весах, если нечёткое сравнение навыков (scoring.fuzzy) выключено:
+индекс засчитывает только точные совпадения навыков, без частичного зачёта
+за близкие. Кандидаты, не разделяющие с вакансией ни одного навыка,
+отбрасываются по верхней оценке (образование + опыт), не просматривая весь пул.
+"""
+
+import heapq
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from .config import Config
+from .skills import covered_skill_ids, document_skill_ids
+
+logger = logging.getLogger(__name__)
+
+
+class CandidateIndex:
+    """
+    Индекс распарсенных резюме для запросов top-K по вакансии.
+
+    Хранит для каждого канонического ID hard/soft навыка список резюме
+    (posting list), а также резюме, отсортированные по опыту.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, config: Optional[Config] = None):
+        """
+        Инициализация индекса.
+
+        Args:
+            weights: Веса скоринга (если None, берутся из конфигурации)
+            config: Конфигурация матчера (по умолчанию настройки по умолчанию)
+        """
+        config = config or Config()
+        self.weights = dict(weights) if weights else config.weights.copy()
+        if config.get("scoring.fuzzy.enabled", False):
+            logger.warning(
+                "⚠ scoring.fuzzy включён, а CandidateIndex учитывает только точные совпадения навыков: "
+                "скоры top_k ниже, чем у _calculate_score, для кандидатов с близкими навыками"
+            )
+
+        self._ids: List[str] = []
+        self._has_education: List[bool] = []
+        self._experience: List[float] = []
+        self._hard_postings: Dict[int, List[int]] = defaultdict(list)
+        self._soft_postings: Dict[int, List[int]] = defaultdict(list)
+
+        # Резюме по группам "есть образование"/"нет", отсортированные по опыту
+        self._by_experience: Dict[bool, List[Tuple[float, int]]] = {True: [], False: []}
+        self._sorted = True
+
+    def add(self, resume_id: str, resume_data: Dict[str, Any]) -> None:
+        """
+        Добавить распарсенное резюме в индекс.
+
+        Args:
+            resume_id: Идентификатор резюме
+            resume_data: Результат _parse_text_with_llm для резюме
+        """
+        doc = len(self._ids)
+        has_education = bool(resume_data['education'])
+        experience = resume_data['experience_years']
+
+        self._ids.append(resume_id)
+        self._has_education.append(has_education)
+        self._experience.append(experience)
+
+        # Навыки резюме с учётом групп — как в _calculate_score
+        for skill in covered_skill_ids(resume_data, 'hard_skills'):
+            self._hard_postings[skill].append(doc)
+        for skill in covered_skill_ids(resume_data, 'soft_skills'):
+            self._soft_postings[skill].append(doc)
+
+        self._by_experience[has_education].append((experience, doc))
+        self._sorted = False
+
+    def add_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Добавить несколько резюме.
+
+        Args:
+            items: Словарь {resume_id: resume_data}
+        """
+        for resume_id, resume_data in items.items():
+            self.add(resume_id, resume_data)
+
+    def _base_score(self, doc: int, job_has_education: bool, job_exp: float) -> float:
+        """Вклад образования и опыта — в том же порядке вычислений, что в _calculate_score."""
+        total = 0
+        total += self.weights['education_match'] if job_has_education and self._has_education[doc] else 0
+
+        resume_exp = self._experience[doc]
+        exp_score = 0
+        if job_exp > 0:
+            if resume_exp >= job_exp:
+                exp_score = self.weights['experience_match']
+            elif resume_exp > 0:
+                exp_score = (resume_exp / job_exp) * self.weights['experience_match']
+        total += exp_score
+        return total
+
+    def top_k(
+        self,
+        job_data: Dict[str, Any],
+        k: int = 20,
+        min_experience: Optional[float] = None,
+        max_experience: Optional[float] = None
+    ) -> List[Tuple[str, int]]:
+        """
+        Найти k лучших резюме для вакансии.
+
+        Порядок совпадает с полным перебором, отсортированным по убыванию
+        итогового скора (при равенстве — по точному скору, затем по порядку
+        добавления). Скоры равны _calculate_score без scoring.fuzzy: частичный
+        зачёт за близкие навыки индекс не учитывает.
+
+        Args:
+            job_data: Распарсенные данные вакансии
+            k: Сколько кандидатов вернуть
+            min_experience: Минимальный опыт кандидата в годах (включительно)
+            max_experience: Максимальный опыт кандидата в годах (включительно)
+
+        Returns:
+            Список пар (resume_id, score) по убыванию скора
+        """
+        if k <= 0 or not self._ids:
+            return []
+
+        if not self._sorted:
+            for group in self._by_experience.values():
+                group.sort()
+            self._sorted = True
+
+        def passes_filter(doc: int) -> bool:
+            exp = self._experience[doc]
+            if min_experience is not None and exp < min_experience:
+                return False
+            if max_experience is not None and exp > max_experience:
+                return False
+            return True
+
+        job_has_education = bool(job_data['education'])
+        job_exp = job_data['experience_years']
+        job_hard = document_skill_ids(job_data, 'hard_skills')
+        job_soft = document_skill_ids(job_data, 'soft_skills')
+
+        hard_points = self.weights['hard_skills_match'] / len(job_hard) if job_hard else 0
+        soft_points = self.weights['soft_skills_match'] / max(1, len(job_soft)) if job_soft else 0
+
+        # Максимально возможный вклад образования и опыта
+        base_max = (self.weights['education_match'] if job_has_education else 0) + \
+            (self.weights['experience_match'] if job_exp > 0 else 0)
+
+        # Термы от редких к частым: частые обрабатываются последними и
+        # по возможности только обновляют уже найденных кандидатов
+        terms = [(self._hard_postings.get(skill, []), 0) for skill in job_hard] + \
+            [(self._soft_postings.get(skill, []), 1) for skill in job_soft]
+        terms = [term for term in terms if term[0]]
+        terms.sort(key=lambda term: len(term[0]))
+
+        remaining_max = [0.0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            remaining_max[i] = remaining_max[i + 1] + (hard_points if terms[i][1] == 0 else soft_points)
+
+        # --- 1. Накопление совпадений по posting lists ---
+        matches: Dict[int, List[int]] = {}
+        admit_new = True
+        for i, (postings, kind) in enumerate(terms):
+            if admit_new and i > 0 and len(matches) >= k:
+                # Нижняя граница k-го кандидата по уже найденным совпадениям
+                lower_bounds = heapq.nlargest(k, (
+                    self._base_score(doc, job_has_education, job_exp)
+                    + counts[0] * hard_points + counts[1] * soft_points
+                    for doc, counts in matches.items()
+                ))
+                if lower_bounds[-1] > base_max + remaining_max[i]:
+                    admit_new = False
+
+            for doc in postings:
+                counts = matches.get(doc)
+                if counts is None:
+                    if not admit_new or not passes_filter(doc):
+                        continue
+                    counts = matches[doc] = [0, 0]
+                counts[kind] += 1
+
+        # --- 2. Точный скор найденных кандидатов ---
+        heap: List[Tuple[int, float, int]] = []
+
+        def push(doc: int, total: float) -> None:
+            item = (min(100, round(total)), total, -doc)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        for doc, (hard_matched, soft_matched) in matches.items():
+            total = self._base_score(doc, job_has_education, job_exp)
+            total += hard_matched * hard_points if job_hard else 0
+            total += soft_matched * soft_points
+            push(doc, total)
+
+        # --- 3. Кандидаты без общих навыков: только образование и опыт ---
+        if len(heap) < k or heap[0][1] <= base_max:
+            for group in self._by_experience.values():
+                lo = 0 if min_experience is None else bisect_left(group, (min_experience, -1))
+                hi = len(group) if max_experience is None else bisect_right(group, (max_experience, len(self._ids)))
+                for position in range(hi - 1, lo - 1, -1):
+                    doc = group[position][1]
+                    if doc in matches:
+                        continue
+                    total = self._base_score(doc, job_has_education, job_exp)
+                    # Скор не возрастает при движении вниз по опыту
+                    if len(heap) >= k and total < heap[0][1]:
+                        break
+                    push(doc, total)
+
+        ranked = sorted(heap, reverse=True)
+        logger.debug(f"top_k: просмотрено {len(matches)} кандидатов с общими навыками из {len(self._ids)}")
+        return [(self._ids[-neg_doc], score) for score, _, neg_doc in ranked]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __repr__(self) -> str:
+        return f"CandidateIndex(size={len(self)}, skills={len(self._hard_postings) + len(self._soft_postings)})"
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Метрики SmartJobMatcher: длительность этапов, обращения к LLM, кэш и fallback.
+
+MatchMetrics собирает данные одного вызова match() (в том числе из потоков
+пула), результат прикладывается к ответу под ключом 'metrics' и передаётся
+в подключаемый приёмник (MetricsSink). Встроены два приёмника:
+PrometheusSink (агрегаты в текстовом формате Prometheus) и JsonSink
+(по строке JSON на операцию).
+"""
+
+import json
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Dict, Any, List, Optional, TextIO
+
+from .config import Config
+
+# Поля ответа Ollama с длительностями в наносекундах
+_OLLAMA_DURATIONS = ("prompt_eval_duration", "eval_duration", "load_duration", "total_duration")
+
+
+class StageMetrics:
+    """Метрики одного этапа; передаётся в методы, выполняющие этап."""
+
+    def __init__(self, parent: "MatchMetrics", name: str):
+        self.parent = parent
+        self.name = name
+
+    def record_llm_call(
+        self,
+        prompt: str,
+        response_body: Optional[Dict[str, Any]],
+        wall_time: float,
+        error: Optional[str] = None,
+        endpoint: Optional[str] = None
+    ) -> None:
+        """
+        Записывает обращение к LLM.
+
+        Args:
+            prompt: Отправленный промпт
+            response_body: Декодированный ответ Ollama (None при ошибке)
+            wall_time: Полное время запроса на стороне клиента, сек
+            error: Описание ошибки, если запрос не удался
+            endpoint: URL сервера, обработавшего запрос
+        """
+        body = response_body or {}
+        call = {
+            'stage': self.name,
+            'prompt_chars': len(prompt),
+            'response_chars': len(body.get('response', '')),
+            'prompt_eval_count': body.get('prompt_eval_count', 0),
+            'eval_count': body.get('eval_count', 0),
+            'wall_sec': round(wall_time, 6)
+        }
+        for field in _OLLAMA_DURATIONS:
+            call[f"{field}_sec"] = round(body.get(field, 0) / 1e9, 6)
+        if endpoint is not None:
+            call['endpoint'] = endpoint
+        if body.get('early_stop'):
+            call['early_stop'] = True
+        if error is not None:
+            call['error'] = error
+        self.parent._add_llm_call(call)
+        if error is not None:
+            self.increment('llm_errors')
+
+    def increment(self, counter: str, value: int = 1) -> None:
+        """Увеличивает счётчик ('cache_hits', 'cache_misses', 'fallbacks', ...)."""
+        self.parent._increment(counter, value)
+
+
+class MatchMetrics:
+    """Сборщик метрик одной операции (потокобезопасный)."""
+
+    def __init__(self, operation: str = "match"):
+        """
+        Args:
+            operation: Название операции ('match', 'save')
+        """
+        self.operation = operation
+        self.stages: Dict[str, float] = {}
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.counters: Dict[str, int] = {
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'fallbacks': 0,
+            'llm_errors': 0,
+            'retries': 0,
+            'circuit_open': 0,
+            'preparse_hits': 0,
+            'preparse_misses': 0,
+            'near_duplicates': 0
+        }
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Замеряет длительность этапа; повторные замеры одного этапа суммируются."""
+        start = time.perf_counter()
+        try:
+            yield StageMetrics(self, name)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def _add_llm_call(self, call: Dict[str, Any]) -> None:
+        with self._lock:
+            self.llm_calls.append(call)
+
+    def _increment(self, counter: str, value: int) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Снимок метрик в виде JSON-совместимого словаря."""
+        with self._lock:
+            calls = [dict(call) for call in self.llm_calls]
+            return {
+                'operation': self.operation,
+                'timestamp': datetime.now().isoformat(),
+                'total_sec': round(time.perf_counter() - self._started, 6),
+                'stages': {name: round(value, 6) for name, value in self.stages.items()},
+                'llm': {
+                    'calls': len(calls),
+                    'prompt_chars': sum(c['prompt_chars'] for c in calls),
+                    'response_chars': sum(c['response_chars'] for c in calls),
+                    'prompt_tokens': sum(c['prompt_eval_count'] for c in calls),
+                    'completion_tokens': sum(c['eval_count'] for c in calls),
+                    'prompt_eval_sec': round(sum(c['prompt_eval_duration_sec'] for c in calls), 6),
+                    'model_sec': round(sum(c['total_duration_sec'] for c in calls), 6),
+                    'wall_sec': round(sum(c['wall_sec'] for c in calls), 6)
+                },
+                'llm_calls': calls,
+                'counters': dict(self.counters)
+            }
+
+
+def timed_stage(metrics: Optional[MatchMetrics], name: str):
+    """Контекст этапа: StageMetrics, либо None, если метрики не собираются."""
+    return metrics.stage(name) if metrics is not None else nullcontext()
+
+
+class MetricsSink(ABC):
+    """Базовый приёмник метрик. Наследники реализуют record()."""
+
+    @abstractmethod
+    def record(self, metrics: Dict[str, Any]) -> None:
+        """
+        Принимает метрики одной операции.
+
+        Args:
+            metrics: Результат MatchMetrics.to_dict()
+        """
+
+    def close(self) -> None:
+        """Освобождает ресурсы приёмника."""
+
+
+class JsonSink(MetricsSink):
+    """Пишет метрики каждой операции отдельной строкой JSON (JSONL)."""
+
+    def __init__(self, path: Optional[str] = None, stream: Optional[TextIO] = None):
+        """
+        Args:
+            path: Файл для дозаписи (если None, используется stream)
+            stream: Поток вывода (по умолчанию sys.stdout)
+        """
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+        self._stream = self._file or stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def record(self, metrics: Dict[str, Any]) -> None:
+        line = json.dumps(metrics, ensure_ascii=False)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PrometheusSink(MetricsSink):
+    """
+    Агрегирует метрики и отдаёт их в текстовом формате Prometheus.
+
+    render() возвращает текст для эндпоинта /metrics или textfile-коллектора.
+    """
+
+    # Границы гистограммы длительностей этапов, сек
+    BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, prefix: str = "matcher"):
+        """
+        Args:
+            prefix: Префикс имён метрик
+        """
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._operations: Dict[str, int] = {}
+        self._stage_buckets: Dict[str, List[int]] = {}
+        self._stage_sum: Dict[str, float] = {}
+        self._stage_count: Dict[str, int] = {}
+        self._llm: Dict[tuple, float] = {}
+        self._counters: Dict[str, int] = {}
+
+    def record(self, metrics: Dict[str, Any]) -> None:
+        with self._lock:
+            operation = metrics.get('operation', 'match')
+            self._operations[operation] = self._operations.get(operation, 0) + 1
+
+            for stage, seconds in metrics.get('stages', {}).items():
+                buckets = self._stage_buckets.setdefault(stage, [0] * len(self.BUCKETS))
+                for i, bound in enumerate(self.BUCKETS):
+                    if seconds <= bound:
+                        buckets[i] += 1
+                self._stage_sum[stage] = self._stage_sum.get(stage, 0.0) + seconds
+                self._stage_count[stage] = self._stage_count.get(stage, 0) + 1
+
+            for call in metrics.get('llm_calls', []):
+                stage = call['stage']
+                status = "error" if 'error' in call else "ok"
+                self._add_llm(("requests_total", stage, status), 1)
+                self._add_llm(("request_seconds_total", stage, None), call['wall_sec'])
+                self._add_llm(("model_seconds_total", stage, None), call['total_duration_sec'])
+                self._add_llm(("prompt_eval_seconds_total", stage, None), call['prompt_eval_duration_sec'])
+                self._add_llm(("prompt_tokens_total", stage, None), call['prompt_eval_count'])
+                self._add_llm(("completion_tokens_total", stage, None), call['eval_count'])
+                self._add_llm(("prompt_chars_total", stage, None), call['prompt_chars'])
+                self._add_llm(("response_chars_total", stage, None), call['response_chars'])
+
+            for counter, value in metrics.get('counters', {}).items():
+                self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def _add_llm(self, key: tuple, value: float) -> None:
+        self._llm[key] = self._llm.get(key, 0) + value
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+    def render(self) -> str:
+        """Текущие агрегаты в текстовом формате Prometheus (version 0.0.4)."""
+        p = self.prefix
+        lines: List[str] = []
+
+        with self._lock:
+            lines.append(f"# TYPE {p}_operations_total counter")
+            for operation, count in sorted(self._operations.items()):
+                lines.append(f'{p}_operations_total{{operation="{operation}"}} {count}')
+
+            lines.append(f"# TYPE {p}_stage_duration_seconds histogram")
+            for stage in sorted(self._stage_buckets):
+                for bound, count in zip(self.BUCKETS, self._stage_buckets[stage]):
+                    lines.append(f'{p}_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{p}_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {self._stage_count[stage]}')
+                lines.append(f'{p}_stage_duration_seconds_sum{{stage="{stage}"}} {self._format_value(self._stage_sum[stage])}')
+                lines.append(f'{p}_stage_duration_seconds_count{{stage="{stage}"}} {self._stage_count[stage]}')
+
+            by_name: Dict[str, List[tuple]] = {}
+            for (name, stage, status), value in sorted(self._llm.items(), key=lambda item: (item[0][0], item[0][1], item[0][2] or "")):
+                by_name.setdefault(name, []).append((stage, status, value))
+            for name, series in by_name.items():
+                lines.append(f"# TYPE {p}_llm_{name} counter")
+                for stage, status, value in series:
+                    labels = f'stage="{stage}"' + (f',status="{status}"' if status else "")
+                    lines.append(f"{p}_llm_{name}{{{labels}}} {self._format_value(value)}")
+
+            for counter, value in sorted(self._counters.items()):
+                lines.append(f"# TYPE {p}_{counter}_total counter")
+                lines.append(f"{p}_{counter}_total {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def create_sink(config: Config) -> Optional[MetricsSink]:
+    """
+    Создаёт приёмник метрик по настройкам metrics.sink и metrics.path.
+
+    Returns:
+        PrometheusSink, JsonSink или None, если приёмник не задан
+    """
+    sink = config.get("metrics.sink")
+    if not sink:
+        return None
+    if sink == "prometheus":
+        return PrometheusSink()
+    if sink == "json":
+        return JsonSink(path=config.get("metrics.path"))
+    raise ValueError(f"Неизвестный приёмник метрик: {sink}")
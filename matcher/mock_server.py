@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Локальный mock-сервер Ollama для бенчмарков и разработки без модели.
+
+Реализует /api/generate (обычный и потоковый режим) и /api/tags.
+Задержка, разброс задержки, доля ошибок и ответы настраиваются.
+
+Пример:
+    python -m matcher.mock_server --port 11434 --latency 0.5 --jitter 0.1 --error-rate 0.01
+
+Или из кода:
+    with MockOllamaServer(latency=0.2) as server:
+        matcher = SmartJobMatcher(ollama_url=server.url)
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSES: Dict[str, Any] = {
+    "job": {
+        "education": "Высшее техническое образование",
+        "experience_years": 3,
+        "hard_skills": ["Python", "SQL", "Docker", "Git"],
+        "soft_skills": ["ответственность", "коммуникабельность"]
+    },
+    "resume": {
+        "education": "МФТИ, прикладная математика",
+        "experience_years": 2.5,
+        "hard_skills": ["Python", "SQL", "Git", "pandas"],
+        "soft_skills": ["ответственность"]
+    },
+    "feedback": "Хорошее соответствие. Профиль релевантен требованиям вакансии. Стоит откликнуться."
+}
+
+
+def classify_prompt(prompt: str) -> str:
+    """
+    Определяет тип промпта SmartJobMatcher.
+
+    Returns:
+        'pair', 'feedback', 'resume' или 'job'
+    """
+    if '"job"' in prompt and '"resume"' in prompt:
+        return "pair"
+    if "фидбэк" in prompt:
+        return "feedback"
+    if "резюме кандидата" in prompt:
+        return "resume"
+    return "job"
+
+
+class MockOllamaServer:
+    """HTTP-сервер, имитирующий Ollama API, в фоновом потоке."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        responses: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None,
+        chunk_delay: float = 0.0,
+        trailing_chunks: int = 0,
+        prompt_rate: float = 0.0,
+        max_parallel: int = 0,
+        prefix_cache: bool = False
+    ):
+        """
+        Инициализация сервера.
+
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 — выбрать свободный)
+            latency: Средняя задержка ответа в секундах
+            jitter: Разброс задержки (равномерно в пределах ±jitter)
+            error_rate: Доля запросов, завершающихся ошибкой 500
+            responses: Ответы по типам промптов ('job', 'resume', 'feedback')
+            seed: Зерно генератора случайных чисел для воспроизводимости
+            chunk_delay: Пауза между чанками в потоковом режиме, сек
+            trailing_chunks: Сколько пробельных чанков отправлять после JSON
+                в потоковом режиме (как делают небольшие модели)
+            prompt_rate: Время обработки промпта на 1000 символов, сек
+                (имитация prompt eval на CPU)
+            max_parallel: Сколько запросов обрабатывается одновременно, остальные
+                ждут в очереди (как OLLAMA_NUM_PARALLEL); 0 — без ограничения
+            prefix_cache: Имитировать KV-кэш Ollama: общее начало с недавним
+                промптом не учитывается в prompt_rate и prompt_eval_count
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunk_delay = chunk_delay
+        self.trailing_chunks = trailing_chunks
+        self.prompt_rate = prompt_rate
+        self._slots = threading.Semaphore(max_parallel) if max_parallel > 0 else None
+        # Недавние промпты, по одному на слот (как KV-кэш слотов Ollama)
+        self._recent_prompts: Optional[deque] = deque(maxlen=max_parallel or 4) if prefix_cache else None
+        self.responses = dict(DEFAULT_RESPONSES, **(responses or {}))
+
+        self.stats: Dict[str, int] = {"generate": 0, "tags": 0, "errors": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """URL эндпоинта /api/generate."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def reset_stats(self) -> None:
+        """Обнулить счётчики запросов."""
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def _next_delay_and_error(self) -> tuple:
+        """Задержка и признак ошибки для очередного запроса."""
+        with self._lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            failed = self._random.random() < self.error_rate
+        return max(0.0, delay), failed
+
+    def _evaluated_chars(self, prompt: str) -> int:
+        """Сколько символов промпта модель обрабатывает с учётом кэша префикса."""
+        if self._recent_prompts is None:
+            return len(prompt)
+        with self._lock:
+            cached = max((len(os.path.commonprefix([prompt, recent])) for recent in self._recent_prompts), default=0)
+            self._recent_prompts.append(prompt)
+        return len(prompt) - cached
+
+    def _render_response(self, prompt: str) -> str:
+        """Текст ответа модели для промпта."""
+        kind = classify_prompt(prompt)
+        if kind == "pair":
+            return json.dumps(
+                {"job": self.responses["job"], "resume": self.responses["resume"]},
+                ensure_ascii=False
+            )
+        value = self.responses[kind]
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+                payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path.rstrip('/') != "/api/tags":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                with server._lock:
+                    server.stats["tags"] += 1
+                self._send_json(200, {"models": [{"name": "mock:latest"}]})
+
+            def do_POST(self):
+                if self.path.rstrip('/') != "/api/generate":
+                    self._send_json(404, {"error": "not found"})
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                prompt = request.get("prompt", "")
+
+                with server._lock:
+                    server.stats["generate"] += 1
+
+                delay, failed = server._next_delay_and_error()
+                evaluated = server._evaluated_chars(prompt)
+                prompt_eval = server.prompt_rate * evaluated / 1000
+                if server._slots is not None:
+                    with server._slots:
+                        time.sleep(delay + prompt_eval)
+                else:
+                    time.sleep(delay + prompt_eval)
+
+                if failed:
+                    with server._lock:
+                        server.stats["errors"] += 1
+                    self._send_json(500, {"error": "mock failure"})
+                    return
+
+                text = server._render_response(prompt)
+                final = {
+                    "model": request.get("model", "mock"),
+                    "done": True,
+                    "prompt_eval_count": evaluated // 4,
+                    "prompt_eval_duration": int((delay * 0.7 + prompt_eval) * 1e9),
+                    "eval_count": len(text) // 4,
+                    "eval_duration": int(delay * 0.3 * 1e9),
+                    "total_duration": int((delay + prompt_eval) * 1e9)
+                }
+
+                pieces = [text[start:start + 8] for start in range(0, len(text), 8)]
+                pieces += ["\n "] * server.trailing_chunks
+
+                if not request.get("stream", True):
+                    # Без потока клиент ждёт генерации всех чанков, включая хвост
+                    time.sleep(server.chunk_delay * len(pieces))
+                    self._send_json(200, dict(final, response=text + "\n " * server.trailing_chunks))
+                    return
+
+                # Потоковый режим: NDJSON чанки, как у Ollama
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                try:
+                    for piece in pieces:
+                        chunk = {"response": piece, "done": False}
+                        self.wfile.write((json.dumps(chunk, ensure_ascii=False) + "\n").encode('utf-8'))
+                        self.wfile.flush()
+                        time.sleep(server.chunk_delay)
+                    self.wfile.write((json.dumps(dict(final, response=""), ensure_ascii=False) + "\n").encode('utf-8'))
+                except (BrokenPipeError, ConnectionResetError):
+                    # Клиент закрыл соединение, получив всё нужное
+                    pass
+
+        return Handler
+
+    def start(self) -> "MockOllamaServer":
+        """Запустить сервер в фоновом потоке."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock Ollama сервер запущен: {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Остановить сервер."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "MockOllamaServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа CLI: python -m matcher.mock_server."""
+    parser = argparse.ArgumentParser(
+        prog="python -m matcher.mock_server",
+        description="Mock-сервер Ollama API для бенчмарков"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.0, help="Средняя задержка, сек")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Разброс задержки, сек")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 500")
+    parser.add_argument("--responses", help="JSON файл с ответами {'job', 'resume', 'feedback'}")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Пауза между чанками потока, сек")
+    parser.add_argument("--trailing-chunks", type=int, default=0, help="Пробельных чанков после JSON")
+    parser.add_argument("--prompt-rate", type=float, default=0.0, help="Обработка промпта, сек на 1000 символов")
+    parser.add_argument("--max-parallel", type=int, default=0, help="Одновременно обрабатываемых запросов (0 — без ограничения)")
+    parser.add_argument("--prefix-cache", action="store_true", help="Имитировать KV-кэш общего префикса промптов")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    responses = None
+    if args.responses:
+        with open(args.responses, 'r', encoding='utf-8') as f:
+            responses = json.load(f)
+
+    server = MockOllamaServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        responses=responses,
+        seed=args.seed,
+        chunk_delay=args.chunk_delay,
+        trailing_chunks=args.trailing_chunks,
+        prompt_rate=args.prompt_rate,
+        max_parallel=args.max_parallel,
+        prefix_cache=args.prefix_cache
+    )
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Быстрый детерминированный разбор шаблонных вакансий и резюме без LLM.
+
+Многие документы свёрстаны по одному образцу: «Образование: …»,
+«Опыт работы: от N лет», «Навыки: …», список «Требования:». PreParser
+разбирает такие документы регулярными выражениями и словарями заголовков
+и личных качеств, возвращая ту же схему, что и парсинг через LLM, вместе
+с оценкой уверенности 0..1. Уверенность складывается из найденных полей
+и умножается на долю строк документа, которые удалось отнести к полям:
+свободный текст, который разбор не понял, снижает её, и документ уходит в LLM.
+"""
+
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+# Заголовки разделов (в нижнем регистре, без двоеточия) и поле, к которому они относятся
+SECTION_HEADERS = {
+    "образование": "education",
+    "опыт": "experience",
+    "опыт работы": "experience",
+    "стаж": "experience",
+    "навыки": "hard_skills",
+    "ключевые навыки": "hard_skills",
+    "профессиональные навыки": "hard_skills",
+    "технические навыки": "hard_skills",
+    "hard skills": "hard_skills",
+    "стек": "hard_skills",
+    "технологии": "hard_skills",
+    "инструменты": "hard_skills",
+    "владение по": "hard_skills",
+    "требования": "requirements",
+    "мы ждём": "requirements",
+    "мы ждем": "requirements",
+    "личные качества": "soft_skills",
+    "качества": "soft_skills",
+    "soft skills": "soft_skills",
+    "обязанности": "ignore",
+    "условия": "ignore",
+    "мы предлагаем": "ignore",
+    "о компании": "ignore",
+    "контакты": "ignore",
+}
+
+# Основы слов личных качеств и их каноническая форма
+SOFT_SKILL_STEMS = (
+    ("коммуникабельн", "коммуникабельность"),
+    ("ответственн", "ответственность"),
+    ("самостоятельн", "самостоятельность"),
+    ("командн", "командная работа"),
+    ("работа в команде", "командная работа"),
+    ("стрессоустойчив", "стрессоустойчивость"),
+    ("внимательн", "внимательность"),
+    ("внимание к детал", "внимательность"),
+    ("пунктуальн", "пунктуальность"),
+    ("обучаем", "обучаемость"),
+    ("желание учиться", "обучаемость"),
+    ("быстро учусь", "обучаемость"),
+    ("быстро обучаюсь", "обучаемость"),
+    ("мотивирован", "мотивированность"),
+    ("инициативн", "инициативность"),
+    ("организованн", "организованность"),
+    ("аккуратн", "аккуратность"),
+    ("исполнительн", "исполнительность"),
+    ("усидчив", "усидчивость"),
+    ("доброжелательн", "доброжелательность"),
+    ("лидерск", "лидерские качества"),
+    ("аналитическ", "аналитическое мышление"),
+    ("многозадачн", "многозадачность"),
+)
+
+# Вводные слова перед навыком в пунктах требований
+_SKILL_PREFIXES = re.compile(
+    r"^(?:уверенное\s+|хорошее\s+|отличное\s+|базовое\s+)?"
+    r"(?:знание|знания|владение|опыт работы с|опыт работы в|умение работать с|умение работать в|"
+    r"понимание|навыки работы с|навыки работы в|навыки)\s+",
+    re.IGNORECASE
+)
+
+_BULLET = re.compile(r"^\s*(?:[-–—•*·]|\d+[.)])\s*")
+_HEADER = re.compile(r"^([A-Za-zА-Яа-яЁё /]{2,30}?)\s*:\s*(.*)$")
+_EXPERIENCE = re.compile(
+    r"(?:опыт|стаж|experience)[^\d\n]{0,40}?(?:от\s+|не менее\s+|более\s+)?"
+    r"(\d+(?:[.,]\d+)?)\s*\+?\s*(?:год|года|лет|years?)",
+    re.IGNORECASE
+)
+_YEARS = re.compile(r"(\d+(?:[.,]\d+)?)\s*\+?\s*(?:год|года|лет|years?)", re.IGNORECASE)
+_NO_EXPERIENCE = re.compile(r"без опыта|опыт не требуется|опыт не обязателен", re.IGNORECASE)
+_EDUCATION = re.compile(r"образовани|^(?:высшее|среднее|неоконченное высшее)\b", re.IGNORECASE)
+_VERSION_SUFFIX = re.compile(r"\s+\d+(?:\.\d+)*\+?$")
+
+# Вклад найденных полей в уверенность
+_FIELD_WEIGHTS = {
+    "education": 0.25,
+    "experience_years": 0.25,
+    "hard_skills": 0.35,
+    "soft_skills": 0.15,
+}
+
+
+def _soft_skill(item: str) -> Optional[str]:
+    """Каноническое название личного качества или None, если это не оно."""
+    lowered = item.lower()
+    for stem, canonical in SOFT_SKILL_STEMS:
+        if stem in lowered:
+            return canonical
+    return None
+
+
+def _split_items(value: str) -> List[str]:
+    """Делит перечисление на элементы; скобки раскрываются: «MS Office (Word, Excel)»."""
+    items = []
+    value = re.sub(r"\s+(?:и|или|and|or)\s+", ", ", value)
+    for match in re.finditer(r"([^,;(]+)(?:\(([^)]*)\))?", value):
+        head = match.group(1).strip(" .")
+        if head:
+            items.append(head)
+        if match.group(2):
+            items.extend(part.strip(" .") for part in re.split(r"[,;]", match.group(2)) if part.strip(" ."))
+    return items
+
+
+def _clean_skill(item: str) -> str:
+    """Убирает вводные слова и версию: «Знание Python 3.8+» → «Python»."""
+    item = _SKILL_PREFIXES.sub("", item.strip())
+    item = _VERSION_SUFFIX.sub("", item)
+    return item.strip(" .")
+
+
+class PreParser:
+    """Разбор шаблонных документов регулярными выражениями и словарями."""
+
+    def __init__(self, min_confidence: float = 0.8):
+        """
+        Args:
+            min_confidence: Порог уверенности, ниже которого документ отдаётся LLM
+        """
+        self.min_confidence = min_confidence
+
+    def parse(self, text: str, is_job: bool = True) -> Tuple[Dict[str, Any], float]:
+        """
+        Извлекает структурированные данные из документа.
+
+        Args:
+            text: Текст вакансии или резюме
+            is_job: True для вакансии, False для резюме
+
+        Returns:
+            Кортеж (данные в схеме парсинга LLM, уверенность 0..1)
+        """
+        data: Dict[str, Any] = {
+            "education": "",
+            "experience_years": 0,
+            "hard_skills": [],
+            "soft_skills": []
+        }
+        found = set()
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        if not lines:
+            return data, 0.0
+
+        consumed = 0
+        section: Optional[str] = None
+
+        for index, line in enumerate(lines):
+            bullet = _BULLET.match(line) is not None
+            line = _BULLET.sub("", line)
+            header = _HEADER.match(line)
+            header_field = SECTION_HEADERS.get(header.group(1).strip().lower()) if header else None
+
+            if header_field is not None:
+                value = header.group(2).strip()
+                # «- Опыт: от 2 лет» внутри списка — поле, а не начало нового раздела
+                if not bullet:
+                    section = header_field
+                consumed += 1
+                if value and header_field not in ("requirements", "ignore"):
+                    self._add(data, found, header_field, value)
+                continue
+
+            if section == "ignore":
+                consumed += 1
+            elif section in ("requirements", "hard_skills", "soft_skills", "education", "experience"):
+                consumed += self._add(data, found, section, line)
+            elif index == 0 and is_job:
+                # Первая строка вакансии — название должности
+                consumed += 1
+            else:
+                # Строка вне разделов: учитываем только явные поля
+                consumed += self._add(data, found, "requirements", line, strict=True)
+
+        data["hard_skills"] = list(dict.fromkeys(data["hard_skills"]))
+        data["soft_skills"] = list(dict.fromkeys(data["soft_skills"]))
+
+        score = sum(weight for field, weight in _FIELD_WEIGHTS.items() if field in found)
+        return data, round(score * consumed / len(lines), 3)
+
+    def _add(
+        self,
+        data: Dict[str, Any],
+        found: set,
+        section: str,
+        value: str,
+        strict: bool = False
+    ) -> bool:
+        """
+        Относит значение к полю раздела.
+
+        Args:
+            data: Заполняемые данные
+            found: Множество найденных полей
+            section: Поле раздела или 'requirements' (поле определяется по содержимому)
+            value: Строка или значение после заголовка
+            strict: Принимать только образование, опыт и личные качества
+
+        Returns:
+            True, если строка распознана
+        """
+        is_experience = _EXPERIENCE.search(value) or _NO_EXPERIENCE.search(value)
+        if section == "experience" or (section == "requirements" and is_experience):
+            match = _EXPERIENCE.search(value) or _YEARS.search(value)
+            if match:
+                data["experience_years"] = float(match.group(1).replace(",", "."))
+                if data["experience_years"].is_integer():
+                    data["experience_years"] = int(data["experience_years"])
+                found.add("experience_years")
+                return True
+            if _NO_EXPERIENCE.search(value):
+                found.add("experience_years")
+                return True
+            return False
+
+        if section == "education" or (section == "requirements" and _EDUCATION.search(value)):
+            data["education"] = f"{data['education']}; {value}" if data["education"] else value
+            found.add("education")
+            return True
+
+        items = _split_items(value)
+        soft = [_soft_skill(item) for item in items]
+
+        if section == "soft_skills" or (section == "requirements" and items and all(soft)):
+            data["soft_skills"].extend(
+                canonical or item.lower() for item, canonical in zip(items, soft)
+            )
+            found.add("soft_skills")
+            return True
+
+        if strict:
+            return False
+
+        # «CI/CD: Jenkins, GitLab CI» — навыки после произвольной подписи
+        header = _HEADER.match(value)
+        if header:
+            items = _split_items(header.group(2))
+
+        # Личные качества в перечне навыков переносим в soft_skills
+        soft_items = [_soft_skill(item) for item in items]
+        if any(soft_items):
+            data["soft_skills"].extend(canonical for canonical in soft_items if canonical)
+            found.add("soft_skills")
+
+        skills = [_clean_skill(item) for item, canonical in zip(items, soft_items) if not canonical]
+        skills = [skill for skill in skills if skill and len(skill.split()) <= 4]
+        if skills:
+            data["hard_skills"].extend(skills)
+            found.add("hard_skills")
+        return bool(skills) or any(soft_items)
+
+    def try_parse(self, text: str, is_job: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Разбирает документ, если уверенность не ниже порога.
+
+        Документ без hard skills всегда отдаётся LLM. При пороге 0.8
+        из остальных полей может отсутствовать только soft_skills.
+
+        Returns:
+            Данные в схеме парсинга LLM или None
+        """
+        data, confidence = self.parse(text, is_job)
+        if confidence < self.min_confidence or not data["hard_skills"]:
+            return None
+        return data
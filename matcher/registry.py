@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Реестр документов, распарсенных при загрузке, а не при сопоставлении.
+
+Вакансии и резюме регистрируются по идентификатору и парсятся через LLM в
+фоновом пуле. Результат хранится по хэшу содержимого: одинаковые тексты
+под разными идентификаторами парсятся один раз, а повторная регистрация
+неизменённого документа ничего не стоит. После этого match_ids() — только
+скоринг в памяти, без обращения к LLM.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+
+from .cache import make_cache_key
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .core import SmartJobMatcher
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("job", "resume")
+
+
+class DocumentRegistry:
+    """Распарсенные документы по идентификатору с фоновым парсингом при регистрации."""
+
+    def __init__(self, matcher: "SmartJobMatcher", workers: Optional[int] = None):
+        """
+        Args:
+            matcher: Матчер, через который парсятся документы
+            workers: Потоков фонового парсинга (по умолчанию matcher.max_concurrency)
+        """
+        self.matcher = matcher
+        self._hashes: Dict[Tuple[str, str], str] = {}
+        self._parsed: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or matcher.max_concurrency,
+            thread_name_prefix="matcher-ingest"
+        )
+
+    def add(self, kind: str, doc_id: str, text: str) -> Future:
+        """
+        Регистрирует документ и ставит его в очередь на парсинг.
+
+        Повторная регистрация того же текста (под любым идентификатором)
+        не вызывает повторного парсинга; документ с пометкой degraded
+        парсится заново.
+
+        Args:
+            kind: 'job' или 'resume'
+            doc_id: Идентификатор документа
+            text: Текст документа
+
+        Returns:
+            Future с распарсенными данными
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Неизвестный тип документа: {kind}")
+
+        content_hash = make_cache_key(text, kind)
+        with self._lock:
+            self._hashes[(kind, doc_id)] = content_hash
+            future = self._parsed.get(content_hash)
+            if future is None or (future.done() and future.result().get('degraded')):
+                future = self._executor.submit(self._parse, kind, doc_id, text)
+                self._parsed[content_hash] = future
+        return future
+
+    def add_job(self, job_id: str, text: str) -> Future:
+        """Регистрирует вакансию (см. add)."""
+        return self.add("job", job_id, text)
+
+    def add_resume(self, resume_id: str, text: str) -> Future:
+        """Регистрирует резюме (см. add)."""
+        return self.add("resume", resume_id, text)
+
+    def _parse(self, kind: str, doc_id: str, text: str) -> Dict[str, Any]:
+        parsed_data = self.matcher._parse_text_with_llm(text, is_job=(kind == "job"))
+        if parsed_data.get('degraded'):
+            logger.warning(f"⚠ Документ {kind} {doc_id} распарсен без ответа LLM (degraded)")
+        return parsed_data
+
+    def get(self, kind: str, doc_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Распарсенные данные документа; ждёт окончания парсинга.
+
+        Args:
+            kind: 'job' или 'resume'
+            doc_id: Идентификатор документа
+            timeout: Максимальное ожидание парсинга, сек (None — без ограничения)
+
+        Returns:
+            Данные в формате _parse_text_with_llm
+
+        Raises:
+            KeyError: Документ не зарегистрирован
+            TimeoutError: Парсинг не завершился за timeout
+        """
+        with self._lock:
+            content_hash = self._hashes.get((kind, doc_id))
+            future = self._parsed.get(content_hash) if content_hash is not None else None
+        if future is None:
+            raise KeyError(f"Документ {kind} {doc_id} не зарегистрирован")
+        return future.result(timeout=timeout)
+
+    def is_ready(self, kind: str, doc_id: str) -> bool:
+        """Распарсен ли документ."""
+        with self._lock:
+            content_hash = self._hashes.get((kind, doc_id))
+            future = self._parsed.get(content_hash) if content_hash is not None else None
+        return future is not None and future.done()
+
+    def match_ids(
+        self,
+        job_id: str,
+        resume_id: str,
+        generate_feedback: bool = False,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Сопоставляет зарегистрированные вакансию и резюме.
+
+        Для распарсенных документов — только скоринг в памяти.
+
+        Args:
+            job_id: Идентификатор вакансии
+            resume_id: Идентификатор резюме
+            generate_feedback: Генерировать ли текстовый фидбэк (обращение к LLM)
+            timeout: Максимальное ожидание парсинга документов, сек
+
+        Returns:
+            Результат в формате match() с полями job_id и resume_id
+        """
+        job_data = self.get("job", job_id, timeout)
+        resume_data = self.get("resume", resume_id, timeout)
+
+        result = self.matcher._calculate_score(job_data, resume_data)
+        self.matcher._mark_degraded(result, job_data, resume_data)
+        result['job_id'] = job_id
+        result['resume_id'] = resume_id
+        if generate_feedback:
+            result['feedback'] = self.matcher._generate_human_feedback(result['report'], result['score'])
+        return result
+
+    def parsed(self, kind: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Уже распарсенные документы одного типа, например для CandidateIndex.add_many.
+
+        Returns:
+            Словарь {doc_id: данные}
+        """
+        with self._lock:
+            items = [
+                (doc_id, self._parsed[content_hash])
+                for (doc_kind, doc_id), content_hash in self._hashes.items()
+                if doc_kind == kind
+            ]
+        return {doc_id: future.result() for doc_id, future in items if future.done()}
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ждёт окончания парсинга всех зарегистрированных документов.
+
+        Returns:
+            True, если все документы распарсены
+        """
+        with self._lock:
+            futures = list(self._parsed.values())
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
+
+    def stats(self) -> Dict[str, int]:
+        """Число документов по типам, уникальных текстов и ожидающих парсинга."""
+        with self._lock:
+            kinds = [kind for kind, _ in self._hashes]
+            return {
+                'jobs': kinds.count("job"),
+                'resumes': kinds.count("resume"),
+                'unique_documents': len(self._parsed),
+                'pending': sum(1 for future in self._parsed.values() if not future.done())
+            }
+
+    def ids(self, kind: str) -> List[str]:
+        """Идентификаторы зарегистрированных документов одного типа."""
+        with self._lock:
+            return [doc_id for doc_kind, doc_id in self._hashes if doc_kind == kind]
+
+    def close(self) -> None:
+        """Останавливает фоновый парсинг; документы в очереди не парсятся."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __repr__(self) -> str:
+        return f"DocumentRegistry({self.stats()})"
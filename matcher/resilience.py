@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Повторы с экспоненциальной задержкой и circuit breaker для запросов к LLM.
+
+RetryPolicy повторяет запросы при таймаутах, ошибках соединения и ответах
+5xx/429. CircuitBreaker после серии таких ошибок подряд размыкается и
+отклоняет запросы без обращения к серверу, пока не истечёт reset_timeout;
+затем пропускает один пробный запрос. Вместе они не дают перегруженному
+Ollama получить лавину повторов.
+"""
+
+import random
+import threading
+import time
+
+
+class LLMUnavailableError(Exception):
+    """Ответ LLM не получен: исчерпаны повторы или разомкнут circuit breaker."""
+
+
+class MalformedResponseError(Exception):
+    """В теле ответа Ollama нет текстового поля response; запрос повторяется как сбой сервера."""
+
+
+class RetryPolicy:
+    """Параметры повторов запроса к LLM."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        jitter: float = 0.5
+    ):
+        """
+        Args:
+            max_attempts: Общее число попыток (1 — без повторов)
+            base_delay: Задержка перед первым повтором, сек
+            max_delay: Верхняя граница задержки, сек
+            jitter: Доля задержки, выбираемая случайно (0 — без разброса, 1 — full jitter)
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = min(max(jitter, 0.0), 1.0)
+
+    def delay(self, attempt: int) -> float:
+        """
+        Задержка перед повтором после неудачной попытки attempt (с 1).
+
+        Returns:
+            Задержка в секундах
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+
+class CircuitBreaker:
+    """Потокобезопасный circuit breaker: closed → open → half-open → closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: После скольких ошибок подряд цепь размыкается (0 — отключить)
+            reset_timeout: Через сколько секунд пропустить пробный запрос
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Можно ли выполнить запрос сейчас."""
+        if self.failure_threshold <= 0:
+            return True
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                # Пробный запрос: остальные отклоняются, пока он не завершится
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Учитывает ответ сервера (в том числе ошибку, не связанную с его доступностью)."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Учитывает ошибку, говорящую о недоступности сервера."""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (
+                0 < self.failure_threshold <= self.consecutive_failures
+            ):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def __repr__(self) -> str:
+        return f"CircuitBreaker({self.state}, failures={self.consecutive_failures})"
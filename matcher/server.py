@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+REST API сервер сопоставления вакансий и резюме.
+
+Требует пакет aiohttp: pip install aiohttp
+
+Сервер держит один долгоживущий SmartJobMatcher: проверка Ollama выполняется
+один раз при запуске, кэш парсинга и пул соединений общие для всех клиентов.
+Одинаковые документы, которые уже парсятся, не отправляются в LLM повторно
+(single-flight): 200 одновременных запросов с одной вакансией дают один
+запрос к Ollama. Если в очереди к Ollama больше server.max_queue запросов,
+новые запросы, требующие LLM, получают 429; запрос, которому нужно больше
+server.max_queue обращений к LLM, получает 413 (такие пакеты — через /tasks).
+
+Эндпоинты:
+    POST /match          {"job": "...", "resume": "...", "generate_feedback": true,
+                          "job_id": "...", "resume_id": "..."}
+    POST /match/batch    {"jobs": [...], "resumes": [...], "job_ids": [...], "resume_ids": [...]}
+    GET  /results/{id}   сохранённый результат из ResultStore
+    GET  /metrics        метрики в формате Prometheus (metrics.sink: prometheus)
+    POST /tasks          {"type": "match" | "batch", "priority": "interactive" | "bulk",
+                          "webhook": "...", ...поля /match или /match/batch} → 202 {"task_id"}
+    GET  /tasks/{id}     статус, прогресс и результат фоновой задачи
+    DELETE /tasks/{id}   отмена фоновой задачи
+
+Фоновые задачи выполняет пул процессов matcher.tasks.WorkerPool, который
+сервер запускает сам (tasks.workers > 0) или который работает отдельно
+(python -m matcher.tasks) с тем же файлом очереди tasks.path.
+
+Пример:
+    python -m matcher.server --config config.json --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .cache import make_cache_key
+from .config import Config
+from .core import SmartJobMatcher
+from .metrics import PrometheusSink, timed_stage
+from .tasks import CANCELLED, FINISHED, PRIORITIES, TaskQueue, WorkerPool
+
+try:
+    from aiohttp import web
+except ImportError:  # pragma: no cover - опциональная зависимость
+    web = None
+
+logger = logging.getLogger(__name__)
+
+# Максимальный размер тела запроса (пакеты документов)
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+
+class QueueFullError(Exception):
+    """В очереди запросов к Ollama нет места."""
+
+
+class TooManyDocumentsError(Exception):
+    """Запросу нужно больше обращений к LLM, чем вмещает очередь к Ollama."""
+
+
+class MatchServer:
+    """aiohttp-приложение поверх одного SmartJobMatcher с single-flight парсингом."""
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        matcher: Optional[SmartJobMatcher] = None,
+        max_queue: Optional[int] = None,
+        max_batch_pairs: Optional[int] = None,
+        workers: Optional[int] = None
+    ):
+        """
+        Args:
+            config: Конфигурация (по умолчанию конфигурация matcher или настройки по умолчанию)
+            matcher: Готовый матчер; если None, создаётся при запуске приложения
+                и закрывается при остановке
+            max_queue: Сколько запросов к LLM может ждать выполнения (переопределяет config)
+            max_batch_pairs: Максимум пар в /match/batch (переопределяет config)
+            workers: Сколько процессов-обработчиков фоновых задач запустить
+                вместе с сервером (переопределяет tasks.workers; 0 — не запускать)
+        """
+        if web is None:
+            raise ImportError("Для matcher.server требуется aiohttp: pip install aiohttp")
+
+        self.config = config or (matcher.config if matcher is not None else Config())
+        self.matcher = matcher
+        self._owns_matcher = matcher is None
+        self.max_queue = max_queue if max_queue is not None else self.config.get("server.max_queue", 64)
+        self.max_batch_pairs = (
+            max_batch_pairs if max_batch_pairs is not None
+            else self.config.get("server.max_batch_pairs", 10000)
+        )
+        self.save_results = self.config.get("output.save_results", True)
+        self.workers = workers if workers is not None else self.config.get("tasks.workers", 2)
+        self.task_queue: Optional[TaskQueue] = None
+        self._pool: Optional[WorkerPool] = None
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._queued = 0
+        self.stats: Dict[str, int] = {"llm_calls": 0, "coalesced": 0, "rejected": 0}
+
+    def make_app(self) -> "web.Application":
+        """Создаёт aiohttp-приложение с маршрутами и обработчиками запуска/остановки."""
+        app = web.Application(client_max_size=MAX_BODY_SIZE)
+        app.add_routes([
+            web.post("/match", self.handle_match),
+            web.post("/match/batch", self.handle_batch),
+            web.get("/results/{result_id}", self.handle_result),
+            web.get("/metrics", self.handle_metrics),
+            web.post("/tasks", self.handle_submit_task),
+            web.get("/tasks/{task_id}", self.handle_task),
+            web.delete("/tasks/{task_id}", self.handle_cancel_task),
+        ])
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app: "web.Application") -> None:
+        if self.matcher is None:
+            # Конструктор проверяет доступность Ollama синхронно
+            loop = asyncio.get_running_loop()
+            self.matcher = await loop.run_in_executor(None, SmartJobMatcher, self.config)
+
+        self.task_queue = TaskQueue(self.config.get("tasks.path", "results/tasks.db"))
+        if self.workers > 0:
+            self._pool = WorkerPool(self.config, self.task_queue.path, self.workers)
+            self._pool.start()
+
+    async def _on_cleanup(self, app: "web.Application") -> None:
+        loop = asyncio.get_running_loop()
+        if self._pool is not None:
+            await loop.run_in_executor(None, self._pool.stop)
+            self._pool = None
+        if self.task_queue is not None:
+            self.task_queue.close()
+            self.task_queue = None
+        if self._owns_matcher and self.matcher is not None:
+            await loop.run_in_executor(None, self.matcher.close)
+            self.matcher = None
+
+    def _reserve(self, count: int) -> None:
+        """
+        Занимает место в очереди к LLM под count запросов.
+
+        Raises:
+            TooManyDocumentsError: count больше всей очереди — повтор не поможет
+            QueueFullError: Очередь занята другими запросами
+        """
+        if count > self.max_queue:
+            self.stats["rejected"] += 1
+            raise TooManyDocumentsError(
+                f"Запросу нужно {count} обращений к LLM, очередь к Ollama вмещает {self.max_queue}; "
+                f"используйте POST /tasks"
+            )
+        if count and self._queued + count > self.max_queue:
+            self.stats["rejected"] += 1
+            raise QueueFullError(f"Очередь запросов к Ollama заполнена ({self._queued}/{self.max_queue})")
+        self._queued += count
+
+    def _run_llm(self, func, *args) -> asyncio.Future:
+        """Выполняет вызов, обращающийся к LLM, в пуле матчера (место должно быть занято _reserve)."""
+        self.stats["llm_calls"] += 1
+        future = asyncio.get_running_loop().run_in_executor(self.matcher._executor, func, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: asyncio.Future) -> None:
+        self._queued -= 1
+
+    def _unreserve(self, count: int) -> None:
+        """Освобождает занятое место, под которое запрос к LLM так и не отправлен."""
+        self._queued -= count
+
+    async def _parse_documents(
+        self,
+        documents: List[Tuple[str, bool]],
+        later: Optional[Set[Tuple[str, bool]]] = None,
+        extra: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Парсит документы, объединяя одинаковые с уже выполняющимися.
+
+        Быстрый разбор и кэш проверяются в пуле потоков (чтение SQLite и
+        поиск почти-дубликатов не блокируют цикл событий); в LLM уходят только
+        новые уникальные документы, и место в очереди под них занимается
+        целиком до отправки первого запроса. Почти-дубликаты из later ждут
+        первого документа своей группы и затем берут его результат из индекса
+        (повторный вызов для них).
+
+        Args:
+            documents: Пары (текст, is_job)
+            later: Документы, которые парсятся после первых документов своих
+                групп почти-дубликатов (_group_documents)
+            extra: Сколько мест занять сверх парсинга (фидбэк) — вместе с ним,
+                до первого запроса. При успехе места переходят вызывающему,
+                который отправляет запросы через _run_llm без _reserve
+
+        Returns:
+            Распарсенные данные в порядке documents
+
+        Raises:
+            TooManyDocumentsError: Новых документов больше, чем вмещает очередь
+            QueueFullError: Новым документам не хватает места в очереди
+        """
+        resolved: Dict[Tuple[str, bool], Any] = {}
+        new: Dict[str, Tuple[str, bool, Optional[str]]] = {}
+
+        unique = list(dict.fromkeys(documents))
+        lookups = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: [self.matcher._lookup_parsed(text, is_job) for text, is_job in unique]
+        )
+        deferred: List[Tuple[str, bool]] = []
+        for (text, is_job), (parsed_data, cache_key) in zip(unique, lookups):
+            if parsed_data is not None:
+                resolved[(text, is_job)] = parsed_data
+                continue
+            if later and (text, is_job) in later:
+                deferred.append((text, is_job))
+                continue
+
+            key = make_cache_key(text, "job" if is_job else "resume")
+            if key in self._inflight:
+                self.stats["coalesced"] += 1
+                resolved[(text, is_job)] = self._inflight[key]
+            elif key not in new:
+                new[key] = (text, is_job, cache_key)
+
+        self._reserve(len(new) + extra)
+        try:
+            for key, (text, is_job, cache_key) in new.items():
+                future = self._run_llm(self.matcher._parse_uncached, text, is_job, cache_key, None)
+                future.add_done_callback(lambda _, key=key: self._inflight.pop(key, None))
+                self._inflight[key] = future
+                resolved[(text, is_job)] = future
+
+            waiting = [(document, value) for document, value in resolved.items() if isinstance(value, asyncio.Future)]
+            # shield: отмена одного клиента не отменяет парсинг, которого ждут другие
+            parsed = await asyncio.gather(*(asyncio.shield(future) for _, future in waiting))
+            for (document, _), parsed_data in zip(waiting, parsed):
+                resolved[document] = parsed_data
+
+            if deferred:
+                resolved.update(zip(deferred, await self._parse_documents(deferred)))
+        except BaseException:
+            self._unreserve(extra)
+            raise
+        return [resolved[document] for document in documents]
+
+    def _group_documents(
+        self,
+        jobs: List[str],
+        resumes: List[str]
+    ) -> Tuple[Set[Tuple[str, bool]], List[int]]:
+        """
+        Группы почти-дубликатов пакета (строятся один раз на запрос).
+
+        Returns:
+            Кортеж (документы, которые ждут первого документа своей группы;
+            группы резюме для duplicate_resumes)
+        """
+        later: Set[Tuple[str, bool]] = set()
+        resume_groups: List[int] = []
+        for texts, is_job in ((jobs, True), (resumes, False)):
+            groups = self.matcher._near_duplicate_groups(texts, is_job)
+            first = {text for i, (text, group) in enumerate(zip(texts, groups)) if group == i}
+            later.update((text, is_job) for text in texts if text not in first)
+            if not is_job:
+                resume_groups = groups
+        return later, resume_groups
+
+    async def _store(self, results: List[Dict[str, Any]]) -> None:
+        """Сохраняет результаты в ResultStore матчера (проставляет 'result_id')."""
+        if self.save_results and results:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.matcher.result_store.add_many, results
+            )
+
+    @staticmethod
+    def _error(status: int, message: str, **headers: str) -> "web.Response":
+        return web.json_response({"error": message}, status=status, headers=headers or None)
+
+    @staticmethod
+    async def _read_json(request: "web.Request") -> Dict[str, Any]:
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ValueError("Тело запроса должно быть JSON-объектом")
+        if not isinstance(body, dict):
+            raise ValueError("Тело запроса должно быть JSON-объектом")
+        return body
+
+    @staticmethod
+    def _texts(body: Dict[str, Any], field: str) -> List[str]:
+        value = body.get(field)
+        if not isinstance(value, list) or not value or not all(isinstance(text, str) for text in value):
+            raise ValueError(f"Поле '{field}' должно быть непустым списком строк")
+        return value
+
+    @staticmethod
+    def _ids(body: Dict[str, Any], field: str, count: int) -> List[Any]:
+        value = body.get(field)
+        if value is None:
+            return [None] * count
+        if not isinstance(value, list) or len(value) != count:
+            raise ValueError(f"Поле '{field}' должно быть списком той же длины, что и документы")
+        return value
+
+    async def handle_match(self, request: "web.Request") -> "web.Response":
+        """POST /match: сопоставление одной пары вакансия/резюме."""
+        try:
+            body = await self._read_json(request)
+            job, resume = body.get("job"), body.get("resume")
+            if not isinstance(job, str) or not isinstance(resume, str):
+                raise ValueError("Поля 'job' и 'resume' должны быть строками")
+        except ValueError as e:
+            return self._error(400, str(e))
+
+        generate_feedback = bool(body.get("generate_feedback", True))
+        llm_feedback = generate_feedback and self.matcher.feedback_engine != "template"
+        matcher = self.matcher
+        metrics = matcher._new_metrics("match")
+
+        try:
+            # Место под фидбэк занимается вместе с парсингом: при заполненной
+            # очереди 429 приходит до того, как на парсинг потрачен LLM
+            with timed_stage(metrics, "parse"):
+                job_data, resume_data = await self._parse_documents(
+                    [(job, True), (resume, False)], extra=int(llm_feedback)
+                )
+
+            try:
+                with timed_stage(metrics, "scoring"):
+                    result = matcher._calculate_score(job_data, resume_data)
+                    matcher._mark_degraded(result, job_data, resume_data)
+            except BaseException:
+                self._unreserve(int(llm_feedback))
+                raise
+
+            with timed_stage(metrics, "feedback"):
+                if llm_feedback:
+                    result['feedback'] = await self._run_llm(
+                        matcher._generate_human_feedback, result['report'], result['score']
+                    )
+                elif generate_feedback:
+                    result['feedback'] = matcher._generate_human_feedback(result['report'], result['score'])
+        except TooManyDocumentsError as e:
+            return self._error(413, str(e))
+        except QueueFullError as e:
+            return self._error(429, str(e), **{"Retry-After": "1"})
+
+        matcher._attach_debug(result, job_data, resume_data)
+        result['job_id'] = body.get("job_id")
+        result['resume_id'] = body.get("resume_id")
+        # Метрики запросов сервера попадают в приёмник матчера (GET /metrics)
+        matcher._publish_metrics(metrics, result)
+        await self._store([result])
+        return web.json_response(result, dumps=lambda data: json.dumps(data, ensure_ascii=False))
+
+    async def handle_batch(self, request: "web.Request") -> "web.Response":
+        """POST /match/batch: все пары вакансий и резюме без фидбэка."""
+        try:
+            body = await self._read_json(request)
+            jobs = self._texts(body, "jobs")
+            resumes = self._texts(body, "resumes")
+            job_ids = self._ids(body, "job_ids", len(jobs))
+            resume_ids = self._ids(body, "resume_ids", len(resumes))
+        except ValueError as e:
+            return self._error(400, str(e))
+
+        if len(jobs) * len(resumes) > self.max_batch_pairs:
+            return self._error(413, f"Не более {self.max_batch_pairs} пар в одном запросе")
+
+        metrics = self.matcher._new_metrics("batch")
+        later, resume_groups = None, None
+        if self.matcher.dedup is not None:
+            later, resume_groups = await asyncio.get_running_loop().run_in_executor(
+                None, self._group_documents, jobs, resumes
+            )
+
+        documents = [(text, True) for text in jobs] + [(text, False) for text in resumes]
+        try:
+            with timed_stage(metrics, "parse"):
+                parsed = await self._parse_documents(documents, later)
+        except TooManyDocumentsError as e:
+            return self._error(413, str(e))
+        except QueueFullError as e:
+            return self._error(429, str(e), **{"Retry-After": "1"})
+
+        jobs_data, resumes_data = parsed[:len(jobs)], parsed[len(jobs):]
+
+        def score_all() -> List[Dict[str, Any]]:
+            results = []
+            for job_index, job_data in enumerate(jobs_data):
+                for resume_index, resume_data in enumerate(resumes_data):
+                    result = self.matcher._calculate_score(job_data, resume_data)
+                    if job_data.get('degraded') or resume_data.get('degraded'):
+                        result['degraded'] = True
+                    result.update(
+                        job_index=job_index,
+                        resume_index=resume_index,
+                        job_id=job_ids[job_index],
+                        resume_id=resume_ids[resume_index]
+                    )
+                    results.append(result)
+            return results
+
+        # Скоринг большого пакета не должен блокировать цикл событий
+        with timed_stage(metrics, "scoring"):
+            results = await asyncio.get_running_loop().run_in_executor(None, score_all)
+        self.matcher._publish_metrics(metrics)
+        await self._store(results)
+        response = {
+            "results": results,
+            "degraded_jobs": sum(1 for data in jobs_data if data.get('degraded')),
+            "degraded_resumes": sum(1 for data in resumes_data if data.get('degraded'))
+        }
+        if resume_groups is not None:
+            response["duplicate_resumes"] = self.matcher._duplicate_indices(resume_groups)
+        return web.json_response(
+            response,
+            dumps=lambda data: json.dumps(data, ensure_ascii=False)
+        )
+
+    async def handle_result(self, request: "web.Request") -> "web.Response":
+        """GET /results/{id}: сохранённый результат."""
+        try:
+            result_id = int(request.match_info["result_id"])
+        except ValueError:
+            return self._error(400, "Идентификатор результата должен быть целым числом")
+
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, self.matcher.result_store.get, result_id
+        )
+        if result is None:
+            return self._error(404, f"Результат {result_id} не найден")
+        return web.json_response(result, dumps=lambda data: json.dumps(data, ensure_ascii=False))
+
+    async def handle_metrics(self, request: "web.Request") -> "web.Response":
+        """GET /metrics: агрегаты PrometheusSink матчера сервера."""
+        sink = self.matcher.metrics_sink
+        if not isinstance(sink, PrometheusSink):
+            return self._error(404, "Метрики Prometheus отключены (metrics.sink)")
+        return web.Response(
+            body=sink.render().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+        )
+
+    def _task_payload(self, body: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Тип задачи и параметры, проверенные так же, как в /match и /match/batch."""
+        task_type = body.get("type", "batch")
+        if task_type == "match":
+            if not isinstance(body.get("job"), str) or not isinstance(body.get("resume"), str):
+                raise ValueError("Поля 'job' и 'resume' должны быть строками")
+            fields = ("job", "resume", "generate_feedback", "job_id", "resume_id")
+        elif task_type == "batch":
+            jobs = self._texts(body, "jobs")
+            resumes = self._texts(body, "resumes")
+            self._ids(body, "job_ids", len(jobs))
+            self._ids(body, "resume_ids", len(resumes))
+            fields = ("jobs", "resumes", "job_ids", "resume_ids", "include_reports")
+        else:
+            raise ValueError("Поле 'type' должно быть 'match' или 'batch'")
+        return task_type, {field: body[field] for field in fields if field in body}
+
+    @staticmethod
+    def _priority(body: Dict[str, Any], task_type: str) -> int:
+        """Приоритет задачи: по умолчанию пара — интерактивная, пакет — bulk."""
+        priority = body.get("priority", "interactive" if task_type == "match" else "bulk")
+        if isinstance(priority, str) and priority in PRIORITIES:
+            return PRIORITIES[priority]
+        if isinstance(priority, int) and not isinstance(priority, bool):
+            return priority
+        raise ValueError(f"Поле 'priority' должно быть одним из {sorted(PRIORITIES)} или целым числом")
+
+    @staticmethod
+    def _task_id(request: "web.Request") -> int:
+        try:
+            return int(request.match_info["task_id"])
+        except ValueError:
+            raise ValueError("Идентификатор задачи должен быть целым числом")
+
+    async def handle_submit_task(self, request: "web.Request") -> "web.Response":
+        """POST /tasks: постановка фоновой задачи в очередь."""
+        try:
+            body = await self._read_json(request)
+            task_type, payload = self._task_payload(body)
+            priority = self._priority(body, task_type)
+            webhook = body.get("webhook")
+            if webhook is not None and not isinstance(webhook, str):
+                raise ValueError("Поле 'webhook' должно быть строкой")
+        except ValueError as e:
+            return self._error(400, str(e))
+
+        task_id = await asyncio.get_running_loop().run_in_executor(
+            None, self.task_queue.submit, task_type, payload, priority, webhook
+        )
+        return web.json_response({"task_id": task_id, "status": "queued"}, status=202)
+
+    async def handle_task(self, request: "web.Request") -> "web.Response":
+        """GET /tasks/{id}: статус и результат фоновой задачи."""
+        try:
+            task_id = self._task_id(request)
+        except ValueError as e:
+            return self._error(400, str(e))
+
+        task = await asyncio.get_running_loop().run_in_executor(None, self.task_queue.get, task_id)
+        if task is None:
+            return self._error(404, f"Задача {task_id} не найдена")
+        return web.json_response(task, dumps=lambda data: json.dumps(data, ensure_ascii=False))
+
+    async def handle_cancel_task(self, request: "web.Request") -> "web.Response":
+        """DELETE /tasks/{id}: отмена фоновой задачи."""
+        try:
+            task_id = self._task_id(request)
+        except ValueError as e:
+            return self._error(400, str(e))
+
+        status = await asyncio.get_running_loop().run_in_executor(None, self.task_queue.cancel, task_id)
+        if status is None:
+            return self._error(404, f"Задача {task_id} не найдена")
+        if status in FINISHED and status != CANCELLED:
+            return self._error(409, f"Задача {task_id} уже завершена ({status})")
+        return web.json_response({"task_id": task_id, "status": status})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа CLI: python -m matcher.server."""
+    parser = argparse.ArgumentParser(
+        prog="python -m matcher.server",
+        description="REST API сервер сопоставления вакансий и резюме"
+    )
+    parser.add_argument("--config", help="Путь к config.json")
+    parser.add_argument("--host", help="Адрес (по умолчанию server.host)")
+    parser.add_argument("--port", type=int, help="Порт (по умолчанию server.port)")
+    parser.add_argument("--ollama-url", help="URL Ollama API (переопределяет config)")
+    parser.add_argument("--max-queue", type=int, help="Размер очереди запросов к Ollama (server.max_queue)")
+    parser.add_argument("--workers", type=int, help="Процессов-обработчиков фоновых задач (tasks.workers)")
+    args = parser.parse_args(argv)
+
+    if web is None:
+        print("Для matcher.server требуется aiohttp: pip install aiohttp", file=sys.stderr)
+        return 1
+
+    config = Config(args.config)
+    if args.ollama_url:
+        config.set("ollama.url", args.ollama_url)
+
+    server = MatchServer(config, max_queue=args.max_queue, workers=args.workers)
+    web.run_app(
+        server.make_app(),
+        host=args.host or config.get("server.host", "127.0.0.1"),
+        port=args.port or config.get("server.port", 8000)
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Нечёткое сходство навыков для частичного зачёта при скоринге.
+
+Навыки, которые не совпали по каноническому ID, могут быть близки:
+«хроматография» и «вэжх-хроматография», «postgresql» и «postgresql
+администрирование». Каждый навык словаря один раз переводится в вектор
+TF-IDF символьных n-грамм (хэширование в фиксированную размерность, IDF —
+по словарю синонимов skills.py), а при добавлении в словарь сравнивается со
+всеми уже известными навыками. Пары со сходством не ниже порога хранятся в
+разреженной таблице соседей, поэтому при скоринге сходство — поиск в
+словаре, без векторных операций.
+
+Зачёт за навык квантуется до 1/64: сумма зачётов точна в float64, и
+_calculate_score и VectorizedScorer дают одинаковые скоры.
+
+С путём (scoring.fuzzy.path) векторы и таблица соседей сохраняются в .npy и
+при следующем запуске открываются через memory map: файлы не читаются в
+память целиком и общие для всех процессов через page cache.
+
+Требует пакет numpy: pip install numpy
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .skills import SKILL_SYNONYMS, SKILLS_VERSION, _normalize, skill_name
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Шаг квантования зачёта
+CREDIT_STEP = 1 / 64
+
+_FILES = ("ids", "vectors", "indptr", "indices", "similarities")
+
+
+def _ngrams(text: str, n: int) -> List[str]:
+    """Символьные n-граммы с пробелами по краям: « sql » → « sq», «sql», «ql »."""
+    padded = f" {text} "
+    if len(padded) <= n:
+        return [padded]
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+
+class SkillSimilarity:
+    """
+    Векторы навыков и таблица соседей со сходством не ниже порога.
+
+    Навыки добавляются по каноническим ID (add); сходство и зачёт — по
+    таблице соседей. Методы потокобезопасны.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.55,
+        weight: float = 0.5,
+        ngram: int = 3,
+        dim: int = 1024,
+        path: Optional[str] = None
+    ):
+        """
+        Args:
+            threshold: Минимальное косинусное сходство для частичного зачёта
+            weight: Доля навыка, засчитываемая при сходстве 1.0
+            ngram: Длина символьных n-грамм
+            dim: Размерность векторов (n-граммы хэшируются)
+            path: Каталог для сохранения векторов и таблицы соседей (None — только в памяти)
+        """
+        if np is None:
+            raise ImportError("Для нечёткого сравнения навыков требуется numpy: pip install numpy")
+
+        self.threshold = threshold
+        self.weight = weight
+        self.ngram = ngram
+        self.dim = dim
+        self.path = path
+
+        self._idf, self._default_idf = self._reference_idf()
+        self._lock = threading.Lock()
+
+        # Сохранённая часть (memory map): ID, векторы и соседи в CSR
+        self._base_ids: List[int] = []
+        self._base_rows: Dict[int, int] = {}
+        self._base_vectors: Optional["np.ndarray"] = None
+        self._base_csr: Optional[Tuple["np.ndarray", "np.ndarray", "np.ndarray"]] = None
+
+        # Навыки, добавленные в этом процессе
+        self._ids: List[int] = []
+        self._rows: Dict[int, int] = {}
+        self._vectors = np.zeros((64, dim), dtype=np.float32)
+
+        # ID → {ID соседа: сходство}; внутренние словари заменяются, а не меняются на месте
+        self._neighbours: Dict[int, Dict[int, float]] = {}
+
+        if path:
+            self._load(path)
+
+    def _meta(self) -> Dict[str, object]:
+        return {
+            "threshold": self.threshold,
+            "ngram": self.ngram,
+            "dim": self.dim,
+            "skills_version": SKILLS_VERSION
+        }
+
+    def _reference_idf(self) -> Tuple[Dict[str, float], float]:
+        """IDF n-грамм по названиям и синонимам словаря навыков."""
+        names = {_normalize(name) for canonical, aliases in SKILL_SYNONYMS.items() for name in (canonical,) + tuple(aliases)}
+        frequency = Counter(gram for name in names for gram in set(_ngrams(name, self.ngram)))
+        total = len(names)
+        idf = {gram: math.log((1 + total) / (1 + count)) + 1 for gram, count in frequency.items()}
+        return idf, math.log(1 + total) + 1
+
+    def _vector(self, name: str) -> "np.ndarray":
+        """Нормированный вектор TF-IDF символьных n-грамм названия."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for gram, count in Counter(_ngrams(name, self.ngram)).items():
+            digest = zlib.crc32(gram.encode("utf-8"))
+            # Знак из старшего бита уменьшает смещение от коллизий хэширования
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dim] += sign * (1 + math.log(count)) * self._idf.get(gram, self._default_idf)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def __contains__(self, skill: int) -> bool:
+        return skill in self._rows or skill in self._base_rows
+
+    def __len__(self) -> int:
+        return len(self._base_rows) + len(self._rows)
+
+    def add(self, skills: Iterable[int]) -> None:
+        """
+        Добавляет навыки в словарь и находит их соседей среди всех известных.
+
+        Args:
+            skills: Канонические ID навыков (названия берутся из skills.skill_name)
+        """
+        new = [skill for skill in dict.fromkeys(skills) if skill not in self]
+        if not new:
+            return
+
+        with self._lock:
+            new = [skill for skill in new if skill not in self]
+            if not new:
+                return
+
+            vectors = np.stack([self._vector(skill_name(skill)) for skill in new])
+            count = len(self._ids)
+            if count + len(new) > len(self._vectors):
+                grown = np.zeros((max(2 * len(self._vectors), count + len(new)), self.dim), dtype=np.float32)
+                grown[:count] = self._vectors[:count]
+                self._vectors = grown
+            self._vectors[count:count + len(new)] = vectors
+            for offset, skill in enumerate(new):
+                self._rows[skill] = count + offset
+            self._ids.extend(new)
+
+            # Сходство новых со всеми (включая друг друга); сами с собой не сравниваются
+            blocks = [(self._ids, self._vectors[:count + len(new)])]
+            if self._base_vectors is not None:
+                blocks.append((self._base_ids, self._base_vectors))
+            for ids, matrix in blocks:
+                similarities = vectors @ matrix.T
+                for row, column in zip(*np.nonzero(similarities >= self.threshold)):
+                    skill, other = new[row], ids[column]
+                    if skill != other:
+                        self._link(skill, other, float(similarities[row, column]))
+
+    def _link(self, skill: int, other: int, similarity: float) -> None:
+        """Записывает пару соседей в обе стороны (под self._lock)."""
+        for first, second in ((skill, other), (other, skill)):
+            # Копия вместо изменения: читатели без блокировки видят целый словарь
+            self._neighbours[first] = {**self.neighbours(first), second: similarity}
+
+    def neighbours(self, skill: int) -> Dict[int, float]:
+        """
+        Навыки со сходством не ниже порога.
+
+        Returns:
+            Словарь {ID навыка: косинусное сходство}
+        """
+        found = self._neighbours.get(skill)
+        if found is not None:
+            return found
+
+        row = self._base_rows.get(skill)
+        if row is None:
+            return {}
+        indptr, indices, similarities = self._base_csr
+        start, stop = int(indptr[row]), int(indptr[row + 1])
+        found = dict(zip(indices[start:stop].tolist(), similarities[start:stop].tolist()))
+        self._neighbours.setdefault(skill, found)
+        return found
+
+    def credit(self, similarity: float) -> float:
+        """Зачёт за навык при данном сходстве: weight × сходство, квантованный до CREDIT_STEP."""
+        if similarity < self.threshold:
+            return 0.0
+        return math.floor(similarity * self.weight / CREDIT_STEP) * CREDIT_STEP
+
+    def best_match(self, skill: int, candidates: Set[int]) -> Tuple[float, Optional[int]]:
+        """
+        Лучший частичный зачёт навыка вакансии среди навыков резюме.
+
+        Args:
+            skill: ID навыка вакансии, которого нет в резюме
+            candidates: ID навыков резюме
+
+        Returns:
+            Кортеж (зачёт, ID ближайшего навыка резюме или None)
+        """
+        best, best_skill = 0.0, None
+        neighbours = self.neighbours(skill)
+        if len(neighbours) <= len(candidates):
+            pairs = ((other, similarity) for other, similarity in neighbours.items() if other in candidates)
+        else:
+            pairs = ((other, neighbours[other]) for other in candidates if other in neighbours)
+        for other, similarity in pairs:
+            credit = self.credit(similarity)
+            # При равном зачёте — меньший ID, чтобы выбор не зависел от порядка множества
+            if credit > best or (credit == best and credit > 0 and other < best_skill):
+                best, best_skill = credit, other
+        return best, best_skill
+
+    def _load(self, path: str) -> None:
+        """Открывает сохранённые векторы и таблицу соседей через memory map."""
+        directory = Path(path)
+        meta_path = directory / "meta.json"
+        if not meta_path.exists():
+            return
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta != self._meta():
+                logger.info(f"Параметры сходства навыков изменились, {path} будет пересоздан")
+                return
+            arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in _FILES}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠ Не удалось открыть таблицу сходства навыков {path}: {e}")
+            return
+
+        if len(arrays["vectors"]) != len(arrays["ids"]) or len(arrays["indptr"]) != len(arrays["ids"]) + 1:
+            logger.warning(f"⚠ Таблица сходства навыков {path} повреждена, будет пересоздана")
+            return
+
+        self._base_ids = arrays["ids"].tolist()
+        self._base_rows = {skill: row for row, skill in enumerate(self._base_ids)}
+        self._base_vectors = arrays["vectors"]
+        self._base_csr = (arrays["indptr"], arrays["indices"], arrays["similarities"])
+        logger.info(f"Загружена таблица сходства навыков: {len(self._base_rows)} навыков")
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Сохраняет векторы и таблицу соседей всех известных навыков.
+
+        Args:
+            path: Каталог (по умолчанию путь из конструктора)
+        """
+        path = path or self.path
+        if not path or not self._ids:
+            return
+
+        with self._lock:
+            ids = self._base_ids + self._ids
+            vectors = self._vectors[:len(self._ids)]
+            if self._base_vectors is not None:
+                vectors = np.concatenate([np.asarray(self._base_vectors), vectors])
+
+            indptr, indices, similarities = [0], [], []
+            for skill in ids:
+                neighbours = self.neighbours(skill)
+                indices.extend(neighbours)
+                similarities.extend(neighbours.values())
+                indptr.append(len(indices))
+
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "ids": np.asarray(ids, dtype=np.int64),
+            "vectors": vectors.astype(np.float32),
+            "indptr": np.asarray(indptr, dtype=np.int64),
+            "indices": np.asarray(indices, dtype=np.int64),
+            "similarities": np.asarray(similarities, dtype=np.float32),
+        }
+        # Сначала файлы данных, метаданные последними; каждый файл заменяется атомарно
+        for name, array in arrays.items():
+            temporary = directory / f"{name}.tmp.npy"
+            np.save(temporary, array)
+            os.replace(temporary, directory / f"{name}.npy")
+        temporary = directory / "meta.json.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(self._meta(), f)
+        os.replace(temporary, directory / "meta.json")
+        logger.info(f"Таблица сходства навыков сохранена: {path} ({len(ids)} навыков)")
+
+    def __repr__(self) -> str:
+        return f"SkillSimilarity({len(self)} навыков, threshold={self.threshold})"
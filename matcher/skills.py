@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Канонизация навыков: синонимы, лёгкий стемминг и целочисленные ID.
+
+LLM и кандидаты называют один навык по-разному: «MS Office», «Microsoft
+Office», «пакет MS Office (Word, Excel)»; «ответственный» и
+«ответственность». Навык приводится к канонической форме так:
+
+1. нижний регистр, ё → е, без скобок и пунктуации по краям;
+2. поиск в словаре синонимов (SKILL_SYNONYMS);
+3. без вводных слов («знание», «опыт работы с») и версии («Python 3.8»);
+4. поиск по основам слов (русские и английские окончания отбрасываются);
+   если навыка нет в словаре, канонической формой становятся сами основы.
+
+Словари компилируются в хэш-таблицы при импорте. Каноническая форма
+переводится в стабильный 63-битный ID (blake2b), одинаковый во всех
+процессах, поэтому ID можно хранить в кэше парсинга вместе с документом.
+
+Группы (SKILL_GROUPS) учитывают, что «MS Office» включает Word и Excel:
+навыки резюме дополняются членами и родителями своих групп, поэтому
+требование «Word» закрывает резюме с «MS Office», а требование «MS Office» —
+резюме с «Excel». Вакансия сравнивается по своим ID без расширения.
+"""
+
+import hashlib
+import re
+import threading
+from typing import Dict, Any, Iterable, List, Set, Tuple
+
+from .preparse import SOFT_SKILL_STEMS
+
+# Версия словарей и правил. Увеличивайте при их изменении, чтобы ID,
+# сохранённые в кэше парсинга, были пересчитаны.
+SKILLS_VERSION = 1
+
+# Каноническое название → синонимы
+SKILL_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "microsoft office": (
+        "ms office", "office", "msoffice", "пакет ms office", "пакет microsoft office",
+        "майкрософт офис", "мс офис", "офисные программы", "офисный пакет", "пакет офисных программ"
+    ),
+    "microsoft word": ("ms word", "word", "ворд"),
+    "microsoft excel": ("ms excel", "excel", "эксель", "эксел"),
+    "microsoft powerpoint": ("ms powerpoint", "powerpoint", "power point"),
+    "microsoft outlook": ("ms outlook", "outlook"),
+    "1с": ("1c", "1с:предприятие", "1c:предприятие", "1с предприятие", "1c:enterprise"),
+    "python": ("питон", "python3"),
+    "javascript": ("js", "java script", "ecmascript"),
+    "typescript": ("ts",),
+    "golang": ("go",),
+    "c++": ("cpp", "с++"),
+    "c#": ("csharp", "c sharp", "с#"),
+    "postgresql": ("postgres", "постгрес", "pgsql"),
+    "sql": ("язык sql", "sql запросы", "написание sql запросов"),
+    "kubernetes": ("k8s", "кубернетес"),
+    "docker": ("докер",),
+    "git": ("гит",),
+    "linux": ("линукс",),
+    "ci/cd": ("cicd", "ci cd"),
+    "react": ("react.js", "reactjs"),
+    "node.js": ("nodejs", "node"),
+    "machine learning": ("ml", "машинное обучение"),
+    "deep learning": ("глубокое обучение",),
+    "английский язык": ("английский", "english", "англ"),
+    "autocad": ("автокад",),
+    "adobe photoshop": ("photoshop", "фотошоп"),
+    "командная работа": (
+        "работа в команде", "умение работать в команде", "командный игрок", "командность", "teamwork"
+    ),
+    "коммуникабельность": ("коммуникативные навыки", "навыки коммуникации", "communication skills"),
+    "обучаемость": ("быстрая обучаемость", "желание учиться", "быстро учусь", "быстро обучаюсь"),
+    "внимательность": ("внимание к деталям", "внимательность к деталям", "attention to detail"),
+}
+
+# Личные качества быстрого разбора: «ответственный» сводится к «ответственность» по основе
+for _, _canonical in SOFT_SKILL_STEMS:
+    SKILL_SYNONYMS.setdefault(_canonical, ())
+
+# Навык-группа → навыки, которые она включает
+SKILL_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "microsoft office": ("microsoft word", "microsoft excel", "microsoft powerpoint", "microsoft outlook"),
+}
+
+_PARENTHESES = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_SPACES = re.compile(r"\s+")
+_SEPARATORS = re.compile(r"[,;]")
+_EDGE_PUNCTUATION = " .,;:!?-–—\"'«»`*"
+_FILLER = re.compile(
+    r"^(?:уверенное\s+|хорошее\s+|отличное\s+|базовое\s+|глубокое\s+)?"
+    r"(?:знание|знания|владение|опыт работы с|опыт работы в|опыт|умение работать с|умение работать в|"
+    r"понимание|навыки работы с|навыки работы в|навыки|навык|работа с)\s+"
+)
+_VERSION_SUFFIX = re.compile(r"\s+v?\d+(?:\.\d+)*\+?$")
+_CYRILLIC = re.compile(r"^[а-я]+$")
+_LATIN = re.compile(r"^[a-z]+$")
+
+# Окончания от длинных к коротким; основа не короче _MIN_STEM букв
+_RU_ENDINGS = tuple(sorted((
+    "остями", "остей", "ости", "ость", "иями", "ями", "ами", "ией", "ого", "его", "ому", "ему",
+    "ыми", "ими", "ия", "ии", "ию", "ая", "яя", "ое", "ее", "ые", "ие", "ый", "ий", "ой", "ей",
+    "ую", "юю", "ом", "ем", "ам", "ям", "ах", "ях", "ов", "ев", "ы", "и", "а", "я", "е", "у",
+    "ю", "о", "ь"
+), key=len, reverse=True))
+_EN_ENDINGS = ("ing", "ed", "s")
+_MIN_STEM = 4
+
+
+def _normalize(skill: str) -> str:
+    """Нижний регистр, ё → е, без скобок, лишних пробелов и пунктуации по краям."""
+    text = skill.lower().replace("ё", "е")
+    text = _PARENTHESES.sub(" ", text)
+    return _SPACES.sub(" ", text).strip(_EDGE_PUNCTUATION)
+
+
+def _strip_fillers(key: str) -> str:
+    """Убирает вводные слова и версию: «знание python 3.8» → «python»."""
+    key = _FILLER.sub("", key)
+    return _VERSION_SUFFIX.sub("", key).strip(_EDGE_PUNCTUATION)
+
+
+def _stem_word(word: str) -> str:
+    """Отбрасывает русское или английское окончание."""
+    if _CYRILLIC.match(word):
+        endings = _RU_ENDINGS
+    elif _LATIN.match(word):
+        endings = _EN_ENDINGS
+    else:
+        return word
+    for ending in endings:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def stem(key: str) -> str:
+    """Основы всех слов нормализованного названия навыка."""
+    return " ".join(_stem_word(word) for word in key.split(" "))
+
+
+def skill_id(canonical: str) -> int:
+    """Стабильный 63-битный ID канонического названия навыка."""
+    digest = hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+class SkillCanonicalizer:
+    """
+    Перевод названий навыков в канонические ID по словарям синонимов и групп.
+
+    Словари компилируются в хэш-таблицы при создании; результаты для
+    встреченных строк кэшируются. Методы потокобезопасны.
+    """
+
+    def __init__(
+        self,
+        synonyms: Dict[str, Tuple[str, ...]] = SKILL_SYNONYMS,
+        groups: Dict[str, Tuple[str, ...]] = SKILL_GROUPS,
+        cache_size: int = 65536
+    ):
+        """
+        Args:
+            synonyms: Каноническое название → синонимы
+            groups: Навык-группа → навыки, которые она включает
+            cache_size: Сколько строк кэшировать
+        """
+        self._aliases: Dict[str, str] = {}
+        self._stemmed: Dict[str, str] = {}
+        for canonical, aliases in synonyms.items():
+            for alias in (canonical,) + tuple(aliases):
+                key = _normalize(alias)
+                self._aliases.setdefault(key, canonical)
+                self._stemmed.setdefault(stem(key), canonical)
+
+        self._names: Dict[int, str] = {skill_id(canonical): canonical for canonical in synonyms}
+        self._expansions: Dict[int, Set[int]] = {}
+        for group, members in groups.items():
+            group_id = skill_id(group)
+            member_ids = {skill_id(member) for member in members}
+            self._names.setdefault(group_id, group)
+            self._expansions.setdefault(group_id, set()).update(member_ids)
+            for member_id in member_ids:
+                self._expansions.setdefault(member_id, set()).add(group_id)
+
+        self._cache: Dict[str, Tuple[int, ...]] = {}
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _canonical(self, piece: str) -> Tuple[str, str]:
+        """Каноническая форма и отображаемое название одного навыка (без разделителей)."""
+        key = _normalize(piece)
+        if key in self._aliases:
+            return self._aliases[key], self._aliases[key]
+
+        key = _strip_fillers(key)
+        if key in self._aliases:
+            return self._aliases[key], self._aliases[key]
+
+        stemmed = stem(key)
+        canonical = self._stemmed.get(stemmed)
+        if canonical is not None:
+            return canonical, canonical
+        return stemmed, key
+
+    def canonicalize(self, skill: str) -> Tuple[int, ...]:
+        """
+        ID навыка; строка-перечисление («Word, Excel») даёт несколько ID.
+
+        Args:
+            skill: Название навыка, как его вернул парсинг
+
+        Returns:
+            Кортеж ID (пустой, если строка не содержит навыка)
+        """
+        cached = self._cache.get(skill)
+        if cached is not None:
+            return cached
+
+        ids = []
+        for piece in _SEPARATORS.split(_PARENTHESES.sub(" ", skill)):
+            canonical, display = self._canonical(piece)
+            if not canonical:
+                continue
+            canonical_id = skill_id(canonical)
+            self._names.setdefault(canonical_id, display)
+            if canonical_id not in ids:
+                ids.append(canonical_id)
+
+        result = tuple(ids)
+        with self._lock:
+            if len(self._cache) >= self._cache_size:
+                self._cache.clear()
+            self._cache[skill] = result
+        return result
+
+    def ids(self, skills: Iterable[str]) -> List[int]:
+        """Уникальные ID списка навыков в порядке первого упоминания."""
+        return list(dict.fromkeys(
+            canonical_id for skill in skills for canonical_id in self.canonicalize(skill)
+        ))
+
+    def covered(self, ids: Iterable[int]) -> Set[int]:
+        """ID навыков вместе с членами и родителями их групп (для стороны резюме)."""
+        covered = set(ids)
+        for canonical_id in list(covered):
+            expansion = self._expansions.get(canonical_id)
+            if expansion:
+                covered |= expansion
+        return covered
+
+    def name(self, canonical_id: int) -> str:
+        """Отображаемое название навыка по ID."""
+        return self._names.get(canonical_id, str(canonical_id))
+
+    def knows(self, canonical_id: int) -> bool:
+        """Известно ли название для ID в этом процессе."""
+        return canonical_id in self._names
+
+
+DEFAULT_CANONICALIZER = SkillCanonicalizer()
+
+# Поля документа с ID навыков
+_ID_FIELDS = {"hard_skills": "hard_skill_ids", "soft_skills": "soft_skill_ids"}
+
+
+def canonicalize_document(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Добавляет в распарсенный документ ID навыков (hard_skill_ids,
+    soft_skill_ids) и версию словарей (skills_version).
+
+    Вызывается один раз после парсинга, до записи в кэш.
+
+    Returns:
+        Тот же словарь
+    """
+    for field, id_field in _ID_FIELDS.items():
+        data[id_field] = DEFAULT_CANONICALIZER.ids(data.get(field) or [])
+    data['skills_version'] = SKILLS_VERSION
+    return data
+
+
+def document_skill_ids(data: Dict[str, Any], field: str) -> List[int]:
+    """
+    ID навыков документа: сохранённые при парсинге или вычисленные заново,
+    если документ без них или с ID старой версии словарей.
+
+    Args:
+        data: Распарсенный документ
+        field: 'hard_skills' или 'soft_skills'
+
+    Returns:
+        Уникальные ID в порядке упоминания
+    """
+    ids = data.get(_ID_FIELDS[field])
+    if (
+        ids is not None
+        and data.get('skills_version') == SKILLS_VERSION
+        # Документ из дискового кэша: названия ID ещё не встречались в этом процессе
+        and all(DEFAULT_CANONICALIZER.knows(canonical_id) for canonical_id in ids)
+    ):
+        return ids
+    return DEFAULT_CANONICALIZER.ids(data.get(field) or [])
+
+
+def covered_skill_ids(data: Dict[str, Any], field: str) -> Set[int]:
+    """ID навыков резюме с учётом групп (см. SkillCanonicalizer.covered)."""
+    return DEFAULT_CANONICALIZER.covered(document_skill_ids(data, field))
+
+
+def skill_name(canonical_id: int) -> str:
+    """Отображаемое название навыка по ID."""
+    return DEFAULT_CANONICALIZER.name(canonical_id)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Хранилище результатов сопоставления в SQLite.
+
+Все результаты лежат в одном файле базы в режиме WAL: параллельные процессы
+не перезаписывают друг друга, а чтение не блокирует запись. Пакетная
+вставка идёт одной транзакцией. Индексы по вакансии, резюме и скору
+покрывают типовые запросы: «50 лучших для вакансии X», «все результаты со
+скором ниже 40».
+
+Пример:
+    python -m matcher.store --db results/results.db --job job-1 --limit 50
+    python -m matcher.store --db results/results.db --max-score 40
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS results ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    "job_id TEXT, "
+    "resume_id TEXT, "
+    "score INTEGER NOT NULL, "
+    "degraded INTEGER NOT NULL DEFAULT 0, "
+    "created_at TEXT NOT NULL, "
+    "data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_results_job_score ON results (job_id, score DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_results_resume_score ON results (resume_id, score DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_results_score ON results (score)",
+)
+
+
+class ResultStore:
+    """
+    Результаты сопоставления в SQLite (WAL) с запросами по вакансии, резюме и скору.
+
+    Результат хранится целиком (JSON) вместе с job_id, resume_id и score в
+    отдельных индексируемых столбцах. Все методы потокобезопасны.
+    """
+
+    def __init__(self, path: str = "results/results.db"):
+        """
+        Открывает (и при необходимости создаёт) хранилище.
+
+        Args:
+            path: Путь к файлу базы SQLite
+        """
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        # timeout — ожидание блокировки, пока пишет другой процесс
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _row(result: Dict[str, Any], created_at: str) -> tuple:
+        """Строка таблицы для результата match() или записи пакетного прогона."""
+        return (
+            None if result.get('job_id') is None else str(result['job_id']),
+            None if result.get('resume_id') is None else str(result['resume_id']),
+            int(result.get('score', 0)),
+            int(bool(result.get('degraded'))),
+            created_at,
+            # default=str разворачивает LazyFeedback в текст
+            json.dumps(result, ensure_ascii=False, default=str)
+        )
+
+    def add(
+        self,
+        result: Dict[str, Any],
+        job_id: Optional[str] = None,
+        resume_id: Optional[str] = None
+    ) -> int:
+        """
+        Сохраняет один результат.
+
+        Args:
+            result: Результат match() или запись пакетного прогона
+            job_id: Идентификатор вакансии (по умолчанию result['job_id'])
+            resume_id: Идентификатор резюме (по умолчанию result['resume_id'])
+
+        Returns:
+            Идентификатор сохранённого результата
+        """
+        if job_id is not None or resume_id is not None:
+            result = dict(result)
+            if job_id is not None:
+                result['job_id'] = job_id
+            if resume_id is not None:
+                result['resume_id'] = resume_id
+
+        row = self._row(result, datetime.now().isoformat())
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO results (job_id, resume_id, score, degraded, created_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                row
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def add_many(self, results: Iterable[Dict[str, Any]], replace_degraded: bool = False) -> int:
+        """
+        Сохраняет результаты одной транзакцией.
+
+        Идентификатор каждого сохранённого результата записывается в его
+        поле 'result_id'.
+
+        Args:
+            results: Результаты с полями job_id, resume_id и score
+            replace_degraded: Удалить сохранённые degraded-результаты тех же
+                пар (job_id, resume_id) — при пересчёте после сбоя LLM
+
+        Returns:
+            Число сохранённых результатов
+        """
+        results = list(results)
+        created_at = datetime.now().isoformat()
+        rows = [self._row(result, created_at) for result in results]
+        if not rows:
+            return 0
+
+        with self._lock:
+            with self._db:
+                for result, row in zip(results, rows):
+                    if replace_degraded:
+                        self._db.execute(
+                            "DELETE FROM results WHERE job_id IS ? AND resume_id IS ? AND degraded = 1",
+                            row[:2]
+                        )
+                    cursor = self._db.execute(
+                        "INSERT INTO results (job_id, resume_id, score, degraded, created_at, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        row
+                    )
+                    result['result_id'] = cursor.lastrowid
+        return len(rows)
+
+    def get(self, result_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Результат по идентификатору.
+
+        Returns:
+            Сохранённый результат с полем 'result_id' или None
+        """
+        rows = self._select("WHERE id = ?", (result_id,))
+        return rows[0] if rows else None
+
+    def query(
+        self,
+        job_id: Optional[str] = None,
+        resume_id: Optional[str] = None,
+        min_score: Optional[int] = None,
+        max_score: Optional[int] = None,
+        include_degraded: bool = True,
+        limit: Optional[int] = None,
+        descending: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Выбирает результаты по фильтрам, отсортированные по скору.
+
+        Args:
+            job_id: Только для этой вакансии
+            resume_id: Только для этого резюме
+            min_score: Скор не ниже
+            max_score: Скор строго ниже
+            include_degraded: Включать результаты с пометкой degraded
+            limit: Максимальное число результатов
+            descending: Сортировка по убыванию скора
+
+        Returns:
+            Список результатов с полем 'result_id'
+        """
+        conditions, params = [], []
+        if job_id is not None:
+            conditions.append("job_id = ?")
+            params.append(str(job_id))
+        if resume_id is not None:
+            conditions.append("resume_id = ?")
+            params.append(str(resume_id))
+        if min_score is not None:
+            conditions.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            conditions.append("score < ?")
+            params.append(max_score)
+        if not include_degraded:
+            conditions.append("degraded = 0")
+
+        clause = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        clause += f" ORDER BY score {'DESC' if descending else 'ASC'}, id"
+        if limit is not None:
+            clause += " LIMIT ?"
+            params.append(int(limit))
+        return self._select(clause, tuple(params))
+
+    def top_for_job(self, job_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Лучшие результаты для вакансии по убыванию скора."""
+        return self.query(job_id=job_id, limit=limit)
+
+    def top_for_resume(self, resume_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Лучшие вакансии для резюме по убыванию скора."""
+        return self.query(resume_id=resume_id, limit=limit)
+
+    def below(self, score: int, job_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Все результаты со скором ниже score по возрастанию скора."""
+        return self.query(job_id=job_id, max_score=score, descending=False)
+
+    def count(self) -> int:
+        """Число сохранённых результатов."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _select(self, clause: str, params: tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(f"SELECT id, data FROM results {clause}", params).fetchall()
+        results = []
+        for result_id, data in rows:
+            result = json.loads(data)
+            result['result_id'] = result_id
+            results.append(result)
+        return results
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ResultStore({self.path!r})"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа CLI: python -m matcher.store."""
+    parser = argparse.ArgumentParser(
+        prog="python -m matcher.store",
+        description="Запросы к хранилищу результатов сопоставления"
+    )
+    parser.add_argument("--db", default="results/results.db", help="Файл базы результатов")
+    parser.add_argument("--job", help="Только для вакансии")
+    parser.add_argument("--resume", help="Только для резюме")
+    parser.add_argument("--min-score", type=int, help="Скор не ниже")
+    parser.add_argument("--max-score", type=int, help="Скор строго ниже")
+    parser.add_argument("--no-degraded", action="store_true", help="Без результатов с пометкой degraded")
+    parser.add_argument("--limit", type=int, help="Максимальное число результатов")
+    parser.add_argument("--ascending", action="store_true", help="По возрастанию скора")
+    args = parser.parse_args(argv)
+
+    if not Path(args.db).exists():
+        print(f"Хранилище не найдено: {args.db}", file=sys.stderr)
+        return 1
+
+    with ResultStore(args.db) as store:
+        results = store.query(
+            job_id=args.job,
+            resume_id=args.resume,
+            min_score=args.min_score,
+            max_score=args.max_score,
+            include_degraded=not args.no_degraded,
+            limit=args.limit,
+            descending=not args.ascending
+        )
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
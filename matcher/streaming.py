@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Инкрементальное определение конца JSON в потоковом ответе Ollama.
+
+Небольшие модели после закрывающей скобки часто продолжают генерировать
+пробелы и переводы строк до конца контекста. JsonStreamTracker отслеживает
+глубину скобок по мере поступления чанков и сообщает, когда JSON-значение
+верхнего уровня (объект, массив или строка) завершено, чтобы закрыть
+соединение, не дожидаясь конца генерации.
+"""
+
+
+class JsonStreamTracker:
+    """Накопитель текста потокового ответа с отслеживанием глубины скобок."""
+
+    def __init__(self):
+        self.chunks = 0
+        self.complete = False
+        self._text = ""
+        self._end = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def text(self) -> str:
+        """Полученный текст; после завершения JSON — без хвоста за ним."""
+        return self._text[:self._end] if self.complete else self._text
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Добавляет очередной чанк ответа.
+
+        Args:
+            chunk: Фрагмент текста из поля 'response'
+
+        Returns:
+            True, если JSON-значение верхнего уровня уже получено полностью
+        """
+        self.chunks += 1
+        if self.complete:
+            return True
+
+        offset = len(self._text)
+        self._text += chunk
+
+        for i, char in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 0:
+                        return self._finish(offset + i + 1)
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]' and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    return self._finish(offset + i + 1)
+
+        return False
+
+    def _finish(self, end: int) -> bool:
+        self.complete = True
+        self._end = end
+        return True
@@ -0,0 +1,705 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Очередь фоновых задач сопоставления в SQLite и пул процессов-обработчиков.
+
+Долгие задачи (пакеты вакансий × резюме, ночной скрининг) не держат
+HTTP-соединение: клиент ставит задачу в очередь, получает её идентификатор
+и затем опрашивает статус или получает webhook по завершении. Очередь —
+файл SQLite в режиме WAL, без внешнего брокера.
+
+Каждый процесс пула держит свой SmartJobMatcher. Задачи выбираются по
+приоритету (интерактивные раньше пакетных), а часть процессов
+(tasks.interactive_workers) берёт только интерактивные задачи, поэтому
+ночной пакет не занимает все обработчики. Задачу можно отменить: в очереди
+она снимается сразу, а выполняющийся пакет останавливается после текущей
+порции документов.
+
+Обработчик, выполняющий задачу, периодически обновляет в ней отметку
+heartbeat_at (аренду). При запуске пула в очередь возвращаются только
+задачи с истёкшей арендой (tasks.lease_timeout): обработчики сервера и
+отдельного python -m matcher.tasks могут работать с одним файлом очереди,
+и живые задачи другого пула не запускаются повторно. Пока пул работает,
+надзорный поток каждую треть срока аренды возвращает в очередь брошенные
+задачи и перезапускает аварийно завершившиеся процессы; итог задачи
+записывает только обработчик, который всё ещё держит её аренду.
+
+Пример:
+    python -m matcher.tasks --config config.json --workers 4 --interactive-workers 1
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import requests
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_BULK = 0
+PRIORITY_INTERACTIVE = 10
+PRIORITIES = {"bulk": PRIORITY_BULK, "interactive": PRIORITY_INTERACTIVE}
+
+TASK_TYPES = ("match", "batch")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS tasks ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    "type TEXT NOT NULL, "
+    "priority INTEGER NOT NULL, "
+    "status TEXT NOT NULL, "
+    "payload TEXT NOT NULL, "
+    "webhook TEXT, "
+    "cancel_requested INTEGER NOT NULL DEFAULT 0, "
+    "progress INTEGER NOT NULL DEFAULT 0, "
+    "total INTEGER NOT NULL DEFAULT 0, "
+    "worker TEXT, "
+    "heartbeat_at TEXT, "
+    "result TEXT, "
+    "error TEXT, "
+    "created_at TEXT NOT NULL, "
+    "started_at TEXT, "
+    "finished_at TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_queue ON tasks (status, priority DESC, id)",
+)
+
+# Колонки, добавленные после первой версии схемы: в существующую базу — ALTER TABLE
+_MIGRATIONS = {
+    "heartbeat_at": "ALTER TABLE tasks ADD COLUMN heartbeat_at TEXT",
+}
+
+
+class TaskCancelled(Exception):
+    """Выполнение задачи прервано по запросу отмены."""
+
+
+class TaskQueue:
+    """
+    Очередь задач в SQLite (WAL), общая для процессов сервера и обработчиков.
+
+    Все методы потокобезопасны; выборка задачи обработчиком атомарна
+    между процессами.
+    """
+
+    def __init__(self, path: str = "results/tasks.db"):
+        """
+        Открывает (и при необходимости создаёт) очередь.
+
+        Args:
+            path: Путь к файлу базы SQLite
+        """
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        # isolation_level=None: транзакции открываются явно (BEGIN IMMEDIATE в claim)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        columns = {row['name'] for row in self._db.execute("PRAGMA table_info(tasks)")}
+        for column, statement in _MIGRATIONS.items():
+            if column not in columns:
+                self._db.execute(statement)
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        task_type: str,
+        payload: Dict[str, Any],
+        priority: int = PRIORITY_INTERACTIVE,
+        webhook: Optional[str] = None
+    ) -> int:
+        """
+        Ставит задачу в очередь.
+
+        Args:
+            task_type: 'match' (одна пара) или 'batch' (все пары вакансий и резюме)
+            payload: Параметры задачи (тексты документов и т.д.)
+            priority: Приоритет; больше — раньше (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+            webhook: URL, на который по завершении отправляется POST со статусом задачи
+
+        Returns:
+            Идентификатор задачи
+        """
+        if task_type not in TASK_TYPES:
+            raise ValueError(f"Неизвестный тип задачи: {task_type}")
+
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO tasks (type, priority, status, payload, webhook, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    task_type,
+                    int(priority),
+                    QUEUED,
+                    json.dumps(payload, ensure_ascii=False),
+                    webhook,
+                    datetime.now().isoformat()
+                )
+            )
+            return cursor.lastrowid
+
+    def get(self, task_id: int, include_payload: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Статус задачи и, если она выполнена, её результат.
+
+        Returns:
+            Словарь задачи или None, если её нет
+        """
+        with self._lock:
+            row = self._db.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._task(row, include_payload) if row is not None else None
+
+    @staticmethod
+    def _task(row: sqlite3.Row, include_payload: bool = False) -> Dict[str, Any]:
+        task = {
+            'task_id': row['id'],
+            'type': row['type'],
+            'priority': row['priority'],
+            'status': row['status'],
+            'progress': row['progress'],
+            'total': row['total'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+        if row['result'] is not None:
+            task['result'] = json.loads(row['result'])
+        if row['error'] is not None:
+            task['error'] = row['error']
+        if include_payload:
+            task['payload'] = json.loads(row['payload'])
+            task['webhook'] = row['webhook']
+        return task
+
+    def claim(self, worker: str, min_priority: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Забирает задачу с наибольшим приоритетом (при равном — самую старую).
+
+        Args:
+            worker: Имя обработчика
+            min_priority: Брать только задачи с приоритетом не ниже
+
+        Returns:
+            Задача с payload или None, если очередь пуста
+        """
+        condition, params = "status = ?", [QUEUED]
+        if min_priority is not None:
+            condition += " AND priority >= ?"
+            params.append(min_priority)
+
+        with self._lock:
+            # BEGIN IMMEDIATE сразу берёт блокировку записи: другой процесс
+            # не заберёт ту же задачу между SELECT и UPDATE
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    f"SELECT id FROM tasks WHERE {condition} ORDER BY priority DESC, id LIMIT 1",
+                    params
+                ).fetchone()
+                if row is not None:
+                    now = datetime.now().isoformat()
+                    self._db.execute(
+                        "UPDATE tasks SET status = ?, worker = ?, started_at = ?, heartbeat_at = ? WHERE id = ?",
+                        (RUNNING, worker, now, now, row['id'])
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            if row is None:
+                return None
+            task_row = self._db.execute("SELECT * FROM tasks WHERE id = ?", (row['id'],)).fetchone()
+        return self._task(task_row, include_payload=True)
+
+    def heartbeat(self, task_id: int, worker: str) -> bool:
+        """
+        Продлевает аренду выполняющейся задачи.
+
+        Args:
+            task_id: Идентификатор задачи
+            worker: Имя обработчика, забравшего задачу
+
+        Returns:
+            False, если задача больше не выполняется этим обработчиком
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE tasks SET heartbeat_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (datetime.now().isoformat(), task_id, worker, RUNNING)
+            )
+            return cursor.rowcount > 0
+
+    def set_progress(self, task_id: int, progress: int, total: int) -> None:
+        """Обновляет прогресс выполняющейся задачи (обработано документов из total)."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE tasks SET progress = ?, total = ? WHERE id = ?",
+                (progress, total, task_id)
+            )
+
+    def finish(
+        self,
+        task_id: int,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        worker: Optional[str] = None
+    ) -> bool:
+        """
+        Записывает итог задачи.
+
+        Args:
+            task_id: Идентификатор задачи
+            status: DONE, FAILED или CANCELLED
+            result: Результат задачи
+            error: Текст ошибки
+            worker: Имя обработчика: итог записывается, только если задача
+                всё ещё выполняется им (аренда не истекла и задачу не забрал другой)
+
+        Returns:
+            False, если итог не записан
+        """
+        condition, params = "id = ?", [task_id]
+        if worker is not None:
+            condition += " AND worker = ? AND status = ?"
+            params += [worker, RUNNING]
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE tasks SET status = ?, result = ?, error = ?, finished_at = ? WHERE {condition}",
+                [
+                    status,
+                    None if result is None else json.dumps(result, ensure_ascii=False, default=str),
+                    error,
+                    datetime.now().isoformat(),
+                    *params
+                ]
+            )
+            return cursor.rowcount > 0
+
+    def cancel(self, task_id: int) -> Optional[str]:
+        """
+        Отменяет задачу.
+
+        Задача в очереди снимается сразу; для выполняющейся выставляется
+        запрос отмены, который обработчик проверяет между порциями документов.
+
+        Returns:
+            Статус задачи после запроса отмены или None, если задачи нет
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE tasks SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, datetime.now().isoformat(), task_id, QUEUED)
+            )
+            self._db.execute(
+                "UPDATE tasks SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (task_id, RUNNING)
+            )
+            row = self._db.execute("SELECT status FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return row['status'] if row is not None else None
+
+    def cancel_requested(self, task_id: int) -> bool:
+        """Запрошена ли отмена выполняющейся задачи."""
+        with self._lock:
+            row = self._db.execute("SELECT cancel_requested FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return bool(row is not None and row['cancel_requested'])
+
+    def requeue_stale(self, lease_timeout: float) -> int:
+        """
+        Возвращает в очередь выполняющиеся задачи с истёкшей арендой
+        (обработчики, выполнявшие их, остановлены аварийно).
+
+        Задачи, аренду которых продлевают живые обработчики (в том числе
+        другого пула с тем же файлом очереди), не трогаются.
+
+        Args:
+            lease_timeout: Сколько секунд без heartbeat задача считается брошенной
+
+        Returns:
+            Число возвращённых задач
+        """
+        cutoff = (datetime.now() - timedelta(seconds=lease_timeout)).isoformat()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE tasks SET status = ?, worker = NULL, started_at = NULL, heartbeat_at = NULL "
+                "WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (QUEUED, RUNNING, cutoff)
+            )
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Число задач по статусам."""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self) -> "TaskQueue":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"TaskQueue({self.path!r})"
+
+
+class TaskWorker:
+    """Обработчик задач: забирает задачи из очереди и выполняет их своим SmartJobMatcher."""
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        matcher,
+        name: str = "worker",
+        min_priority: Optional[int] = None,
+        poll_interval: float = 0.5,
+        webhook_timeout: float = 10.0,
+        lease_timeout: float = 60.0
+    ):
+        """
+        Args:
+            queue: Очередь задач
+            matcher: SmartJobMatcher обработчика
+            name: Имя обработчика (записывается в задачу)
+            min_priority: Брать только задачи с приоритетом не ниже
+            poll_interval: Пауза между опросами пустой очереди, сек
+            webhook_timeout: Таймаут отправки webhook, сек
+            lease_timeout: Срок аренды задачи, сек (продлевается каждую треть срока)
+        """
+        self.queue = queue
+        self.matcher = matcher
+        self.name = name
+        self.min_priority = min_priority
+        self.poll_interval = poll_interval
+        self.webhook_timeout = webhook_timeout
+        self.lease_timeout = lease_timeout
+
+    def run(self, stop_event) -> None:
+        """Выполняет задачи, пока не выставлен stop_event."""
+        logger.info(f"Обработчик {self.name} запущен")
+        while not stop_event.is_set():
+            if not self.run_once():
+                # Не stop_event.wait: процесс, убитый внутри wait межпроцессного
+                # Event, оставляет его условие занятым, и set() у пула зависает
+                time.sleep(self.poll_interval)
+        logger.info(f"Обработчик {self.name} остановлен")
+
+    def run_once(self) -> bool:
+        """
+        Выполняет одну задачу из очереди.
+
+        Returns:
+            True, если задача была
+        """
+        task = self.queue.claim(self.name, self.min_priority)
+        if task is None:
+            return False
+
+        task_id = task['task_id']
+        logger.info(f"Задача {task_id} ({task['type']}, приоритет {task['priority']}) → {self.name}")
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat,
+            args=(task_id, done),
+            name=f"{self.name}-heartbeat",
+            daemon=True
+        )
+        heartbeat.start()
+        result, error = None, None
+        try:
+            if task['type'] == "batch":
+                result = self._run_batch(task_id, task['payload'])
+            else:
+                result = self._run_match(task['payload'])
+            status = DONE
+        except TaskCancelled:
+            logger.info(f"Задача {task_id} отменена")
+            status = CANCELLED
+        except Exception as e:
+            logger.error(f"✗ Задача {task_id} завершилась ошибкой: {e}", exc_info=True)
+            status, error = FAILED, str(e)
+        finally:
+            done.set()
+            heartbeat.join()
+
+        if not self.queue.finish(task_id, status, result, error, worker=self.name):
+            # Аренда истекла, и задачу уже вернули в очередь: её итог запишет новый обработчик
+            logger.warning(f"⚠ Итог задачи {task_id} не записан: аренда потеряна обработчиком {self.name}")
+            return True
+
+        if task.get('webhook'):
+            self._notify(task['webhook'], task_id)
+        return True
+
+    def _heartbeat(self, task_id: int, done: threading.Event) -> None:
+        """Продлевает аренду задачи, пока она выполняется."""
+        while not done.wait(self.lease_timeout / 3):
+            if not self.queue.heartbeat(task_id, self.name):
+                logger.warning(f"⚠ Аренда задачи {task_id} потеряна обработчиком {self.name}")
+                return
+
+    def _run_match(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Сопоставление одной пары; результат сохраняется в ResultStore, если включено."""
+        result = self.matcher.match(
+            payload['job'],
+            payload['resume'],
+            generate_feedback=payload.get('generate_feedback', True)
+        )
+        result['job_id'] = payload.get('job_id')
+        result['resume_id'] = payload.get('resume_id')
+        if self.matcher.config.get("output.save_results", True):
+            self.matcher.save_result(result)
+        return result
+
+    def _run_batch(self, task_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Матрица скоров для всех пар; документы парсятся порциями, между
+        которыми проверяется запрос отмены и обновляется прогресс.
+        """
+        jobs, resumes = payload['jobs'], payload['resumes']
+        total = len(jobs) + len(resumes)
+        chunk_size = self.matcher.max_concurrency * 4
+        parsed: List[Dict[str, Any]] = []
+        self.queue.set_progress(task_id, 0, total)
+
+        # Группы почти-дубликатов резюме строятся один раз на весь пакет
+        resume_groups = (
+            self.matcher._near_duplicate_groups(resumes, False) if self.matcher.dedup is not None else None
+        )
+        for texts, is_job, groups in ((jobs, True, None), (resumes, False, resume_groups)):
+            for start in range(0, len(texts), chunk_size):
+                if self.queue.cancel_requested(task_id):
+                    raise TaskCancelled()
+                # Индексы групп относительно порции; первый документ группы из
+                # прошлой порции уже в кэше, и дубликат найдёт его в индексе
+                chunk_groups = None if groups is None else [
+                    group - start for group in groups[start:start + chunk_size]
+                ]
+                parsed.extend(self.matcher._parse_many(texts[start:start + chunk_size], is_job, chunk_groups))
+                self.queue.set_progress(task_id, len(parsed), total)
+
+        result = self.matcher._build_matrix_result(
+            parsed[:len(jobs)],
+            parsed[len(jobs):],
+            payload.get('include_reports', False),
+            resume_groups
+        )
+        if payload.get('job_ids') is not None:
+            result['job_ids'] = payload['job_ids']
+        if payload.get('resume_ids') is not None:
+            result['resume_ids'] = payload['resume_ids']
+        return result
+
+    def _notify(self, url: str, task_id: int) -> None:
+        """Отправляет итог задачи на webhook; ошибка доставки только логируется."""
+        try:
+            response = requests.post(url, json=self.queue.get(task_id), timeout=self.webhook_timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"⚠ Webhook задачи {task_id} не доставлен: {e}")
+
+
+def _worker_main(
+    path: str,
+    config: Config,
+    name: str,
+    min_priority: Optional[int],
+    stop_event
+) -> None:
+    """Точка входа процесса-обработчика."""
+    # Процесс останавливается через stop_event, Ctrl+C обрабатывает родитель
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=config.get("logging.level", "INFO"),
+        format=config.get("logging.format")
+    )
+    from .core import SmartJobMatcher
+
+    with TaskQueue(path) as queue, SmartJobMatcher(config=config) as matcher:
+        TaskWorker(
+            queue,
+            matcher,
+            # PID в имени: у пулов сервера и CLI с одним файлом очереди имена не совпадают
+            name=f"{name}-{os.getpid()}",
+            min_priority=min_priority,
+            poll_interval=config.get("tasks.poll_interval", 0.5),
+            webhook_timeout=config.get("tasks.webhook_timeout", 10),
+            lease_timeout=config.get("tasks.lease_timeout", 60)
+        ).run(stop_event)
+
+
+class WorkerPool:
+    """Пул процессов-обработчиков очереди задач."""
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        path: Optional[str] = None,
+        workers: Optional[int] = None,
+        interactive_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            config: Конфигурация (передаётся SmartJobMatcher каждого процесса)
+            path: Файл очереди (по умолчанию tasks.path)
+            workers: Число процессов (по умолчанию tasks.workers)
+            interactive_workers: Сколько из них берут только интерактивные задачи
+                (по умолчанию tasks.interactive_workers)
+        """
+        self.config = config or Config()
+        self.path = path or self.config.get("tasks.path", "results/tasks.db")
+        self.workers = workers if workers is not None else self.config.get("tasks.workers", 2)
+        self.interactive_workers = min(
+            self.workers,
+            interactive_workers if interactive_workers is not None
+            else self.config.get("tasks.interactive_workers", 1)
+        )
+        self.lease_timeout = self.config.get("tasks.lease_timeout", 60)
+        # spawn: процессы не наследуют потоки и соединения родителя
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes: List[multiprocessing.Process] = []
+        self._supervisor: Optional[threading.Thread] = None
+        self._supervisor_stop = threading.Event()
+
+    def _spawn(self, index: int) -> multiprocessing.Process:
+        """Запускает процесс-обработчик с номером index."""
+        interactive_only = index < self.interactive_workers
+        name = f"{'interactive' if interactive_only else 'worker'}-{index}"
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                self.path,
+                self.config,
+                name,
+                PRIORITY_INTERACTIVE if interactive_only else None,
+                self._stop
+            ),
+            name=f"matcher-{name}",
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def _requeue_stale(self, queue: TaskQueue) -> None:
+        requeued = queue.requeue_stale(self.lease_timeout)
+        if requeued:
+            logger.warning(f"⚠ Возвращено в очередь прерванных задач: {requeued}")
+
+    def _supervise(self) -> None:
+        """
+        Каждую треть срока аренды возвращает в очередь задачи с истёкшей
+        арендой и перезапускает аварийно завершившиеся процессы.
+        """
+        with TaskQueue(self.path) as queue:
+            while not self._supervisor_stop.wait(self.lease_timeout / 3):
+                for index, process in enumerate(self._processes):
+                    if not process.is_alive():
+                        logger.warning(
+                            f"⚠ Обработчик {process.name} завершился (код {process.exitcode}), перезапуск"
+                        )
+                        self._processes[index] = self._spawn(index)
+                self._requeue_stale(queue)
+
+    def start(self) -> None:
+        """Возвращает в очередь задачи с истёкшей арендой, запускает процессы и их надзор."""
+        with TaskQueue(self.path) as queue:
+            self._requeue_stale(queue)
+
+        self._stop.clear()
+        self._supervisor_stop.clear()
+        self._processes = [self._spawn(index) for index in range(self.workers)]
+        self._supervisor = threading.Thread(target=self._supervise, name="matcher-pool-supervisor", daemon=True)
+        self._supervisor.start()
+        logger.info(
+            f"Запущено обработчиков: {self.workers} "
+            f"(только интерактивные: {self.interactive_workers})"
+        )
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Останавливает процессы после завершения текущих задач."""
+        # Надзор завершается первым, чтобы не перезапустить останавливаемые процессы
+        self._supervisor_stop.set()
+        if self._supervisor is not None:
+            self._supervisor.join()
+            self._supervisor = None
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def __enter__(self) -> "WorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа CLI: python -m matcher.tasks."""
+    parser = argparse.ArgumentParser(
+        prog="python -m matcher.tasks",
+        description="Пул обработчиков очереди задач сопоставления"
+    )
+    parser.add_argument("--config", help="Путь к config.json")
+    parser.add_argument("--db", help="Файл очереди (по умолчанию tasks.path)")
+    parser.add_argument("--workers", type=int, help="Число процессов (tasks.workers)")
+    parser.add_argument(
+        "--interactive-workers",
+        type=int,
+        help="Сколько процессов берут только интерактивные задачи (tasks.interactive_workers)"
+    )
+    args = parser.parse_args(argv)
+
+    config = Config(args.config) if args.config else Config()
+    logging.basicConfig(
+        level=config.get("logging.level", "INFO"),
+        format=config.get("logging.format")
+    )
+
+    pool = WorkerPool(config, args.db, args.workers, args.interactive_workers)
+    pool.start()
+    # Сигналы блокируются после запуска процессов, чтобы они не унаследовали маску
+    stop_signals = {signal.SIGINT, signal.SIGTERM}
+    signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+    signal.sigwait(stop_signals)
+
+    logger.info("Остановка обработчиков...")
+    pool.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
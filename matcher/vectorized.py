@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Векторизованный скоринг на NumPy для целых пулов вакансий и резюме.
+
+Канонические ID навыков интернируются в словарь столбцов, документы
+хранятся в разреженном виде (CSR: indptr + indices). Все четыре компоненты скора считаются массивными
+операциями для матрицы N×M. Результат совпадает с _calculate_score при тех
+же весах, в том числе с частичным зачётом близких навыков (scoring.fuzzy);
+детальные отчёты строятся только для запрошенных пар.
+
+Требует пакет numpy: pip install numpy
+"""
+
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from .core import BaseJobMatcher
+from .skills import covered_skill_ids, document_skill_ids
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Метка точного совпадения в таблице зачётов _partial_credit: больше любого зачёта
+_EXACT = 2.0
+
+
+class EncodedDocuments:
+    """Набор распарсенных документов в векторном представлении."""
+
+    def __init__(
+        self,
+        has_education: "np.ndarray",
+        experience: "np.ndarray",
+        hard: Tuple["np.ndarray", "np.ndarray"],
+        soft: Tuple["np.ndarray", "np.ndarray"],
+        hard_covered: Tuple["np.ndarray", "np.ndarray"],
+        soft_covered: Tuple["np.ndarray", "np.ndarray"]
+    ):
+        self.has_education = has_education
+        self.experience = experience
+        # Навыки документа — для роли вакансии
+        self.hard_indptr, self.hard_indices = hard
+        self.soft_indptr, self.soft_indices = soft
+        # Навыки с учётом групп — для роли резюме
+        self.hard_covered_indptr, self.hard_covered_indices = hard_covered
+        self.soft_covered_indptr, self.soft_covered_indices = soft_covered
+
+    def __len__(self) -> int:
+        return len(self.experience)
+
+
+class VectorizedScorer:
+    """
+    Векторизованный движок скоринга.
+
+    Использует веса матчера (matcher.weights) на момент вызова, поэтому
+    изменение весов сразу отражается в скорах.
+    """
+
+    def __init__(self, matcher: BaseJobMatcher, chunk_elements: int = 2 ** 26):
+        """
+        Инициализация движка.
+
+        Args:
+            matcher: Матчер, чьи веса и _calculate_score используются
+            chunk_elements: Ограничение на размер промежуточных массивов
+                (вакансий в проходе × навыков всех резюме), определяет пиковую память
+        """
+        if np is None:
+            raise ImportError("Для VectorizedScorer требуется numpy: pip install numpy")
+
+        self.matcher = matcher
+        self.chunk_elements = chunk_elements
+        self.hard_vocab: Dict[str, int] = {}
+        self.soft_vocab: Dict[str, int] = {}
+
+    def _encode_skills(
+        self,
+        documents: List[Dict[str, Any]],
+        field: str,
+        vocab: Dict[int, int],
+        covered: bool = False
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Строит CSR-представление множеств навыков, пополняя словарь.
+
+        covered=True — навыки с учётом групп (сторона резюме в _calculate_score).
+        """
+        indptr = [0]
+        indices: List[int] = []
+        for data in documents:
+            skills = covered_skill_ids(data, field) if covered else document_skill_ids(data, field)
+            indices.extend(sorted(vocab.setdefault(skill, len(vocab)) for skill in skills))
+            indptr.append(len(indices))
+        return np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64)
+
+    def encode(self, documents: List[Dict[str, Any]]) -> EncodedDocuments:
+        """
+        Переводит распарсенные документы в векторное представление.
+
+        Args:
+            documents: Результаты _parse_text_with_llm
+
+        Returns:
+            EncodedDocuments
+        """
+        encoded = EncodedDocuments(
+            has_education=np.asarray([bool(d['education']) for d in documents], dtype=bool),
+            experience=np.asarray([d['experience_years'] for d in documents], dtype=np.float64),
+            hard=self._encode_skills(documents, 'hard_skills', self.hard_vocab),
+            soft=self._encode_skills(documents, 'soft_skills', self.soft_vocab),
+            hard_covered=self._encode_skills(documents, 'hard_skills', self.hard_vocab, covered=True),
+            soft_covered=self._encode_skills(documents, 'soft_skills', self.soft_vocab, covered=True)
+        )
+        if self.matcher.skill_similarity is not None:
+            self.matcher.skill_similarity.add(self.hard_vocab)
+        return encoded
+
+    def _ensure_encoded(self, documents) -> EncodedDocuments:
+        """Принимает как EncodedDocuments, так и список распарсенных документов."""
+        if isinstance(documents, EncodedDocuments):
+            return documents
+        return self.encode(documents)
+
+    @staticmethod
+    def _match_counts(
+        job_indptr: "np.ndarray",
+        job_indices: "np.ndarray",
+        resume_indptr: "np.ndarray",
+        resume_indices: "np.ndarray",
+        vocab_size: int
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Число общих навыков для каждой пары и число навыков у каждой вакансии.
+
+        Returns:
+            (matched N×M, required N)
+        """
+        n_jobs = len(job_indptr) - 1
+        required = np.diff(job_indptr)
+
+        # Битовая маска навыков вакансий N×V
+        masks = np.zeros((n_jobs, max(vocab_size, 1)), dtype=np.int8)
+        rows = np.repeat(np.arange(n_jobs), required)
+        masks[rows, job_indices] = 1
+
+        # Суммы маски по навыкам каждого резюме через разность префиксных сумм
+        gathered = masks[:, resume_indices]
+        prefix = np.zeros((n_jobs, gathered.shape[1] + 1), dtype=np.int32)
+        np.cumsum(gathered, axis=1, dtype=np.int32, out=prefix[:, 1:])
+        matched = prefix[:, resume_indptr[1:]] - prefix[:, resume_indptr[:-1]]
+        return matched, required
+
+    def _partial_credit(
+        self,
+        job_indptr: "np.ndarray",
+        job_indices: "np.ndarray",
+        resume_indptr: "np.ndarray",
+        resume_indices: "np.ndarray"
+    ) -> "np.ndarray":
+        """
+        Частичный зачёт hard skills для каждой пары (как в _calculate_score).
+
+        Для каждого навыка вакансий, у которого есть соседи в словаре, строится
+        строка зачётов по столбцам словаря; максимум по навыкам резюме —
+        лучший зачёт навыка. Если навык есть в резюме, зачёт не начисляется.
+
+        Returns:
+            Матрица N×M с суммой зачётов
+        """
+        similarity = self.matcher.skill_similarity
+        n_jobs, n_resumes = len(job_indptr) - 1, len(resume_indptr) - 1
+        partial = np.zeros((n_jobs, n_resumes), dtype=np.float64)
+        if not len(job_indices) or not len(resume_indices):
+            return partial
+
+        # Строки таблицы: навыки вакансий с соседями среди навыков словаря
+        columns = list(self.hard_vocab)
+        rows: Dict[int, int] = {}
+        entries: List[Tuple[int, int, float]] = []
+        for column in np.unique(job_indices).tolist():
+            credits = []
+            for other, value in similarity.neighbours(columns[column]).items():
+                other_column = self.hard_vocab.get(other)
+                credit = similarity.credit(value)
+                if other_column is not None and credit:
+                    credits.append((other_column, credit))
+            if credits:
+                row = rows[column] = len(rows)
+                # Сам навык — метка точного совпадения, больше любого зачёта
+                entries.append((row, column, _EXACT))
+                entries.extend((row, other_column, credit) for other_column, credit in credits)
+        if not rows:
+            return partial
+
+        # Вакансия × строка таблицы: навыки вакансии уникальны, поэтому 0/1
+        job_rows = np.zeros((n_jobs, len(rows)), dtype=np.float64)
+        positions = np.asarray([rows.get(column, -1) for column in job_indices.tolist()], dtype=np.int64)
+        job_of = np.repeat(np.arange(n_jobs), np.diff(job_indptr))
+        found = positions >= 0
+        job_rows[job_of[found], positions[found]] = 1
+
+        # Для пустых резюме reduceat берёт один элемент, результат обнуляется ниже
+        starts = np.minimum(resume_indptr[:-1], len(resume_indices) - 1)
+        empty = np.diff(resume_indptr) == 0
+        entries_array = np.asarray(entries, dtype=np.float64)
+        entry_rows = entries_array[:, 0].astype(np.int64)
+        entry_columns = entries_array[:, 1].astype(np.int64)
+        block = max(1, self.chunk_elements // (4 * len(resume_indices)))
+        for first in range(0, len(rows), block):
+            last = min(first + block, len(rows))
+            selected = (entry_rows >= first) & (entry_rows < last)
+            table = np.zeros((last - first, len(self.hard_vocab)), dtype=np.float32)
+            table[entry_rows[selected] - first, entry_columns[selected]] = entries_array[selected, 2]
+            best = np.maximum.reduceat(table[:, resume_indices], starts, axis=1)
+            best[:, empty] = 0
+            best[best >= _EXACT] = 0
+            # Зачёты кратны 1/64, поэтому суммы точны при любом порядке сложения
+            partial += job_rows[:, first:last] @ best.astype(np.float64)
+        return partial
+
+    def score_matrix(self, jobs, resumes) -> "np.ndarray":
+        """
+        Итоговые скоры для всех пар вакансия × резюме.
+
+        Args:
+            jobs: Вакансии (список распарсенных данных или EncodedDocuments)
+            resumes: Резюме (список распарсенных данных или EncodedDocuments)
+
+        Returns:
+            Целочисленная матрица N×M
+        """
+        jobs = self._ensure_encoded(jobs)
+        resumes = self._ensure_encoded(resumes)
+
+        resume_nnz = max(len(resumes.hard_covered_indices), len(resumes.soft_covered_indices), len(resumes), 1)
+        chunk_size = max(1, self.chunk_elements // resume_nnz)
+
+        chunks = [
+            self._score_chunk(jobs, resumes, start, min(start + chunk_size, len(jobs)))
+            for start in range(0, len(jobs), chunk_size)
+        ]
+        if not chunks:
+            return np.zeros((0, len(resumes)), dtype=np.int64)
+        return np.vstack(chunks)
+
+    def _score_chunk(
+        self,
+        jobs: EncodedDocuments,
+        resumes: EncodedDocuments,
+        start: int,
+        stop: int
+    ) -> "np.ndarray":
+        """Скоры для вакансий [start, stop) — тот же порядок операций, что в _calculate_score."""
+        weights = self.matcher.weights
+
+        hard_matched, hard_required = self._match_counts(
+            jobs.hard_indptr[start:stop + 1] - jobs.hard_indptr[start],
+            jobs.hard_indices[jobs.hard_indptr[start]:jobs.hard_indptr[stop]],
+            resumes.hard_covered_indptr, resumes.hard_covered_indices, len(self.hard_vocab)
+        )
+        soft_matched, soft_required = self._match_counts(
+            jobs.soft_indptr[start:stop + 1] - jobs.soft_indptr[start],
+            jobs.soft_indices[jobs.soft_indptr[start]:jobs.soft_indptr[stop]],
+            resumes.soft_covered_indptr, resumes.soft_covered_indices, len(self.soft_vocab)
+        )
+
+        # --- 1. Образование ---
+        edu_score = np.where(
+            jobs.has_education[start:stop, None] & resumes.has_education[None, :],
+            weights['education_match'], 0
+        ).astype(np.float64)
+
+        # --- 2. Опыт ---
+        job_exp = jobs.experience[start:stop, None]
+        resume_exp = resumes.experience[None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio_score = (resume_exp / job_exp) * weights['experience_match']
+        exp_score = np.where(
+            job_exp > 0,
+            np.where(
+                resume_exp >= job_exp,
+                weights['experience_match'],
+                np.where(resume_exp > 0, ratio_score, 0.0)
+            ),
+            0.0
+        )
+
+        # --- 3. Hard Skills ---
+        with np.errstate(divide='ignore'):
+            hard_points = np.where(
+                hard_required > 0,
+                weights['hard_skills_match'] / np.maximum(hard_required, 1), 0.0
+            )
+        if self.matcher.skill_similarity is not None:
+            hard_matched = hard_matched + self._partial_credit(
+                jobs.hard_indptr[start:stop + 1] - jobs.hard_indptr[start],
+                jobs.hard_indices[jobs.hard_indptr[start]:jobs.hard_indptr[stop]],
+                resumes.hard_covered_indptr, resumes.hard_covered_indices
+            )
+        hs_score = hard_matched * hard_points[:, None]
+
+        # --- 4. Soft Skills ---
+        soft_points = np.where(
+            soft_required > 0,
+            weights['soft_skills_match'] / np.maximum(soft_required, 1), 0.0
+        )
+        ss_score = soft_matched * soft_points[:, None]
+
+        total = edu_score + exp_score
+        total += hs_score
+        total += ss_score
+
+        # round() в Python и np.rint округляют половины к чётному
+        return np.minimum(100, np.rint(total)).astype(np.int64)
+
+    def top_k(
+        self,
+        jobs,
+        resumes,
+        k: int = 20,
+        jobs_data: Optional[List[Dict[str, Any]]] = None,
+        resumes_data: Optional[List[Dict[str, Any]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Лучшие k резюме для каждой вакансии.
+
+        Если переданы jobs_data и resumes_data (распарсенные данные), для
+        каждой отобранной пары строится детальный отчёт через _calculate_score.
+
+        Args:
+            jobs: Вакансии (список распарсенных данных или EncodedDocuments)
+            resumes: Резюме (список распарсенных данных или EncodedDocuments)
+            k: Сколько кандидатов вернуть на вакансию
+            jobs_data: Распарсенные вакансии для построения отчётов
+            resumes_data: Распарсенные резюме для построения отчётов
+
+        Returns:
+            Для каждой вакансии список {'resume_index', 'score'[, 'report']}
+            по убыванию скора
+        """
+        if jobs_data is None and not isinstance(jobs, EncodedDocuments):
+            jobs_data = jobs
+        if resumes_data is None and not isinstance(resumes, EncodedDocuments):
+            resumes_data = resumes
+
+        scores = self.score_matrix(jobs, resumes)
+        k = min(k, scores.shape[1])
+
+        ranked: List[List[Dict[str, Any]]] = []
+        for job_index, row in enumerate(scores):
+            if k <= 0:
+                ranked.append([])
+                continue
+            # Порог k-го скора; среди равных порогу берём первые по порядку резюме
+            threshold = -np.partition(-row, k - 1)[k - 1]
+            above = np.flatnonzero(row > threshold)
+            equal = np.flatnonzero(row == threshold)[:k - len(above)]
+            best = np.concatenate([above, equal])
+            best = best[np.lexsort((best, -row[best]))]
+
+            job_top = []
+            for resume_index in best:
+                item = {'resume_index': int(resume_index), 'score': int(row[resume_index])}
+                if jobs_data is not None and resumes_data is not None:
+                    item['report'] = self.matcher._calculate_score(
+                        jobs_data[job_index],
+                        resumes_data[resume_index]
+                    )['report']
+                job_top.append(item)
+            ranked.append(job_top)
+
+        return ranked